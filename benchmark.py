@@ -0,0 +1,363 @@
+#!/usr/bin/python3
+"""
+Benchmark suite for kupfer core: searching, scoring and caching.
+
+Benchmarks run on synthetic catalog (file-like names, application names with
+aliases, contacts and unicode names) and do not require display. Results are
+written as JSON, so they can be compared between commits.
+
+Usage:
+    python3 benchmark.py [--size N] [--repeat N] [--seed N] [--only NAME]
+                         [--output FILE] [--compare FILE]
+
+Example:
+    python3 benchmark.py --output before.json
+    (apply changes)
+    python3 benchmark.py --output after.json --compare before.json
+
+This file is a part of the program kupfer, which is
+released under GNU General Public License v3 (or any later version),
+see the main program file, and COPYING for details.
+"""
+
+from __future__ import annotations
+
+import argparse
+import functools
+import gettext
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import typing as ty
+
+_FILE_WORDS = (
+    "report",
+    "invoice",
+    "holiday",
+    "photo",
+    "draft",
+    "notes",
+    "budget",
+    "thesis",
+    "backup",
+    "project",
+    "meeting",
+    "summary",
+    "contract",
+    "readme",
+    "screenshot",
+)
+_FILE_EXTS = (".pdf", ".odt", ".txt", ".jpg", ".png", ".tar.gz", ".py", "")
+_APPS = (
+    ("GNU Image Manipulation Program", "gimp"),
+    ("LibreOffice Writer", "lowriter"),
+    ("Firefox Web Browser", "firefox"),
+    ("Terminal", "gnome-terminal"),
+    ("Text Editor", "gedit"),
+    ("Files", "nautilus"),
+    ("Document Viewer", "evince"),
+    ("Thunderbird Mail", "thunderbird"),
+    ("Rhythmbox", "rhythmbox"),
+    ("System Monitor", "gnome-system-monitor"),
+)
+_UNICODE_NAMES = (
+    "Zażółć gęślą jaźń",
+    "Ñandú über Straße",
+    "Café résumé naïve",
+    "Ελληνικά κείμενα",
+    "Русский документ",
+    "日本語のファイル",
+    "Ångström Ørsted",
+)
+_PERSON_NAMES = (
+    "Anna",
+    "Jan",
+    "Maria",
+    "Piotr",
+    "John",
+    "Zoë",
+    "Łukasz",
+    "Émile",
+    "Kate",
+    "Olaf",
+)
+
+# key used for search benchmarks; prefixes of it are searched
+_SEARCH_KEYS = ("report", "gimp", "zazolc", "anna", "xq")
+
+
+def _setup_environment(tmpdir: str) -> None:
+    """Use XDG directories in `tmpdir` so benchmarks do not touch user
+    files. Must be called before importing kupfer."""
+    for name in ("XDG_CONFIG_HOME", "XDG_CACHE_HOME", "XDG_DATA_HOME"):
+        path = os.path.join(tmpdir, name.lower())
+        os.makedirs(path)
+        os.environ[name] = path
+
+    gettext.install("kupfer", names=("ngettext",))
+
+
+class Catalog:
+    """Synthetic catalog of leaves and actions."""
+
+    def __init__(self, size: int, seed: int) -> None:
+        # pylint: disable=import-outside-toplevel
+        from kupfer.obj import FileLeaf, TextLeaf
+        from kupfer.obj.contacts import EmailContact
+
+        rnd = random.Random(seed)
+        self.leaves: list[ty.Any] = []
+        self.contacts: list[ty.Any] = []
+
+        for idx in range(size):
+            kind = rnd.random()
+            if kind < 0.6:  # noqa: PLR2004
+                words = rnd.sample(_FILE_WORDS, rnd.randint(1, 3))
+                name = (
+                    "_".join(words) + f"-{idx}" + rnd.choice(_FILE_EXTS)
+                )
+                path = os.path.join("/home/user", *words[:-1], name)
+                self.leaves.append(FileLeaf(path, name=name))
+            elif kind < 0.8:  # noqa: PLR2004
+                appname, alias = rnd.choice(_APPS)
+                leaf = TextLeaf(f"{appname} {idx}", f"{appname} {idx}")
+                leaf.kupfer_add_alias(alias)
+                self.leaves.append(leaf)
+            else:
+                name = f"{rnd.choice(_UNICODE_NAMES)} {idx}"
+                self.leaves.append(TextLeaf(name, name))
+
+        # contacts; about one third share email with other contact
+        ncontacts = max(size // 10, 1)
+        for _idx in range(ncontacts):
+            person = rnd.choice(_PERSON_NAMES)
+            num = rnd.randint(0, ncontacts * 2 // 3)
+            self.contacts.append(
+                EmailContact(f"{person.lower()}{num}@example.com", person)
+            )
+
+        self.names = [str(leaf) for leaf in self.leaves]
+        self.actions = self._create_actions(rnd)
+
+    @staticmethod
+    def _create_actions(rnd: random.Random) -> list[ty.Any]:
+        # pylint: disable=import-outside-toplevel
+        from kupfer.obj import Action
+
+        actions = []
+        for idx in range(200):
+            word = rnd.choice(_FILE_WORDS + tuple(a[1] for a in _APPS))
+            act = Action(f"{word.capitalize()} action {idx}")
+            act.rank_adjust = rnd.randint(-10, 10)
+            actions.append(act)
+
+        return actions
+
+
+def _create_source(catalog: Catalog) -> ty.Any:
+    # pylint: disable=import-outside-toplevel
+    from kupfer.obj import Source
+
+    class BenchSource(Source):
+        def __init__(self, leaves: list[ty.Any]) -> None:
+            super().__init__("Benchmark source")
+            self.leaves = leaves
+
+        def get_items(self) -> list[ty.Any]:
+            return self.leaves
+
+    # make source picklable
+    BenchSource.__module__ = __name__
+    BenchSource.__qualname__ = "BenchSource"
+    globals()["BenchSource"] = BenchSource
+    return BenchSource(catalog.leaves)
+
+
+def _key_prefixes(key: str) -> ty.Iterator[str]:
+    for length in range(1, len(key) + 1):
+        yield key[:length]
+
+
+BenchFunc = ty.Callable[[], ty.Any]
+
+
+def benchmarks(catalog: Catalog) -> ty.Iterator[tuple[str, BenchFunc]]:
+    """Yield (name, function) for each benchmark."""
+    # pylint: disable=import-outside-toplevel
+    from kupfer.core import learn, relevance
+    from kupfer.core.searcher import Searcher
+    from kupfer.core.sources import SourcePickler
+    from kupfer.obj.grouping import GroupingSource
+    from kupfer.support import kupferstring
+
+    names = catalog.names
+
+    def score(key: str) -> list[float]:
+        return [relevance.score(name, key) for name in names]
+
+    for key in _SEARCH_KEYS:
+        for prefix in _key_prefixes(key):
+            yield (
+                f"relevance.score[{prefix}]",
+                functools.partial(score, prefix),
+            )
+
+    source = _create_source(catalog)
+    searcher = Searcher()
+
+    def search(key: str) -> int:
+        _first, matches = searcher.search((source,), key)
+        return sum(1 for _match in matches)
+
+    for key in _SEARCH_KEYS:
+        for prefix in _key_prefixes(key):
+            yield (
+                f"Searcher.search[{prefix}]",
+                functools.partial(search, prefix),
+            )
+
+    leaf = catalog.leaves[0]
+
+    def rank_actions(key: str) -> list[ty.Any]:
+        return list(searcher.rank_actions(catalog.actions, key, leaf)[1])
+
+    for key in ("", "r", "rep", "report"):
+        yield (
+            f"Searcher.rank_actions[{key}]",
+            functools.partial(rank_actions, key),
+        )
+
+    yield "kupferstring.locale_sort", lambda: kupferstring.locale_sort(
+        catalog.leaves
+    )
+
+    pickler = SourcePickler()
+
+    def pickle_roundtrip() -> None:
+        pickler.pickle_source(source)
+        assert pickler.unpickle_source(source) is not None
+
+    yield "SourcePickler.roundtrip", pickle_roundtrip
+
+    for leaf in catalog.leaves[: max(len(catalog.leaves) // 20, 1)]:
+        learn.record_search_hit(leaf, str(leaf)[:2])
+
+    yield "learn.save", learn.save
+    yield "learn.load", learn.load
+
+    contacts_src = _create_source(catalog)
+    contacts_src.leaves = catalog.contacts
+    grouping = GroupingSource("Contacts", [contacts_src])
+    yield "GroupingSource.get_leaves", lambda: list(grouping.get_leaves())
+
+
+def run_benchmark(func: BenchFunc, repeat: int) -> dict[str, float]:
+    """Run `func` `repeat` times; return timing statistics in seconds."""
+    times = []
+    for _idx in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+
+    return {
+        "min": min(times),
+        "median": statistics.median(times),
+        "mean": statistics.fmean(times),
+        "max": max(times),
+    }
+
+
+def _git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _print_results(
+    results: dict[str, dict[str, float]], baseline: dict[str, ty.Any] | None
+) -> None:
+    base_results = baseline["results"] if baseline else {}
+    for name, res in results.items():
+        line = f"{name:<40} {res['median'] * 1000:10.3f} ms"
+        if base := base_results.get(name):
+            line += f"  ({res['median'] / base['median']:6.2f}x)"
+
+        print(line)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Benchmark kupfer searching, scoring and caching"
+    )
+    parser.add_argument(
+        "--size", type=int, default=10000, help="number of catalog leaves"
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=5, help="repetitions of each benchmark"
+    )
+    parser.add_argument(
+        "--seed", type=int, default=1, help="seed for catalog generator"
+    )
+    parser.add_argument(
+        "--only",
+        action="append",
+        default=[],
+        help="run only benchmarks which name starts with ONLY",
+    )
+    parser.add_argument("--output", help="write results to JSON file")
+    parser.add_argument(
+        "--compare", help="compare results with JSON file (median ratio)"
+    )
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="kupfer-bench-") as tmpdir:
+        _setup_environment(tmpdir)
+        catalog = Catalog(args.size, args.seed)
+        for name, func in benchmarks(catalog):
+            if args.only and not any(name.startswith(o) for o in args.only):
+                continue
+
+            results[name] = run_benchmark(func, args.repeat)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="UTF-8") as bfile:
+            baseline = json.load(bfile)
+
+    _print_results(results, baseline)
+
+    if args.output:
+        data = {
+            "meta": {
+                "revision": _git_revision(),
+                "timestamp": int(time.time()),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "size": args.size,
+                "repeat": args.repeat,
+                "seed": args.seed,
+            },
+            "results": results,
+        }
+        with open(args.output, "w", encoding="UTF-8") as ofile:
+            json.dump(data, ofile, indent=2)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
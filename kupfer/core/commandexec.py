@@ -18,7 +18,9 @@ the command should be passed on from the earlier (more nested) invocation.
 Multiple dispatch is straightforward if the action implements the multiple
 dispatch protocol. Is the protocol not implemented, the command is simply
 "multiplied out": executed once for each object, or once for each combination
-of object and indirect object.
+of object and indirect object. Actions that declare themselves parallel safe
+are "multiplied out" in a pool of worker threads and their results are
+posted later, as late result.
 
 With multiple command execution (and delegation), we must then process and
 merge multiple return values.
@@ -36,13 +38,17 @@ from __future__ import annotations
 import collections
 import contextlib
 import itertools
+import os
 import sys
+import time
 import typing as ty
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from enum import IntEnum
 from functools import partial
 
-from gi.repository import GObject
+from gi.repository import GLib, GObject
 
+from kupfer.core import tracing
 from kupfer.core._support import get_leaf_members, is_multiple_leaf
 from kupfer.obj import (
     Action,
@@ -86,6 +92,8 @@ class ExecResult(IntEnum):
 
 
 _MAX_LAST_RESULTS: ty.Final = 10
+# max number of worker threads for parallel multiple dispatch
+_MAX_PARALLEL_WORKERS: ty.Final = max(os.cpu_count() or 1, 2)
 
 ## CmdTuple keep information about command arguments (leaf, action and optional
 ## iobj)
@@ -170,6 +178,55 @@ class ExecutionToken:
 
         raise RuntimeError("Environment Context not available")
 
+    @property
+    def in_worker_thread(self) -> bool:
+        """True when action is activated in a worker thread of parallel
+        execution. Then the action may block until its work is done and
+        should return its result instead of posting it later."""
+        return False
+
+
+class _ThreadedExecutionToken(ExecutionToken):
+    """ExecutionToken for actions activated in worker threads. Late results
+    and errors are passed to the main thread."""
+
+    def __init__(self, token: ExecutionToken) -> None:
+        # pylint: disable=protected-access
+        aectx, async_token = token._aectx, token._token  # noqa: SLF001
+        super().__init__(aectx, async_token, token._ui_ctx)  # noqa: SLF001
+
+    @property
+    def in_worker_thread(self) -> bool:
+        return True
+
+    def register_late_result(
+        self, result_object: KupferObject, show: bool = True
+    ) -> None:
+        GLib.idle_add(
+            partial(ExecutionToken.register_late_result, self, show=show),
+            result_object,
+        )
+
+    def register_late_error(
+        self, exc_info: ExecInfo | BaseException | None = None
+    ) -> None:
+        if exc_info is None:
+            exc_info = sys.exc_info()
+
+        GLib.idle_add(self._late_error, exc_info)
+
+    def _late_error(self, exc_info: ExecInfo | BaseException) -> None:
+        # error notification is shown by context
+        with contextlib.suppress(ActionExecutionError):
+            ExecutionToken.register_late_error(self, exc_info)
+
+    def delegated_run(
+        self, obj: Leaf, action: Action, iobj: Leaf | None
+    ) -> tuple[ExecResult, ty.Any]:
+        raise ActionExecutionError(
+            "delegated run is not supported in parallel execution"
+        )
+
 
 class ActionExecutionContext(GObject.GObject, pretty.OutputMixin):  # type: ignore
     """The ActionExecutionContext (ACE) keeps track of its nested invocation,
@@ -197,7 +254,11 @@ class ActionExecutionContext(GObject.GObject, pretty.OutputMixin):  # type: igno
 
     def __init__(self) -> None:
         GObject.GObject.__init__(self)
-        self._task_runner = task.TaskRunner(end_on_finish=False)
+        self._task_runner = task.TaskRunner(
+            end_on_finish=False, finished_callback=self._on_task_finished
+        )
+        # running tasks -> (command id, command, wall clock start)
+        self._task_commands: dict[task.Task, tuple[int, CmdTuple, float]] = {}
         self._nest_level = 0
         self._delegate = False
         self._command_counter = itertools.count()
@@ -282,9 +343,12 @@ class ActionExecutionContext(GObject.GObject, pretty.OutputMixin):  # type: igno
         elif isinstance(exc_info, BaseException):
             exc_info = (type(exc_info), exc_info, None)
 
-        _command_id, cmdtuple = token
+        command_id, cmdtuple = token
         assert exc_info
         assert cmdtuple
+        tracing.record_late(
+            command_id, tracing.LATE_ERROR, *cmdtuple, error=exc_info[1]
+        )
         self._do_error_conversion(cmdtuple, exc_info)
 
     def register_late_result(
@@ -304,6 +368,7 @@ class ActionExecutionContext(GObject.GObject, pretty.OutputMixin):  # type: igno
         self.output_debug("Late result", result, "for", token)
         assert token and token[1]
         command_id, (_ign1, action, _ign2) = token  # type: ignore
+        tracing.record_late(command_id, tracing.LATE_RESULT, *token[1])
         if result is None:
             raise ActionExecutionError(f"Late result from {action} was None")
 
@@ -355,7 +420,7 @@ class ActionExecutionContext(GObject.GObject, pretty.OutputMixin):  # type: igno
         If a command carries out another command as part of its execution,
         and wishes to delegate to it, pass True for @delegate.
         """
-        self.last_command_id = next(self._command_counter)
+        self.last_command_id = command_id = next(self._command_counter)
         self._last_executed_command = (obj, action, iobj)
 
         if not action or not obj:
@@ -368,8 +433,27 @@ class ActionExecutionContext(GObject.GObject, pretty.OutputMixin):  # type: igno
 
         # The execution token object for the current invocation
         execution_token = self.make_execution_token(ui_ctx)
-        with self._error_conversion((obj, action, iobj)), self._nesting():
-            ret = activate_action(execution_token, obj, action, iobj)
+        start, start_mono = time.time(), time.monotonic()
+        # also synchronous actions may post late results through token
+        tracing.mark_pending(command_id, start, start_mono)
+        try:
+            with self._error_conversion((obj, action, iobj)), self._nesting():
+                ret = activate_action(execution_token, obj, action, iobj)
+
+        except Exception as exc:
+            tracing.record(
+                command_id,
+                tracing.SYNC,
+                obj,
+                action,
+                iobj,
+                start=start,
+                duration=time.monotonic() - start_mono,
+                error=exc,
+            )
+            raise
+
+        duration = time.monotonic() - start_mono
 
         # remember last command, but not delegated commands.
         if not delegate:
@@ -378,18 +462,56 @@ class ActionExecutionContext(GObject.GObject, pretty.OutputMixin):  # type: igno
         # Delegated command execution was previously requested: we take
         # the result of the nested execution context
         if self._delegate:
+            tracing.record(
+                command_id,
+                tracing.SYNC,
+                obj,
+                action,
+                iobj,
+                start=start,
+                duration=duration,
+            )
             assert not ret or isinstance(ret, tuple)
             res, ret = ty.cast("tuple[ExecResult, ty.Any]", ret)
             return self._return_result(res, ret, ui_ctx)
 
         assert not ret or isinstance(ret, (Source, Leaf, task.Task))
-        res = parse_action_result(action, ret)
+        if isinstance(ret, _ParallelDispatchTask):
+            # results are posted as late result
+            res = ExecResult.ASYNC
+        else:
+            res = parse_action_result(action, ret)
+
         if res == ExecResult.ASYNC:
+            tracing.record(
+                command_id,
+                tracing.ASYNC,
+                obj,
+                action,
+                iobj,
+                start=start,
+                duration=duration,
+            )
             # Register the task then "clear" the result
             self.output_debug("Registering async task", ret)
             assert isinstance(ret, task.Task)
+            self._task_commands[ret] = (
+                command_id,
+                (obj, action, iobj),
+                time.time(),
+            )
             self._task_runner.add_task(ret)
             res, ret = ExecResult.NONE, None
+        else:
+            tracing.record(
+                command_id,
+                tracing.SYNC,
+                obj,
+                action,
+                iobj,
+                start=start,
+                duration=duration,
+            )
 
         # Delegated command execution was requested: we pass
         # through the result of the action to the parent execution context
@@ -398,6 +520,17 @@ class ActionExecutionContext(GObject.GObject, pretty.OutputMixin):  # type: igno
 
         return self._return_result(res, ret, ui_ctx)
 
+    def _on_task_finished(self, atask: task.Task, duration: float) -> None:
+        if cmd := self._task_commands.pop(atask, None):
+            command_id, cmdtuple, start = cmd
+            tracing.record(
+                command_id,
+                tracing.TASK,
+                *cmdtuple,
+                start=start,
+                duration=duration,
+            )
+
     def _return_result(
         self,
         res: ExecResult,
@@ -414,6 +547,7 @@ class ActionExecutionContext(GObject.GObject, pretty.OutputMixin):  # type: igno
         self,
         action: Action,
         retvals: ty.Iterable[tuple[ExecResult, ActionResult] | ActionResult],
+        delegate: bool | None = None,
     ) -> tuple[ExecResult, ActionResult] | ActionResult:
         """
         When delegate is False `retvals` is list of `ActionResult` and function
@@ -422,14 +556,16 @@ class ActionExecutionContext(GObject.GObject, pretty.OutputMixin):  # type: igno
         When delegate it True  `retvals` is list of (ExecResult, ActionResult)
         and function return (ExecResult, ActionResult)
 
+        `delegate` default to state of current execution.
         """
-        self.output_debug(
-            "Combining", action, retvals, f"delegate={self._delegate}"
-        )
+        if delegate is None:
+            delegate = self._delegate
+
+        self.output_debug("Combining", action, retvals, f"{delegate=}")
 
         retvals_not_empty = filter(None, retvals)
 
-        if self._delegate:
+        if delegate:
             return self._combine_action_result_multiple_delegate(
                 action,
                 ty.cast(
@@ -578,14 +714,15 @@ def activate_action(
     iobj: Leaf | None,
 ) -> tuple[ExecResult, ActionResult] | ActionResult:
     """Activate @action in simplest manner"""
-
+    # token is required to post results of parallel execution
+    token = context
     if not action.wants_context():
         context = None
 
     if not is_multiple_leaf(obj) and not is_multiple_leaf(iobj):
         return _activate_action_single(obj, action, iobj, context)
 
-    return _activate_action_multiple(obj, action, iobj, context)
+    return _activate_action_multiple(obj, action, iobj, context, token)
 
 
 def _activate_action_single(
@@ -603,12 +740,24 @@ def _activate_action_single(
 
 
 def _activate_action_multiple(
-    obj: Leaf, action: Action, iobj: Leaf | None, ctx: ExecutionToken | None
+    obj: Leaf,
+    action: Action,
+    iobj: Leaf | None,
+    ctx: ExecutionToken | None,
+    token: ExecutionToken | None = None,
 ) -> tuple[ExecResult, ActionResult] | ActionResult | None:
     objs = get_leaf_members(obj)
 
     if not hasattr(action, "activate_multiple"):
         iobjs = (None,) if iobj is None else get_leaf_members(iobj)
+        if token and action.is_parallel_safe():
+            commands = [(leaf, item) for leaf in objs for item in iobjs]
+            if len(commands) > 1:
+                if ctx:
+                    ctx = _ThreadedExecutionToken(ctx)
+
+                return _ParallelDispatchTask(action, commands, ctx, token)
+
         return _activate_action_multiple_multiplied(objs, action, iobjs, ctx)
 
     func: ActionActivateMultipleFunc = action.activate_multiple
@@ -645,6 +794,100 @@ def _activate_action_multiple_multiplied(
     return actx.combine_action_result_multiple(action, rets)
 
 
+class _ParallelDispatchTask(task.ThreadTask, pretty.OutputMixin):
+    """Activate `action` for each (leaf, iobj) in `commands` in a pool of
+    worker threads.
+
+    Results are combined in order of `commands` and posted as late result
+    through `token`; first error is reported as late error. Progress is
+    shown in notification when execution takes longer than `delay_s`.
+    """
+
+    # show progress only when execution takes longer than
+    delay_s = 2.0
+    # minimal interval between progress updates
+    interval_s = 1.0
+
+    def __init__(
+        self,
+        action: Action,
+        commands: list[tuple[Leaf, Leaf | None]],
+        ctx: ExecutionToken | None,
+        token: ExecutionToken,
+    ) -> None:
+        super().__init__(str(action))
+        self.action = action
+        self.commands = commands
+        self._ctx = ctx
+        self._token = token
+        self._results: list[ActionResult] = []
+        self._errors: list[OperationError] = []
+        self._notification_id = 0
+
+    def thread_do(self) -> None:
+        results: list[ActionResult] = [None] * len(self.commands)
+        started = last_update = time.monotonic()
+        with ThreadPoolExecutor(
+            max_workers=_MAX_PARALLEL_WORKERS,
+            thread_name_prefix="kupfer-dispatch",
+        ) as executor:
+            futures = {
+                executor.submit(
+                    _activate_action_single, leaf, self.action, iobj, self._ctx
+                ): idx
+                for idx, (leaf, iobj) in enumerate(self.commands)
+            }
+            for done, future in enumerate(as_completed(futures), 1):
+                try:
+                    ret = future.result()
+                    results[futures[future]] = ty.cast("ActionResult", ret)
+                except OperationError as exc:
+                    self._errors.append(exc)
+
+                now = time.monotonic()
+                if (
+                    now - started > self.delay_s
+                    and now - last_update > self.interval_s
+                ):
+                    last_update = now
+                    GLib.idle_add(self._show_progress, done)
+
+        self._results = results
+
+    def _show_progress(self, done: int) -> None:
+        self._notification_id = (
+            uiutils.show_notification(
+                str(self.action),
+                # TRANS: progress of action executed for many objects
+                _("%(done)d of %(total)d done")
+                % {"done": done, "total": len(self.commands)},
+                icon_name="kupfer",
+                nid=self._notification_id,
+            )
+            or 0
+        )
+
+    def thread_finish(self) -> None:
+        if self._notification_id:
+            uiutils.close_notification(self._notification_id)
+            self._notification_id = 0
+
+        actx = default_action_execution_context()
+        result = actx.combine_action_result_multiple(
+            self.action, self._results, delegate=False
+        )
+        if isinstance(result, (Leaf, Source)):
+            self._token.register_late_result(result)
+
+        if self._errors:
+            for exc in self._errors[1:]:
+                self.output_error("Error in", self.action, exc)
+
+            # notification is shown by context
+            with contextlib.suppress(ActionExecutionError):
+                self._token.register_late_error(self._errors[0])
+
+
 def parse_action_result(action: Action, ret: ActionResult) -> ExecResult:
     """Return result type for @action and return value @ret"""
     if ret is ActionResultRefresh:
@@ -0,0 +1,170 @@
+# pylint:disable=protected-access
+# type:ignore
+
+"""
+Tests for multiple dispatch and tracing of commands.
+"""
+
+import gettext
+import threading
+import time
+import unittest
+from unittest import mock
+
+# kupfer modules use gettext functions on import
+gettext.install("kupfer", names=("ngettext",))
+
+# pylint: disable=wrong-import-position
+from kupfer.core import commandexec, tracing  # noqa:E402
+from kupfer.obj import Action, Leaf, OperationError  # noqa:E402
+from kupfer.obj.compose import MultipleLeaf  # noqa:E402
+
+
+class _Upper(Action):
+    def __init__(self, parallel_safe=True):
+        super().__init__("Upper")
+        self.parallel_safe = parallel_safe
+        self.threads = set()
+
+    def has_result(self):
+        return True
+
+    def wants_context(self):
+        return True
+
+    def is_parallel_safe(self):
+        return self.parallel_safe
+
+    def activate(self, leaf, iobj=None, ctx=None):
+        self.threads.add(threading.get_ident())
+        if leaf.object == "error":
+            raise OperationError("failed")
+
+        # finish later leaves first
+        time.sleep(0.01 * (5 - len(leaf.object) % 5))
+        return Leaf(leaf.object.upper(), leaf.object.upper())
+
+
+def _leaves(*names):
+    return MultipleLeaf([Leaf(name, name) for name in names])
+
+
+class TestParallelDispatch(unittest.TestCase):
+    def setUp(self):
+        self.token = commandexec.ExecutionToken(mock.Mock(), (0, None), None)
+        self.token.register_late_result = mock.Mock()
+        self.token.register_late_error = mock.Mock()
+
+    def _run(self, action, obj):
+        ret = commandexec.activate_action(self.token, obj, action, None)
+        self.assertIsInstance(ret, commandexec._ParallelDispatchTask)
+        ret.thread_do()
+        ret.thread_finish()
+        return ret
+
+    def test_not_parallel_safe(self):
+        action = _Upper(parallel_safe=False)
+        ret = commandexec.activate_action(
+            self.token, _leaves("a", "bb"), action, None
+        )
+        self.assertIsInstance(ret, MultipleLeaf)
+        self.assertEqual([leaf.object for leaf in ret.object], ["A", "BB"])
+        self.assertEqual(action.threads, {threading.get_ident()})
+
+    def test_single_object(self):
+        action = _Upper()
+        ret = commandexec.activate_action(
+            self.token, Leaf("a", "a"), action, None
+        )
+        self.assertEqual(ret.object, "A")
+
+    def test_results_in_order(self):
+        action = _Upper()
+        names = ["a", "bb", "ccc", "dddd", "eeeee", "f"]
+        ptask = self._run(action, _leaves(*names))
+        self.assertNotIn(threading.get_ident(), action.threads)
+        self.assertIsInstance(ptask._ctx, commandexec._ThreadedExecutionToken)
+        self.assertTrue(ptask._ctx.in_worker_thread)
+
+        self.token.register_late_result.assert_called_once()
+        (result,), _kwargs = self.token.register_late_result.call_args
+        self.assertIsInstance(result, MultipleLeaf)
+        self.assertEqual(
+            [leaf.object for leaf in result.object],
+            [name.upper() for name in names],
+        )
+        self.token.register_late_error.assert_not_called()
+
+    def test_errors(self):
+        action = _Upper()
+        with mock.patch.object(
+            commandexec._ParallelDispatchTask, "output_error"
+        ):
+            self._run(action, _leaves("a", "error", "bb", "error"))
+
+        (result,), _kwargs = self.token.register_late_result.call_args
+        self.assertEqual([leaf.object for leaf in result.object], ["A", "BB"])
+        self.token.register_late_error.assert_called_once()
+        (error,), _kwargs = self.token.register_late_error.call_args
+        self.assertIsInstance(error, OperationError)
+
+
+class _Later(Action):
+    """Synchronous action that posts its result later."""
+
+    def __init__(self):
+        super().__init__("Later")
+        self.ctx = None
+
+    def wants_context(self):
+        return True
+
+    def activate(self, leaf, iobj=None, ctx=None):
+        self.ctx = ctx
+
+
+class TestTracing(unittest.TestCase):
+    def setUp(self):
+        # command ids are counted by context
+        tracing._SPANS.clear()
+        self.actx = commandexec.ActionExecutionContext()
+
+    def _late_spans(self, command_id):
+        return [
+            span
+            for span in tracing.get_spans()
+            if span.command_id == command_id
+            and span.kind in (tracing.LATE_RESULT, tracing.LATE_ERROR)
+        ]
+
+    def test_late_result_of_sync_action(self):
+        action = _Later()
+        self.actx.run(Leaf("a", "a"), action, None)
+        command_id = self.actx.last_command_id
+        time.sleep(0.01)
+        with mock.patch.object(commandexec.uiutils, "show_notification"):
+            action.ctx.register_late_result(Leaf("b", "b"))
+
+        (span,) = self._late_spans(command_id)
+        self.assertEqual(span.kind, tracing.LATE_RESULT)
+        self.assertGreaterEqual(span.duration, 0.01)
+
+    def test_late_error_of_sync_action(self):
+        action = _Later()
+        self.actx.run(Leaf("a", "a"), action, None)
+        command_id = self.actx.last_command_id
+        time.sleep(0.01)
+        with (
+            mock.patch.object(commandexec.uiutils, "show_notification"),
+            self.assertRaises(commandexec.ActionExecutionError),
+        ):
+            action.ctx.register_late_error(OperationError("failed"))
+
+        (span,) = self._late_spans(command_id)
+        self.assertEqual(span.kind, tracing.LATE_ERROR)
+        self.assertGreaterEqual(span.duration, 0.01)
+        self.assertEqual(span.error, "failed")
+
+
+if __name__ == "__main__":
+    unittest.main()
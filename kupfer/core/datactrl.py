@@ -21,6 +21,7 @@ from kupfer.core import (
     qfurl,
     search,
     settings,
+    warmup,
 )
 from kupfer.core.panes import (
     LeafPane,
@@ -120,6 +121,7 @@ class DataController(GObject.GObject, pretty.OutputMixin):  # type:ignore
         )
 
         self._save_data_timer = scheduler.Timer()
+        self._warmup = warmup.WarmUp()
 
         sch = scheduler.get_scheduler()
         sch.connect("load", self._on_load)
@@ -222,6 +224,7 @@ class DataController(GObject.GObject, pretty.OutputMixin):  # type:ignore
     def _on_display(self, _sched: ty.Any) -> None:
         self._reload_source_root()
         self._save_data_timer.set(DATA_SAVE_INTERVAL_S, self._save_data)
+        self._warmup.start()
 
     def _get_directory_sources(
         self,
@@ -353,6 +356,7 @@ class DataController(GObject.GObject, pretty.OutputMixin):  # type:ignore
 
     def _on_finish(self, _sched: ty.Any) -> None:
         "Close down the data model, save user data, and write caches to disk"
+        self._warmup.stop()
         get_source_controller().finalize()
         self._save_data(final_invocation=True)
         self.output_info("Saving cache...")
@@ -427,6 +431,7 @@ class DataController(GObject.GObject, pretty.OutputMixin):  # type:ignore
         if @lazy, will slow down search result reporting
         """
         self.cancel_search(pane)
+        self._warmup.postpone()
         self._latest_interaction = self._execution_context.last_command_id
         ctl = self._get_panectl(pane)
         ctl.outstanding_search_id = next(self._search_ids)
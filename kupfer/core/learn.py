@@ -18,6 +18,7 @@ __all__ = (
     "add_favorite",
     "erase_object_affinity",
     "get_correlation_bonus",
+    "get_most_used",
     "get_object_has_affinity",
     "get_record_score",
     "is_favorite",
@@ -376,6 +377,14 @@ def get_record_score(obj: ty.Any, key: str = "") -> int:
     return fav
 
 
+def get_most_used(count: int) -> list[str]:
+    """Return repr of up to @count most used objects, most used first."""
+    items = sorted(
+        _REGISTER.mnemonics.items(), key=lambda i: i[1].count, reverse=True
+    )
+    return [name for name, _mns in items[:count]]
+
+
 def get_correlation_bonus(action: Action, for_leaf: Leaf | None) -> int:
     """Get the bonus rank for @obj when used with @for_leaf."""
     # favorites
@@ -17,6 +17,7 @@ from kupfer.core.searcher import Searcher
 from kupfer.core.sources import get_source_controller
 from kupfer.obj import objects
 from kupfer.obj.base import Action, AnySource, KupferObject, Leaf, Source
+from kupfer.obj.sources import StreamingCommandSource
 from kupfer.support import pretty
 
 if ty.TYPE_CHECKING:
@@ -102,6 +103,12 @@ GObject.signal_new(
 )
 
 
+def _release_source(src: AnySource) -> None:
+    """Stop background work of `src` that is no longer shown."""
+    if isinstance(src, StreamingCommandSource):
+        src.cancel()
+
+
 class LeafPane(Pane[Leaf], pretty.OutputMixin):
     __gtype_name__ = "LeafPane"
 
@@ -131,8 +138,13 @@ class LeafPane(Pane[Leaf], pretty.OutputMixin):
         return self._source
 
     def source_rebase(self, src: AnySource) -> None:
+        new_src = self._load_source(src)
+        for old_src in (self._source, *(s for s, _sel in self._source_stack)):
+            if old_src is not None and old_src is not new_src:
+                _release_source(old_src)
+
         self._source_stack.clear()
-        self._source = self._load_source(src)
+        self._source = new_src
         self.refresh_data()
 
     def push_source(self, src: AnySource) -> None:
@@ -145,6 +157,9 @@ class LeafPane(Pane[Leaf], pretty.OutputMixin):
     def _pop_source(self) -> bool:
         """Remove source from stack. Return True if succeeded"""
         if self._source_stack:
+            if self._source is not None:
+                _release_source(self._source)
+
             self._source, self._selection = self._source_stack.pop()
             return True
 
@@ -238,6 +238,7 @@ class SettingsController(GObject.GObject, pretty.OutputMixin):  # type: ignore
             "showstatusicon_ai": False,
             "usecommandkeys": True,
             "score_without_key": True,
+            "path_completion": False,
         },
         "Appearance": {
             "icon_large_size": 128,
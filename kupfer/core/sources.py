@@ -5,6 +5,7 @@ import hashlib
 import itertools
 import os
 import pickle
+import queue
 import threading
 import time
 import traceback
@@ -13,6 +14,8 @@ import weakref
 from collections import defaultdict
 from pathlib import Path
 
+from gi.repository import GLib
+
 from kupfer import config
 from kupfer.core import pluginload, plugins
 from kupfer.obj import Action, AnySource, Leaf, Source, TextSource
@@ -36,6 +39,10 @@ class InternalError(Exception):
     pass
 
 
+# called with sources when their loading in background is finished
+LoadCallback = ty.Callable[[ty.Collection[Source]], ty.Any]
+
+
 class PeriodicRescanner(pretty.OutputMixin):
     """Periodically rescan a @catalog of sources.
 
@@ -63,6 +70,11 @@ class PeriodicRescanner(pretty.OutputMixin):
         self._min_rescan_interval = min_rescan_interval
         self._catalog: ty.Iterable[Source] = []
         self._catalog_cur: ty.Iterator[Source] | None = None
+        # sources to load in background and callbacks
+        self._load_queue: queue.SimpleQueue[
+            tuple[ty.Collection[Source], LoadCallback | None]
+        ] = queue.SimpleQueue()
+        self._loader: threading.Thread | None = None
 
     def set_catalog(self, catalog: ty.Iterable[Source]) -> None:
         self._catalog = catalog
@@ -117,9 +129,41 @@ class PeriodicRescanner(pretty.OutputMixin):
 
         self._rescan_source(source, force_update=force_update, campaign=False)
 
-    def _start_source_rescan(self, source: Source) -> None:
+    def load_in_background(
+        self,
+        sources: ty.Collection[Source],
+        finish_callback: LoadCallback | None = None,
+    ) -> None:
+        """Load @sources that are not loaded yet in background thread.
+
+        Sources are queued and loaded one by one; @finish_callback is called
+        with @sources in main thread when all of them are loaded.
+        """
+        self._load_queue.put((sources, finish_callback))
+        if self._loader is None:
+            self._loader = threading.Thread(
+                target=self._load_queued, name="kupfer-loader", daemon=True
+            )
+            self._loader.start()
+
+    def _load_queued(self) -> None:
+        while True:
+            sources, finish_callback = self._load_queue.get()
+            for source in sources:
+                # source may be loaded in the meantime
+                if source.cached_items is None and not source.is_dynamic():
+                    self._rescan_source(
+                        source, force_update=False, campaign=False
+                    )
+
+            if finish_callback:
+                GLib.idle_add(finish_callback, sources)
+
+    def _start_source_rescan(
+        self, source: Source, campaign: bool = True
+    ) -> None:
         thread = threading.Thread(
-            target=self._rescan_source, args=(source, True, True)
+            target=self._rescan_source, args=(source, True, campaign)
         )
         thread.daemon = True
         thread.start()
@@ -763,5 +807,14 @@ class SourceController(pretty.OutputMixin):
             with pluginload.exception_guard(src, self._remove_source, src):
                 self._rescanner.rescan_now(src, force_update=False)
 
+    def load_in_background(
+        self,
+        sources: ty.Collection[Source],
+        finish_callback: LoadCallback | None = None,
+    ) -> None:
+        """Load items of not loaded @sources in background thread, without
+        blocking main loop. See `PeriodicRescanner.load_in_background`."""
+        self._rescanner.load_in_background(sources, finish_callback)
+
 
 get_source_controller = SourceController.instance
@@ -0,0 +1,207 @@
+"""
+Tracing of command execution.
+
+Each executed command is recorded as a span: the (synchronous) activation of
+the action, then optionally its background task, late results and late
+errors. Spans are kept in a bounded ring buffer and can be inspected with
+the "Execution Trace" debug leaf or by D-Bus method GetExecutionTrace; they
+show which actions make the launcher sluggish.
+
+This file is a part of the program kupfer, which is
+released under GNU General Public License v3 (or any later version),
+see the main program file, and COPYING for details.
+"""
+
+from __future__ import annotations
+
+import collections
+import json
+import threading
+import time
+import typing as ty
+
+from kupfer.support import pretty
+
+if ty.TYPE_CHECKING:
+    from kupfer.obj.base import Action, Leaf
+
+__all__ = (
+    "Span",
+    "export_json",
+    "format_spans",
+    "get_spans",
+    "mark_pending",
+    "record",
+    "record_late",
+)
+
+# max number of stored spans
+_MAX_SPANS: ty.Final = 500
+# max number of remembered commands that may post late results
+_MAX_PENDING: ty.Final = 100
+# spans longer than this are logged (in debug mode)
+_SLOW_SPAN_S: ty.Final = 0.1
+
+# span kinds
+SYNC: ty.Final = "sync"
+ASYNC: ty.Final = "async"
+TASK: ty.Final = "task"
+LATE_RESULT: ty.Final = "late-result"
+LATE_ERROR: ty.Final = "late-error"
+
+
+class Span(ty.NamedTuple):
+    command_id: int
+    # one of: sync, async, task, late-result, late-error
+    kind: str
+    obj_type: str
+    action: str
+    iobj_type: str | None
+    # wall clock time of span start
+    start: float
+    # duration in seconds; for late results and errors - time since
+    # command start
+    duration: float
+    error: str | None = None
+
+
+_SPANS: collections.deque[Span] = collections.deque(maxlen=_MAX_SPANS)
+# command id -> (wall clock start, monotonic start) of recent commands
+_PENDING: collections.OrderedDict[int, tuple[float, float]] = (
+    collections.OrderedDict()
+)
+_LOCK = threading.Lock()
+
+
+def _type_name(obj: ty.Any) -> str:
+    otype = type(obj)
+    return f"{otype.__module__}.{otype.__qualname__}"
+
+
+def record(
+    command_id: int,
+    kind: str,
+    obj: Leaf,
+    action: Action,
+    iobj: Leaf | None,
+    *,
+    start: float,
+    duration: float,
+    error: BaseException | str | None = None,
+) -> Span:
+    """Record span of command (`obj`, `action`, `iobj`)."""
+    span = Span(
+        command_id,
+        kind,
+        _type_name(obj),
+        repr(action),
+        _type_name(iobj) if iobj is not None else None,
+        start,
+        duration,
+        str(error) if error is not None else None,
+    )
+    with _LOCK:
+        _SPANS.append(span)
+
+    if duration >= _SLOW_SPAN_S:
+        pretty.print_debug(
+            __name__,
+            f"Slow {kind} of {span.action} on {span.obj_type}:",
+            f"{duration:.3f}s",
+        )
+
+    return span
+
+
+def mark_pending(command_id: int, start: float, start_mono: float) -> None:
+    """Remember start of command that may post late results."""
+    with _LOCK:
+        _PENDING[command_id] = (start, start_mono)
+        _PENDING.move_to_end(command_id)
+        while len(_PENDING) > _MAX_PENDING:
+            _PENDING.popitem(last=False)
+
+
+def record_late(
+    command_id: int,
+    kind: str,
+    obj: Leaf,
+    action: Action,
+    iobj: Leaf | None,
+    *,
+    error: BaseException | str | None = None,
+) -> Span:
+    """Record late result or error of command; duration is counted from
+    the command start (when known)."""
+    with _LOCK:
+        start, start_mono = _PENDING.get(command_id, (0.0, 0.0))
+
+    if start:
+        duration = time.monotonic() - start_mono
+    else:
+        start, duration = time.time(), 0.0
+
+    return record(
+        command_id,
+        kind,
+        obj,
+        action,
+        iobj,
+        start=start,
+        duration=duration,
+        error=error,
+    )
+
+
+def get_spans() -> list[Span]:
+    """Get recorded spans, oldest first."""
+    with _LOCK:
+        return list(_SPANS)
+
+
+def export_json() -> str:
+    return json.dumps([span._asdict() for span in get_spans()])
+
+
+def format_spans(spans: ty.Iterable[Span] | None = None) -> str:
+    """Format `spans` (all recorded by default) as text: list of spans and
+    summary of the slowest actions."""
+    spans = get_spans() if spans is None else list(spans)
+    lines = []
+    for span in spans:
+        tstamp = time.strftime("%H:%M:%S", time.localtime(span.start))
+        line = (
+            f"{tstamp} #{span.command_id:<4} {span.kind:<11} "
+            f"{span.duration * 1000:9.1f} ms  {span.action} "
+            f"({span.obj_type}"
+        )
+        if span.iobj_type:
+            line += f", {span.iobj_type}"
+
+        line += ")"
+        if span.error:
+            line += f"  ERROR: {span.error}"
+
+        lines.append(line)
+
+    # action -> (count, total, max)
+    summary: dict[str, list[float]] = {}
+    for span in spans:
+        if span.kind in (SYNC, ASYNC, TASK):
+            stat = summary.setdefault(span.action, [0, 0.0, 0.0])
+            stat[0] += 1
+            stat[1] += span.duration
+            stat[2] = max(stat[2], span.duration)
+
+    if summary:
+        lines.append("")
+        lines.append("Slowest actions (count, total ms, max ms):")
+        for action, (count, total, maximum) in sorted(
+            summary.items(), key=lambda i: i[1][2], reverse=True
+        )[:20]:
+            lines.append(
+                f"{int(count):5} {total * 1000:10.1f} {maximum * 1000:10.1f}"
+                f"  {action}"
+            )
+
+    return "\n".join(lines)
@@ -0,0 +1,186 @@
+"""
+Warm-up of the catalog after the main window is displayed.
+
+Leaves of toplevel sources are prepared for searching and icons of the most
+used objects are loaded, so the first search does not pay for cold sources
+and icons. Sources not loaded yet are loaded in the rescanner thread and
+prepared when they are loaded.
+
+Warm-up is run in short steps when main loop is idle (with low priority),
+so it never delays handling of user input, and it is postponed on each
+search.
+"""
+
+from __future__ import annotations
+
+import time
+import typing as ty
+
+from gi.repository import GLib
+
+from kupfer.core import learn, settings
+from kupfer.core.sources import get_source_controller
+from kupfer.support import itertools, pretty, scheduler
+
+if ty.TYPE_CHECKING:
+    from kupfer.obj.base import Leaf, Source
+
+__all__ = ("WarmUp",)
+
+# max duration of one warm-up step
+_STEP_TIME_S: ty.Final = 0.008
+# pause after user interaction before warm-up is resumed
+_POSTPONE_S: ty.Final = 1
+# number of the most used objects for which icons are loaded
+_MOST_USED_COUNT: ty.Final = 50
+# number of leaves processed between time checks
+_LEAVES_CHUNK: ty.Final = 50
+
+
+class WarmUp(pretty.OutputMixin):
+    """Incremental, interruptible warm-up of the catalog."""
+
+    def __init__(self) -> None:
+        self._jobs: ty.Iterator[None] | None = None
+        self._idle_id = 0
+        self._timer = scheduler.Timer()
+        # sources loaded in background for current warm-up
+        self._loading: ty.Collection[Source] | None = None
+
+    def start(self) -> None:
+        """Start (or restart) warm-up."""
+        self.stop()
+        self._jobs = self._warm_up()
+        self._schedule()
+
+    def stop(self) -> None:
+        self._timer.invalidate()
+        self._unschedule()
+        self._jobs = None
+        self._loading = None
+
+    def postpone(self) -> None:
+        """Pause warm-up on user activity; it is resumed after a while."""
+        if self._jobs is None:
+            return
+
+        self._unschedule()
+        self._timer.set(_POSTPONE_S, self._schedule)
+
+    def _schedule(self) -> None:
+        if not self._idle_id:
+            self._idle_id = GLib.idle_add(
+                self._step, priority=GLib.PRIORITY_LOW
+            )
+
+    def _unschedule(self) -> None:
+        if self._idle_id:
+            GLib.source_remove(self._idle_id)
+            self._idle_id = 0
+
+    def _step(self) -> bool:
+        assert self._jobs
+        deadline = time.monotonic() + _STEP_TIME_S
+        try:
+            while time.monotonic() < deadline:
+                next(self._jobs)
+
+        except StopIteration:
+            pass
+        except Exception:
+            self.output_exc()
+        else:
+            return True
+
+        self._jobs = None
+        self._idle_id = 0
+        return False
+
+    def _on_loaded(self, sources: ty.Collection[Source]) -> None:
+        if sources is not self._loading:
+            # warm-up was stopped or started again
+            return
+
+        self._loading = None
+        jobs = self._prepare_sources(sources)
+        self._jobs = _chain(self._jobs, jobs) if self._jobs else jobs
+        if not self._timer.is_valid():
+            self._schedule()
+
+    def _warm_up(self) -> ty.Iterator[None]:
+        sctl = get_source_controller()
+        sources = itertools.unique_iterator(
+            src.toplevel_source() for src in list(sctl.firstlevel)
+        )
+        loaded: list[Source] = []
+        cold: list[Source] = []
+        for src in sources:
+            # dynamic sources are loaded again on each access
+            if src.is_dynamic():
+                continue
+
+            # items not loaded yet are loaded in rescanner thread, so main
+            # loop is not blocked by get_items()
+            if src.cached_items is None:
+                cold.append(src)
+            else:
+                loaded.append(src)
+
+        if cold:
+            self._loading = cold
+            sctl.load_in_background(cold, self._on_loaded)
+
+        yield from self._prepare_sources(loaded)
+
+    def _prepare_sources(
+        self, sources: ty.Iterable[Source]
+    ) -> ty.Iterator[None]:
+        start = time.monotonic()
+        wanted = set(learn.get_most_used(_MOST_USED_COUNT))
+        most_used: dict[str, Leaf] = {}
+        count = 0
+        for src in sources:
+            # items are loaded lazily when cached as iterator
+            leaves = src.cached_items or ()
+            count += yield from _prepare_leaves(leaves, wanted, most_used)
+
+        setctl = settings.get_settings_controller()
+        sizes = (
+            setctl.get_config_int("Appearance", "icon_small_size"),
+            setctl.get_config_int("Appearance", "icon_large_size"),
+        )
+        for leaf in most_used.values():
+            for size in sizes:
+                leaf.get_pixbuf(size)
+                yield
+
+        self.output_debug(
+            f"Warm-up step finished: {count} leaves, {len(most_used)} icons "
+            f"in {time.monotonic() - start:.3f}s"
+        )
+
+
+def _chain(*jobs: ty.Iterator[None]) -> ty.Iterator[None]:
+    for job in jobs:
+        yield from job
+
+
+def _prepare_leaves(
+    leaves: ty.Iterable[Leaf], wanted: set[str], most_used: dict[str, Leaf]
+) -> ty.Generator[None, None, int]:
+    """Prepare @leaves for searching; collect @wanted leaves into
+    @most_used. Return number of processed leaves."""
+    count = 0
+    for leaf in leaves:
+        # representation and name are used for scoring; repr is cached by
+        # object
+        str(leaf)
+        if (rep := repr(leaf)) in wanted:
+            most_used.setdefault(rep, leaf)
+
+        count += 1
+        if count % _LEAVES_CHUNK == 0:
+            yield
+
+    yield
+    return count
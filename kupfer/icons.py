@@ -36,9 +36,19 @@ __all__ = (
     "parse_load_icon_list",
 )
 
+
+def _pixbuf_weight(pixbuf: GdkPixbuf.Pixbuf) -> int:
+    """Approximate size of pixbuf data in bytes."""
+    return int(pixbuf.get_rowstride() * pixbuf.get_height())
+
+
+# icons are cached by size of pixbuf data, so few large icons do not push
+# out many small ones
 _ICON_CACHE: ty.Final[
-    datatools.LruCache[tuple[int, str], GdkPixbuf.Pixbuf]
-] = datatools.LruCache(128, name="_ICON_CACHE")
+    datatools.WeightedLruCache[tuple[int, str], GdkPixbuf.Pixbuf]
+] = datatools.WeightedLruCache(
+    8 * 1024 * 1024, weight=_pixbuf_weight, name="_ICON_CACHE"
+)
 
 _LARGE_SZ = 128
 _SMALL_SZ = 24
@@ -198,8 +208,13 @@ class ComposedIcon:
     Icon itself is rendered only once.
     """
 
-    _cache: datatools.LruCache[tuple[ty.Any, ...], GdkPixbuf.Pixbuf | None] = (
-        datatools.LruCache(32, name="ComposedIcon cache")
+    _cache: datatools.WeightedLruCache[
+        tuple[ty.Any, ...], GdkPixbuf.Pixbuf | None
+    ] = datatools.WeightedLruCache(
+        2 * 1024 * 1024,
+        weight=_pixbuf_weight,
+        negative_ttl=60,
+        name="ComposedIcon cache",
     )
 
     __slots__ = (
@@ -341,8 +356,9 @@ def get_pixbuf_from_file(
     return None
 
 
-_GICON_CACHE: datatools.LruCache[str, GIcon | None] = datatools.LruCache(
-    128, name="_GICON_CACHE"
+# missing files are remembered only for a while, they may be created later
+_GICON_CACHE: datatools.WeightedLruCache[str, GIcon | None] = (
+    datatools.WeightedLruCache(256, negative_ttl=60, name="_GICON_CACHE")
 )
 
 
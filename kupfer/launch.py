@@ -6,7 +6,7 @@ import signal
 import sys
 import typing as ty
 import urllib.parse
-from collections import defaultdict
+from collections import defaultdict, deque
 from contextlib import suppress
 from pathlib import Path
 from time import time
@@ -170,9 +170,23 @@ class ApplicationsMatcherService(pretty.OutputMixin):
 
         return cls._instance
 
+    # how long wait for window of launched application
+    launch_timeout_s = 30
+
     def __init__(self):
         self.register: dict[str, str] = {}
-        self._get_wnck_screen_windows_stacked()
+        # index of windows (by xid) by application name and res_class
+        self._windows_by_name: dict[str, dict[int, Wnck.Window]] = {}
+        # index of windows by lowercased application name and res_class
+        self._windows_by_lname: dict[str, dict[int, Wnck.Window]] = {}
+        self._windows_by_pid: dict[int, dict[int, Wnck.Window]] = {}
+        # xid -> (names, pid) the window is indexed by
+        self._window_keys: dict[int, tuple[tuple[str, ...], int]] = {}
+        # xid -> position in stacking order (bottommost first)
+        self._stacking: dict[int, int] = {}
+        # pid -> (app_id, deadline) of launched applications without window
+        self._launched: dict[int, tuple[str, float]] = {}
+        self._init_window_index()
         scheduler.get_scheduler().connect("finish", self._on_finish)
         self._load()
 
@@ -227,6 +241,115 @@ class ApplicationsMatcherService(pretty.OutputMixin):
         )
         return True
 
+    def _init_window_index(self) -> None:
+        if _WAYLAND or not Wnck:
+            return
+
+        if (screen := Wnck.Screen.get_default()) is None:
+            return
+
+        # first call "primes" the event loop and usually comes back empty;
+        # the rest will come with window-opened signals
+        for win in screen.get_windows_stacked():
+            self._add_window(win)
+
+        self._on_stacking_changed(screen)
+        screen.connect("window-opened", self._on_window_opened)
+        screen.connect("window-closed", self._on_window_closed)
+        screen.connect("window-stacking-changed", self._on_stacking_changed)
+
+    @staticmethod
+    def _window_names(window: "Wnck.Window") -> tuple[str, ...]:
+        """Return application name and res_class of `window` or empty tuple
+        when any of them is not available."""
+        application = window.get_application()
+        if not application:
+            return ()
+
+        cgr = window.get_class_group()
+        if not cgr or not (res_class := cgr.get_res_class()):
+            return ()
+
+        return (application.get_name(), res_class)
+
+    @staticmethod
+    def _window_pid(window: "Wnck.Window") -> int:
+        application = window.get_application()
+        pid: int = (application and application.get_pid()) or window.get_pid()
+        return pid
+
+    def _index_window(self, window: "Wnck.Window") -> None:
+        xid = window.get_xid()
+        names = self._window_names(window)
+        pid = self._window_pid(window)
+        self._window_keys[xid] = (names, pid)
+        for name in names:
+            self._windows_by_name.setdefault(name, {})[xid] = window
+            self._windows_by_lname.setdefault(name.lower(), {})[xid] = window
+
+        if pid:
+            self._windows_by_pid.setdefault(pid, {})[xid] = window
+
+    def _unindex_window(self, xid: int) -> None:
+        names, pid = self._window_keys.pop(xid, ((), 0))
+
+        def remove(
+            index: dict[ty.Any, dict[int, Wnck.Window]], key: ty.Any
+        ) -> None:
+            if (windows := index.get(key)) is not None:
+                windows.pop(xid, None)
+                if not windows:
+                    del index[key]
+
+        for name in names:
+            remove(self._windows_by_name, name)
+            remove(self._windows_by_lname, name.lower())
+
+        remove(self._windows_by_pid, pid)
+
+    def _add_window(self, window: "Wnck.Window") -> None:
+        xid = window.get_xid()
+        if xid in self._window_keys:
+            return
+
+        self._index_window(window)
+        # new windows are opened on top
+        self._stacking[xid] = max(self._stacking.values(), default=-1) + 1
+        window.connect("class-changed", self._on_window_class_changed)
+
+    def _on_window_opened(
+        self, _screen: "Wnck.Screen", window: "Wnck.Window"
+    ) -> None:
+        self._add_window(window)
+        if not self._launched:
+            return
+
+        pid = self._window_pid(window)
+        if launched := self._launched.pop(pid, None):
+            app_id, deadline = launched
+            if time() <= deadline and not self._has_match(app_id):
+                self.output_debug("Found window for application", app_id)
+                self._store(app_id, window)
+
+    def _on_window_closed(
+        self, _screen: "Wnck.Screen", window: "Wnck.Window"
+    ) -> None:
+        xid = window.get_xid()
+        self._unindex_window(xid)
+        self._stacking.pop(xid, None)
+
+    def _on_window_class_changed(self, window: "Wnck.Window") -> None:
+        xid = window.get_xid()
+        if xid in self._window_keys:
+            self._unindex_window(xid)
+            self._index_window(window)
+
+    def _on_stacking_changed(self, screen: "Wnck.Screen") -> None:
+        self._stacking = {
+            win.get_xid(): idx
+            for idx, win in enumerate(screen.get_windows_stacked())
+        }
+
     def _store(self, app_id: str, window: "Wnck.Window") -> None:
         application = window.get_application()
         res_class = window.get_class_group().get_res_class()
@@ -244,27 +367,6 @@ class ApplicationsMatcherService(pretty.OutputMixin):
     def _has_match(self, app_id: str | None) -> bool:
         return app_id in self.register
 
-    def _is_match(self, app_id: str, window: "Wnck.Window") -> bool:
-        application = window.get_application()
-        if not application:
-            self.output_debug("no application for window", window)
-            return False
-
-        cgr = window.get_class_group()
-        if not cgr:
-            self.output_debug("no regclass for window", window)
-            return False
-
-        res_class = cgr.get_res_class()
-        if not res_class:
-            self.output_debug("no res_class for window", window)
-            return False
-
-        if self.register.get(app_id) in (application.get_name(), res_class):
-            return True
-
-        return app_id in (application.get_name().lower(), res_class.lower())
-
     def launched_application(self, app_id: str, pid: int) -> None:
         if not app_id:
             self.output_debug("launched_application no app_id")
@@ -273,29 +375,18 @@ class ApplicationsMatcherService(pretty.OutputMixin):
         if self._has_match(app_id):
             return
 
-        timeout = time() + 15
-        GLib.timeout_add_seconds(
-            2, self._find_application, app_id, pid, timeout
-        )
-        # and once later
-        GLib.timeout_add_seconds(
-            30, self._find_application, app_id, pid, timeout
-        )
-
-    def _find_application(self, app_id: str, pid: int, timeout: float) -> bool:
-        if self._has_match(app_id):
-            return False
-
-        self.output_debug("Looking for window for application", app_id)
-        for win in self._get_wnck_screen_windows_stacked():
-            app = win.get_application()
-            if app and pid == (app.get_pid() or win.get_pid()):
-                self.output_debug("Found window for application", app_id, win)
-                self._store(app_id, win)
-                return False
+        if windows := self._windows_by_pid.get(pid):
+            self._store(app_id, next(iter(windows.values())))
+            return
 
-        self.output_debug("Not found window for application", app_id)
-        return time() <= timeout
+        # wait for window-opened signal; forget expired launches
+        now = time()
+        self._launched = {
+            lpid: launched
+            for lpid, launched in self._launched.items()
+            if launched[1] >= now
+        }
+        self._launched[pid] = (app_id, now + self.launch_timeout_s)
 
     def application_name(self, app_id: str | None) -> str | None:
         return self.register.get(app_id) if app_id else None
@@ -305,27 +396,37 @@ class ApplicationsMatcherService(pretty.OutputMixin):
             self.output_debug("application_is_running empty app_id")
             return False
 
-        for _win in self._get_application_windows(app_id):
+        for _win in self._find_application_windows(app_id):
             self.output_debug("application is running", app_id)
             return True
 
         self.output_debug("application is NOT running", app_id)
         return False
 
-    def _get_application_windows(
+    def _find_application_windows(
         self, app_id: str
     ) -> ty.Iterator["Wnck.Window"]:
-        for win in self._get_wnck_screen_windows_stacked():
-            if (
-                win
-                and win.get_application()
-                and self._is_match(app_id, win)
-                and win.get_window_type() == Wnck.WindowType.NORMAL
-            ):
+        """Find normal windows of application `app_id` (in any order)."""
+        windows = self._windows_by_lname.get(app_id, {})
+        if (name := self.register.get(app_id)) and (
+            by_name := self._windows_by_name.get(name)
+        ):
+            windows = {**by_name, **windows}
+
+        for win in windows.values():
+            if win.get_window_type() == Wnck.WindowType.NORMAL:
                 yield win
 
+    def _get_application_windows(self, app_id: str) -> list["Wnck.Window"]:
+        """Get normal windows of application `app_id` in stacking order."""
+        stacking = self._stacking
+        return sorted(
+            self._find_application_windows(app_id),
+            key=lambda win: stacking.get(win.get_xid(), -1),
+        )
+
     def application_to_front(self, app_id: str) -> None:
-        application_windows = list(self._get_application_windows(app_id))
+        application_windows = self._get_application_windows(app_id)
         self.output_debug(
             "application_to_front", "windows", application_windows
         )
@@ -492,6 +593,62 @@ def _split_string(inp: bytes, length: int) -> ty.Iterator[bytes]:
         inp = inp[length:]
 
 
+class _OutputBuffer:
+    """Buffer for command output limited to `max_size` bytes.
+
+    When `keep_tail` is True, the last `max_size` bytes are kept, otherwise
+    the first ones.
+    """
+
+    def __init__(self, max_size: int | None, keep_tail: bool) -> None:
+        self.chunks: deque[bytes] = deque()
+        self.size = 0
+        self.max_size = max_size
+        self.keep_tail = keep_tail
+        self.truncated = False
+
+    def append(self, data: bytes) -> bool:
+        """Add `data` to buffer. Return False when data was truncated."""
+        max_size = self.max_size
+        if max_size is None:
+            self.chunks.append(data)
+            self.size += len(data)
+            return True
+
+        if not self.keep_tail:
+            if (free := max_size - self.size) < len(data):
+                data = data[: max(free, 0)]
+                self.truncated = True
+
+            if data:
+                self.chunks.append(data)
+                self.size += len(data)
+
+            return not self.truncated
+
+        self.chunks.append(data)
+        self.size += len(data)
+        chunks = self.chunks
+        while self.size > max_size:
+            self.truncated = True
+            excess = self.size - max_size
+            first = chunks[0]
+            if len(first) <= excess:
+                chunks.popleft()
+                self.size -= len(first)
+            else:
+                chunks[0] = first[excess:]
+                self.size -= excess
+
+        return not self.truncated
+
+    def getvalue(self) -> bytes:
+        return b"".join(self.chunks)
+
+
+OutputCallback = ty.Callable[["AsyncCommand", bytes, bool], None]
+
+
 class AsyncCommand(pretty.OutputMixin):
     """Run a command asynchronously (using the GLib mainloop).
 
@@ -501,36 +658,74 @@ class AsyncCommand(pretty.OutputMixin):
 
     If @timeout_s is None, no timeout is used
 
-    If stdin is a byte string, it is supplied on the command's stdin.
+    If stdin is a byte string (or iterable of byte strings), it is supplied
+    on the command's stdin. Data is written only when the child is ready to
+    read it, and iterable is consumed lazily.
 
     If env is None, command will inherit the parent's environment.
 
     finish_callback -> (AsyncCommand, stdout_output, stderr_output)
 
+    If @output_callback is given, it is called with (AsyncCommand, data,
+    is_stderr) for every chunk of output as it arrives; with @line_buffered
+    data are complete lines.
+
+    @max_output limits number of bytes of stdout and stderr (each) kept in
+    memory and passed to finish_callback; @truncate policy defines what
+    happens when limit is exceeded:
+        TRUNCATE_HEAD - keep first bytes, drop the rest
+        TRUNCATE_TAIL - keep last bytes
+        TRUNCATE_KILL - keep first bytes and terminate the command
+
     Attributes:
     self.exit_status  Set after process exited
     self.finished     bool
+    self.truncated    bool, set when any output was truncated
     """
 
     # the maximum input (bytes) we'll read in one shot (one io_callback)
     max_input_buf = 512 * 1024
+    # the maximum size of chunk written to stdin at once
+    max_stdin_chunk = 64 * 1024
+
+    TRUNCATE_HEAD = "head"
+    TRUNCATE_TAIL = "tail"
+    TRUNCATE_KILL = "kill"
 
+    # pylint: disable=too-many-arguments
     def __init__(
         self,
         argv: list[str],
         finish_callback: ty.Callable[[AsyncCommand, bytes, bytes], None],
         timeout_s: int | None,
-        stdin: bytes | None = None,
+        stdin: bytes | ty.Iterable[bytes] | None = None,
         env: ty.Any = None,
+        *,
+        output_callback: OutputCallback | None = None,
+        line_buffered: bool = False,
+        max_output: int | None = None,
+        truncate: str = TRUNCATE_HEAD,
     ) -> None:
-        self.stdout: list[bytes] = []
-        self.stderr: list[bytes] = []
-        self.stdin: list[bytes] = []
+        keep_tail = truncate == self.TRUNCATE_TAIL
+        self.stdout = _OutputBuffer(max_output, keep_tail)
+        self.stderr = _OutputBuffer(max_output, keep_tail)
         self.timeout = False
         self.killed = False
         self.finished = False
+        self.truncated = False
         self.finish_callback = finish_callback
+        self.output_callback = output_callback
+        self.line_buffered = line_buffered
+        self.truncate = truncate
         self.exit_status: int | None = None
+        self._exited = False
+        # fd -> (source id, buffer)
+        self._out_watches: dict[int, tuple[int, _OutputBuffer]] = {}
+        # partial lines for line_buffered mode by fd
+        self._partial: dict[int, bytes] = {}
+        self._stdin_iter: ty.Iterator[bytes] | None = None
+        self._stdin_pending = b""
+        self._stdin_watch: tuple[int, int] | None = None
 
         self.output_debug("AsyncCommand:", argv)
 
@@ -549,71 +744,190 @@ class AsyncCommand(pretty.OutputMixin):
         )
 
         if stdin:
-            self.stdin = list(_split_string(stdin, self.max_input_buf))
+            if isinstance(stdin, bytes):
+                stdin = _split_string(stdin, self.max_stdin_chunk)
+
+            self._stdin_iter = iter(stdin)
+            os.set_blocking(stdin_fd, False)
             in_io_flags = (
                 GLib.IO_OUT | GLib.IO_ERR | GLib.IO_HUP | GLib.IO_NVAL
             )
-            GLib.io_add_watch(
-                stdin_fd, in_io_flags, self._in_io_callback, self.stdin
+            source_id = GLib.io_add_watch(
+                stdin_fd, in_io_flags, self._in_io_callback
             )
+            self._stdin_watch = (stdin_fd, source_id)
         else:
             os.close(stdin_fd)
 
         io_flags = GLib.IO_IN | GLib.IO_ERR | GLib.IO_HUP | GLib.IO_NVAL
-        GLib.io_add_watch(stdout_fd, io_flags, self._io_callback, self.stdout)
-        GLib.io_add_watch(stderr_fd, io_flags, self._io_callback, self.stderr)
+        for out_fd, buf in (
+            (stdout_fd, self.stdout),
+            (stderr_fd, self.stderr),
+        ):
+            os.set_blocking(out_fd, False)
+            source_id = GLib.io_add_watch(out_fd, io_flags, self._io_callback)
+            self._out_watches[out_fd] = (source_id, buf)
+
+        self._stderr_fd = stderr_fd
         self.pid = pid
         GLib.child_watch_add(pid, self._child_callback)
         if timeout_s is not None:
             GLib.timeout_add_seconds(timeout_s, self._timeout_callback)
 
-    def _io_callback(
-        self, sourcefd: int, condition: int, databuf: list[bytes]
-    ) -> bool:
-        if condition & GLib.IO_IN:
-            databuf.append(os.read(sourcefd, self.max_input_buf))
-            return True
+    def _read(self, sourcefd: int) -> bytes | None:
+        """Read available data from `sourcefd`.
+        Return data read, empty bytes on end of file, or None when there is
+        nothing to read now."""
+        try:
+            data = os.read(sourcefd, self.max_input_buf)
+        except BlockingIOError:
+            return None
+        except OSError:
+            return b""
+
+        if not data:
+            return data
+
+        _source_id, buf = self._out_watches[sourcefd]
+        if not buf.append(data) and not self.truncated:
+            self.truncated = True
+            self.output_debug("Output truncated for", self.pid)
+            if self.truncate == self.TRUNCATE_KILL:
+                self._terminate()
+
+        self._deliver(sourcefd, data)
+        return data
+
+    def _deliver(self, sourcefd: int, data: bytes) -> None:
+        if not self.output_callback:
+            return
+
+        is_stderr = sourcefd == self._stderr_fd
+        if not self.line_buffered:
+            self.output_callback(self, data, is_stderr)
+            return
+
+        data = self._partial.pop(sourcefd, b"") + data
+        lines = data.splitlines(keepends=True)
+        # keep incomplete line unless it is too long
+        if (
+            lines
+            and not lines[-1].endswith((b"\n", b"\r"))
+            and len(lines[-1]) < self.max_input_buf
+        ):
+            self._partial[sourcefd] = lines.pop()
+
+        for line in lines:
+            self.output_callback(self, line, is_stderr)
+
+    def _close_output(self, sourcefd: int, remove_watch: bool = True) -> None:
+        source_id, _buf = self._out_watches.pop(sourcefd)
+        if remove_watch:
+            GLib.source_remove(source_id)
+
+        with suppress(OSError):
+            os.close(sourcefd)
+
+        if self.output_callback and (rest := self._partial.pop(sourcefd, b"")):
+            self.output_callback(self, rest, sourcefd == self._stderr_fd)
 
+        self._maybe_finish()
+
+    def _io_callback(self, sourcefd: int, condition: int) -> bool:
+        if condition & (GLib.IO_IN | GLib.IO_HUP):
+            data = self._read(sourcefd)
+            if data is None or data:
+                return True
+
+        self._close_output(sourcefd, remove_watch=False)
         return False
 
-    def _in_io_callback(
-        self, sourcefd: int, condition: int, databuf: list[bytes]
-    ) -> bool:
-        """write to child's stdin"""
-        if condition & GLib.IO_OUT:
-            if not databuf:
+    def _close_stdin(self) -> None:
+        if self._stdin_watch:
+            sourcefd, source_id = self._stdin_watch
+            self._stdin_watch = None
+            GLib.source_remove(source_id)
+            with suppress(OSError):
                 os.close(sourcefd)
-                return False
 
-            data = databuf.pop(0)
-            written = os.write(sourcefd, data)
-            if written < len(data):
-                databuf.insert(0, data[written:])
+        self._stdin_iter = None
+        self._stdin_pending = b""
 
+    def _in_io_callback(self, sourcefd: int, condition: int) -> bool:
+        """write to child's stdin"""
+        if not condition & GLib.IO_OUT or not self._stdin_iter:
+            self._close_stdin()
+            return False
+
+        if not self._stdin_pending:
+            self._stdin_pending = next(self._stdin_iter, b"")
+            if not self._stdin_pending:
+                self._close_stdin()
+                return False
+
+        try:
+            written = os.write(sourcefd, self._stdin_pending)
+        except BlockingIOError:
             return True
+        except OSError:
+            # child closed stdin
+            self._close_stdin()
+            return False
 
-        return False
+        self._stdin_pending = self._stdin_pending[written:]
+        return True
 
     def _child_callback(self, pid: int, condition: int) -> None:
         # @condition is the &status field of waitpid(2) (C library)
         self.exit_status = os.WEXITSTATUS(condition)
+        self._exited = True
+        self._close_stdin()
+        # read what is left in pipes; do not wait for processes that
+        # inherited them
+        for sourcefd in list(self._out_watches):
+            while self._read(sourcefd):
+                pass
+
+            self._close_output(sourcefd)
+
+        self._maybe_finish()
+
+    def _maybe_finish(self) -> None:
+        if self.finished or not self._exited or self._out_watches:
+            return
+
         self.finished = True
         self.finish_callback(
-            self, b"".join(self.stdout), b"".join(self.stderr)
+            self, self.stdout.getvalue(), self.stderr.getvalue()
         )
 
+    def _signal(self, signum: int) -> bool:
+        """Send `signum` to the child if it is not reaped yet (its pid may
+        be reused after that)."""
+        if self._exited:
+            return False
+
+        try:
+            os.kill(self.pid, signum)
+        except ProcessLookupError:
+            return False
+
+        return True
+
+    def _terminate(self) -> None:
+        if self._signal(signal.SIGTERM):
+            GLib.timeout_add_seconds(2, self._kill_callback)
+
     def _timeout_callback(self) -> None:
         "send term signal on timeout"
-        if not self.finished:
+        if not self.finished and not self._exited:
             self.timeout = True
-            os.kill(self.pid, signal.SIGTERM)
-            GLib.timeout_add_seconds(2, self._kill_callback)
+            self._terminate()
 
     def _kill_callback(self) -> None:
         "Last resort, send kill signal"
-        if not self.finished:
+        if self._signal(signal.SIGKILL):
             self.killed = True
-            os.kill(self.pid, signal.SIGKILL)
 
 
 def spawn_terminal(
@@ -286,6 +286,21 @@ class Action(KupferObject):
         """
         return False
 
+    def is_parallel_safe(self) -> bool:
+        """Return ``True`` if ``activate`` may be called concurrently from
+        worker threads.
+
+        This is used when action is activated with multiple objects and does
+        not define ``activate_multiple``; then each (object, indirect object)
+        pair is activated in thread pool and results are posted as late
+        result. Such action must not touch GTK nor call ``delegated_run``;
+        ``ctx.register_late_result`` and ``ctx.register_late_error`` may be
+        used (they are passed to the main thread), and
+        ``ctx.in_worker_thread`` tells that the action may block until its
+        work is done.
+        """
+        return False
+
     def item_types(self) -> ty.Iterable[ty.Type[Leaf]]:
         """Yield types this action may apply to. This is used only
         when this action is specified in __kupfer_actions__ to "decorate"
@@ -13,13 +13,13 @@ import itertools
 import time
 import typing as ty
 import weakref
-from collections import defaultdict
 
 from gi.repository import Gdk, Gtk
 
 from kupfer.obj.base import Action, Leaf, Source
 from kupfer.support import itertools as kitertools
 from kupfer.support import kupferstring
+from kupfer.support.datatools import DisjointSet
 
 if ty.TYPE_CHECKING:
     from gettext import gettext as _
@@ -98,88 +98,158 @@ class GroupingLeaf(Leaf):
             yield CopySlotAction(key, val)
 
 
-_Groups = dict[tuple[str, ty.Any], set[GroupingLeaf]]
+_GroupKey = tuple[str, ty.Any]
 _NonGroupLeaves = list[Leaf]
 
 
+class _SourceLeaves(ty.NamedTuple):
+    """Leaves of one member source of GroupingSource."""
+
+    # object returned by source get_leaves; used to detect changes
+    token: ty.Any
+    # grouping leaves with theirs (slot, value) keys
+    grouping: list[tuple[GroupingLeaf, list[_GroupKey]]]
+    non_grouping: _NonGroupLeaves
+
+
 class GroupingSource(Source):
+    """Source that groups GroupingLeaves from @sources by (slot, value).
+
+    Groups are computed with disjoint-set structure. Leaves of member sources
+    are re-read only when source return new leaves, and group leaders are
+    reused while members of group do not change.
+    """
+
     def __init__(self, name: str, sources: list[Source]) -> None:
         Source.__init__(self, name)
         self.sources = sources
+        self._init_groups()
 
-    def _get_groups(
-        self, force_update: bool
-    ) -> tuple[_Groups, _NonGroupLeaves]:
-        groups: _Groups = defaultdict(set)
+    def _init_groups(self) -> None:
+        # leaves of member sources by id of source (sources may be equal)
+        self._source_leaves: dict[int, _SourceLeaves] = {}
+        # group leaders by ids of group members
+        self._leaders: dict[frozenset[int], Leaf] = {}
+        self._grouped_leaves: list[Leaf] | None = None
+
+    def __getstate__(self) -> dict[str, ty.Any]:
+        state = self.__dict__.copy()
+        for key in ("_source_leaves", "_leaders", "_grouped_leaves"):
+            state.pop(key, None)
+
+        return state
+
+    def __setstate__(self, state: dict[str, ty.Any]) -> None:
+        self.__dict__.update(state)
+        self._init_groups()
+
+    def _read_source(self, leaves: ty.Iterable[Leaf] | None) -> _SourceLeaves:
+        grouping = []
         non_group_leaves: list[Leaf] = []
+        for leaf in leaves or ():
+            try:
+                slots = leaf.slots()  # type: ignore
+            except AttributeError:
+                # Let through Non-grouping leaves
+                non_group_leaves.append(leaf)
+                continue
 
+            assert isinstance(leaf, GroupingLeaf)
+
+            if not leaf.grouping_slots:
+                self.output_error(
+                    "GroupingLeaf has no grouping slots", repr(leaf)
+                )
+                continue
+
+            if keys := [
+                (slot, value)
+                for slot in leaf.grouping_slots
+                if (value := slots.get(slot))
+            ]:
+                grouping.append((leaf, keys))
+
+        return _SourceLeaves(leaves, grouping, non_group_leaves)
+
+    def _update_sources(self, force_update: bool) -> bool:
+        """Read leaves from member sources; return True if any changed."""
+        changed = False
+        source_leaves = {}
         for src in self.sources:
             leaves = Source.get_leaves(src, force_update)
-            for leaf in leaves or ():
-                try:
-                    slots = leaf.slots()  # type: ignore
-                except AttributeError:
-                    # Let through Non-grouping leaves
-                    non_group_leaves.append(leaf)
-                else:
-                    assert isinstance(leaf, GroupingLeaf)
-
-                    if not leaf.grouping_slots:
-                        self.output_error(
-                            "GroupingLeaf has no grouping slots", repr(leaf)
-                        )
-                        continue
-
-                    for slot in leaf.grouping_slots:
-                        if value := slots.get(slot):
-                            groups[(slot, value)].add(leaf)
-
-        return groups, non_group_leaves
-
-    def _merge_groups(self, groups: _Groups) -> set[tuple[str, ty.Any]]:
-        redundant_keys = set()
-
-        def merge_groups(key1, key2):
-            if groups[key1] is not groups[key2]:
-                groups[key1].update(groups[key2])
-                groups[key2] = groups[key1]
-                redundant_keys.add(key2)
-
-        # Find all (slot, value) combinations that have more than one leaf
-        # and merge those groups
-        for (slot, value), gleaves in groups.items():
-            if len(gleaves) <= 1:
+            prev = self._source_leaves.get(id(src))
+            if (
+                prev is None
+                or force_update
+                or prev.token is not leaves
+                or src.is_dynamic()
+            ):
+                prev = self._read_source(leaves)
+                changed = True
+
+            source_leaves[id(src)] = prev
+
+        if source_leaves.keys() != self._source_leaves.keys():
+            changed = True
+
+        self._source_leaves = source_leaves
+        return changed
+
+    def _merge_groups(self) -> list[Leaf]:
+        dset: DisjointSet[_GroupKey] = DisjointSet()
+        leaf_keys = []
+        for srcleaves in self._source_leaves.values():
+            for leaf, keys in srcleaves.grouping:
+                first = keys[0]
+                for key in keys[1:]:
+                    dset.union(first, key)
+
+                leaf_keys.append((leaf, first))
+
+        # map group representative -> members (as ordered set)
+        groups: dict[_GroupKey, dict[GroupingLeaf, None]] = {}
+        for leaf, key in leaf_keys:
+            groups.setdefault(dset.find(key), {})[leaf] = None
+
+        leaders: dict[frozenset[int], Leaf] = {}
+        result: list[Leaf] = []
+        for members in groups.values():
+            if len(members) == 1:
+                result.extend(members)
                 continue
 
-            for leaf in list(gleaves):
-                for slot2 in leaf.grouping_slots:
-                    for value2 in leaf.all(slot2):
-                        if value2:
-                            merge_groups((slot, value), (slot2, value2))
+            ids = frozenset(map(id, members))
+            leader = self._leaders.get(ids)
+            if leader is None:
+                leader = self._make_group_leader(members)
+
+            leaders[ids] = leader
+            result.append(leader)
 
-        return redundant_keys
+        # leaders keep references to members, so ids are not reused
+        self._leaders = leaders
+        return result
 
     def get_leaves(self, force_update: bool = False) -> ty.Iterable[Leaf]:
         starttime = time.time()
-        # map (slot, value) -> group
-        groups, non_group_leaves = self._get_groups(force_update)
+        if self._update_sources(force_update) or self._grouped_leaves is None:
+            leaves: ty.Iterable[Leaf] = self._merge_groups()
+            if self.should_sort_lexically():
+                leaves = kupferstring.locale_sort(leaves)
 
-        # Keep track of keys that are only duplicate references
-        redundant_keys = self._merge_groups(groups)
+            self._grouped_leaves = list(leaves)
 
-        keys = set(groups)
-        keys.difference_update(redundant_keys)
+            if (mergetime := time.time() - starttime) > 0.05:  # noqa: PLR2004
+                self.output_debug(f"Warning(?): merged in {mergetime} seconds")
 
-        leaves: ty.Iterable[Leaf] = (
-            self._make_group_leader(groups[K]) for K in keys
+        non_group_leaves = (
+            srcleaves.non_grouping
+            for srcleaves in self._source_leaves.values()
+        )
+        return itertools.chain(
+            itertools.chain.from_iterable(non_group_leaves),
+            self._grouped_leaves,
         )
-        if self.should_sort_lexically():
-            leaves = kupferstring.locale_sort(leaves)
-
-        if (mergetime := time.time() - starttime) > 0.05:  # noqa: PLR2004
-            self.output_debug(f"Warning(?): merged in {mergetime} seconds")
-
-        return itertools.chain(non_group_leaves, leaves)
 
     def repr_key(self) -> ty.Any:
         # Distinguish when used as GroupingSource
@@ -189,7 +259,7 @@ class GroupingSource(Source):
         return Source.repr_key(self)
 
     @classmethod
-    def _make_group_leader(cls, leaves: set[GroupingLeaf]) -> Leaf:
+    def _make_group_leader(cls, leaves: ty.Collection[GroupingLeaf]) -> Leaf:
         if len(leaves) == 1:
             (leaf,) = leaves
             return leaf
@@ -212,6 +282,9 @@ class ToplevelGroupingSource(GroupingSource):
     _sources: ty.ClassVar[
         dict[str, weakref.WeakKeyDictionary[Source, int]]
     ] = {}
+    # GroupingSource for each category, kept to reuse computed groups;
+    # it holds member sources, so it is updated when a source is finalized
+    _category_sources: ty.ClassVar[dict[str, GroupingSource]] = {}
 
     def __init__(self, name: str, category: str) -> None:
         GroupingSource.__init__(self, name, [self])
@@ -222,7 +295,14 @@ class ToplevelGroupingSource(GroupingSource):
             return self
 
         sources = list(self._sources[self.category].keys())
-        return GroupingSource(self.category, sources)
+        grpsrc = self._category_sources.get(self.category)
+        if grpsrc is None:
+            grpsrc = GroupingSource(self.category, sources)
+            self._category_sources[self.category] = grpsrc
+        else:
+            grpsrc.sources = sources
+
+        return grpsrc
 
     def initialize(self) -> None:
         if self.category not in self._sources:
@@ -232,7 +312,14 @@ class ToplevelGroupingSource(GroupingSource):
         self.output_debug(f"Register {self.category} source {self}")
 
     def finalize(self) -> None:
-        del self._sources[self.category][self]
+        sources = self._sources[self.category]
+        del sources[self]
+        if sources:
+            if grpsrc := self._category_sources.get(self.category):
+                grpsrc.sources = list(sources.keys())
+        else:
+            self._category_sources.pop(self.category, None)
+
         self.output_debug(f"Unregister {self.category} source {self}")
 
 
@@ -8,6 +8,8 @@ see the main program file, and COPYING for details.
 
 from __future__ import annotations
 
+import subprocess
+import threading
 import typing as ty
 
 from kupfer.obj.base import Leaf, Source
@@ -20,6 +22,7 @@ if ty.TYPE_CHECKING:
 __all__ = (
     "MultiSource",
     "SourcesSource",
+    "StreamingCommandSource",
 )
 
 
@@ -78,3 +81,108 @@ class MultiSource(Source):
 
     def get_description(self) -> str:
         return _("Root catalog")
+
+
+class StreamingCommandSource(Source):
+    """A source whose items are parsed from output of external command.
+
+    Subclasses implement `get_command` and `parse_record`. Output is read
+    incrementally, split into records by `record_separator` and leaves are
+    yielded as records arrive.
+
+    Command is terminated when `max_items` records are consumed, when
+    iteration is abandoned (generator is closed) or `cancel` is called.
+    """
+
+    record_separator: bytes = b"\n"
+    read_chunk_size: int = 16384
+
+    def __init__(self, name: str, max_items: int = 100) -> None:
+        super().__init__(name)
+        self.max_items = max_items
+        self._proc: subprocess.Popen[bytes] | None = None
+        self._proc_lock = threading.Lock()
+
+    def __getstate__(self) -> dict[str, ty.Any]:
+        state = self.__dict__.copy()
+        state["_proc"] = None
+        state.pop("_proc_lock", None)
+        return state
+
+    def __setstate__(self, state: dict[str, ty.Any]) -> None:
+        self.__dict__.update(state)
+        self._proc_lock = threading.Lock()
+
+    def get_command(self) -> list[str] | None:
+        """Return command (argv) to run or None when it can't be run."""
+        raise NotImplementedError
+
+    def parse_record(self, record: bytes) -> Leaf | None:
+        """Create leaf for one `record` of output; return None to skip it."""
+        raise NotImplementedError
+
+    def get_items(self) -> ty.Iterator[Leaf]:
+        if argv := self.get_command():
+            yield from self._read_command_output(argv)
+
+    def cancel(self) -> None:
+        """Stop currently running command."""
+        with self._proc_lock:
+            if self._proc is not None and self._proc.poll() is None:
+                self.output_debug("Terminating", self._proc.args)
+                self._proc.terminate()
+
+    def _iter_records(self, stream: ty.IO[bytes]) -> ty.Iterator[bytes]:
+        sep = self.record_separator
+        read = getattr(stream, "read1", stream.read)
+        buffer = bytearray()
+        while chunk := read(self.read_chunk_size):
+            # search only new data (separator may start in previous chunk)
+            start = max(len(buffer) - len(sep) + 1, 0)
+            buffer += chunk
+            pos = 0
+            while (end := buffer.find(sep, start)) >= 0:
+                yield bytes(buffer[pos:end])
+                pos = start = end + len(sep)
+
+            del buffer[:pos]
+
+        if buffer:
+            yield bytes(buffer)
+
+    def _read_command_output(self, argv: list[str]) -> ty.Iterator[Leaf]:
+        self.cancel()
+        try:
+            proc = subprocess.Popen(  # pylint: disable=consider-using-with
+                argv, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+            )
+        except OSError as exc:
+            self.output_error(f"Error running {argv[0]}: {exc}")
+            return
+
+        with self._proc_lock:
+            self._proc = proc
+
+        assert proc.stdout
+        count = 0
+        try:
+            for record in self._iter_records(proc.stdout):
+                if not record or (leaf := self.parse_record(record)) is None:
+                    continue
+
+                yield leaf
+                count += 1
+                if count >= self.max_items:
+                    break
+
+        finally:
+            # terminate only own process; the current one may belong to
+            # newer iteration
+            if proc.poll() is None:
+                proc.terminate()
+
+            proc.stdout.close()
+            proc.wait()
+            with self._proc_lock:
+                if self._proc is proc:
+                    self._proc = None
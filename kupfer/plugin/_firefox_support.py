@@ -4,6 +4,7 @@ from __future__ import annotations
 
 import itertools
 import sqlite3
+import threading
 import time
 import typing as ty
 from configparser import RawConfigParser
@@ -14,13 +15,27 @@ from kupfer.obj import UrlLeaf
 from kupfer.support import pretty
 
 MAX_ITEMS = 10000
-_BOOKMARKS_SQL = """
-SELECT moz_places.url, moz_bookmarks.title
-FROM moz_places, moz_bookmarks
-WHERE moz_places.id = moz_bookmarks.fk
-    AND moz_bookmarks.keyword_id IS NULL
-ORDER BY visit_count DESC
-LIMIT ?"""
+# id of "tags" folder in moz_bookmarks
+TAGS_ROOT_ID = 4
+
+# bookmarks changed or added since last read
+_CHANGED_BOOKMARKS_SQL = """
+SELECT mb.id, mb.fk, mb.parent, mb.title, mb.keyword_id,
+    IFNULL(mb.lastModified, 0), mp.url, IFNULL(mp.visit_count, 0), mp.title
+FROM moz_bookmarks mb
+LEFT JOIN moz_places mp ON mp.id = mb.fk
+WHERE IFNULL(mb.lastModified, 0) > ? OR mb.id > ?"""
+_BOOKMARKS_COUNT_SQL = "SELECT count(*) FROM moz_bookmarks"
+_BOOKMARKS_IDS_SQL = "SELECT id FROM moz_bookmarks"
+_VISIT_COUNTS_SQL = """
+SELECT mb.id, IFNULL(mp.visit_count, 0)
+FROM moz_bookmarks mb
+JOIN moz_places mp ON mp.id = mb.fk"""
+_KEYWORDS_SQL = """
+SELECT distinct moz_places.url, moz_places.title, moz_keywords.keyword
+FROM moz_places, moz_keywords
+WHERE moz_places.id = moz_keywords.place_id
+"""
 
 
 def make_absolute_and_check(firefox_dir: Path, path: str) -> Path | None:
@@ -157,29 +172,217 @@ def get_librewolf_home_file(
     return _get_home_file(needed_file, profile_dir, firefox_dir)
 
 
+def _connect(db_file_path: Path | str) -> sqlite3.Connection:
+    fpath = str(db_file_path).replace("?", "%3f").replace("#", "%23")
+    fpath = "file:" + fpath + "?immutable=1&mode=ro"
+    return sqlite3.connect(fpath, uri=True, timeout=1)
+
+
 def query_database(
     db_file_path: Path | str, sql: str, args: tuple[ty.Any, ...] = ()
 ) -> ty.Iterable[tuple[ty.Any, ...]]:
     """Query firefox database. Iterator must be exhausted to prevent hanging
-    connection."""
+    connection. On error nothing is returned."""
+    try:
+        pretty.print_debug(__name__, "Query Firefox db", db_file_path, sql)
+        with closing(_connect(db_file_path)) as conn:
+            cur = conn.cursor()
+            cur.execute(sql, args)
+            yield from cur
+
+    except sqlite3.Error as err:
+        pretty.print_error(__name__, "Query Firefox db error:", str(err))
+
+
+class _Bookmark(ty.NamedTuple):
+    bid: int
+    fk: int | None
+    parent: int
+    title: str | None
+    keyword_id: int | None
+    last_modified: int
+    url: str | None
+    visit_count: int
+    # title of page; bookmarks in tags have no own title
+    place_title: str | None
+
+
+class PlacesDatabase(pretty.OutputMixin):
+    """Snapshot of bookmarks and keywords from places database.
+
+    Snapshot is updated incrementally: only bookmarks with `lastModified`
+    or id greater than already seen are read; removed bookmarks are detected
+    by number of rows. Database is not queried at all when file was not
+    changed. Visit counts (used for ordering) are refreshed at most every
+    `visit_count_ttl` seconds.
+
+    Use `get_places` to get shared instance for given database file.
+    """
 
-    fpath = str(db_file_path).replace("?", "%3f").replace("#", "%23")
-    fpath = "file:" + fpath + "?immutable=1&mode=ro"
+    visit_count_ttl: float = 3600.0
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        # (inode, mtime, size) of database file at last read
+        self._file_id: tuple[int, int, int] | None = None
+        self._bookmarks: dict[int, _Bookmark] = {}
+        self._keywords: list[tuple[str, str | None, str]] = []
+        self._max_modified = -1
+        self._max_id = -1
+        self._visits_updated = 0.0
+        # cached leaves by bookmark id
+        self._leaves: dict[int, UrlLeaf] = {}
+        # bookmarks with url ordered by visit count; None = need update
+        self._ordered: list[_Bookmark] | None = None
+
+    def _reset(self) -> None:
+        self._bookmarks.clear()
+        self._keywords = []
+        self._leaves.clear()
+        self._max_modified = -1
+        self._max_id = -1
+        self._ordered = None
+
+    def refresh(self) -> None:
+        """Read changes from database file."""
+        with self._lock:
+            try:
+                stat = self.path.stat()
+            except OSError:
+                self._reset()
+                self._file_id = None
+                return
+
+            file_id = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+            if file_id == self._file_id:
+                return
 
-    for _ in range(2):
-        try:
-            pretty.print_debug(__name__, "Query Firefox db", db_file_path, sql)
-            with closing(sqlite3.connect(fpath, uri=True, timeout=1)) as conn:
-                cur = conn.cursor()
-                cur.execute(sql, args)
-                yield from cur
+            if not self._file_id or self._file_id[0] != stat.st_ino:
+                # new or replaced database
+                self._reset()
+
+            try:
+                with closing(_connect(self.path)) as conn:
+                    self._update(conn)
+            except sqlite3.Error as err:
+                # snapshot may be updated partially; read all next time
+                self.output_error("Read places database error:", err)
+                self._reset()
+                self._file_id = None
                 return
 
-        except sqlite3.Error as err:
-            # Something is wrong with the database
-            # wait short time and try again
-            pretty.print_error(__name__, "Query Firefox db error:", str(err))
-            time.sleep(1)
+            self._file_id = file_id
+
+    def _update(self, conn: sqlite3.Connection) -> None:
+        full_load = self._max_id < 0
+        bookmarks = self._bookmarks
+        changed = 0
+        for row in conn.execute(
+            _CHANGED_BOOKMARKS_SQL, (self._max_modified, self._max_id)
+        ):
+            bmark = _Bookmark(*row)
+            bookmarks[bmark.bid] = bmark
+            self._leaves.pop(bmark.bid, None)
+            self._max_modified = max(self._max_modified, bmark.last_modified)
+            self._max_id = max(self._max_id, bmark.bid)
+            changed += 1
+
+        (count,) = conn.execute(_BOOKMARKS_COUNT_SQL).fetchone()
+        if count != len(bookmarks):
+            existing = {bid for (bid,) in conn.execute(_BOOKMARKS_IDS_SQL)}
+            for bid in bookmarks.keys() - existing:
+                del bookmarks[bid]
+                self._leaves.pop(bid, None)
+                changed += 1
+
+        now = time.monotonic()
+        if full_load:
+            self._visits_updated = now
+        elif now - self._visits_updated > self.visit_count_ttl:
+            self._visits_updated = now
+            for bid, visits in conn.execute(_VISIT_COUNTS_SQL):
+                prev = bookmarks.get(bid)
+                if prev and prev.visit_count != visits:
+                    bookmarks[bid] = prev._replace(visit_count=visits)
+                    changed += 1
+
+        # there are usually only few keywords; read all
+        self._keywords = list(conn.execute(_KEYWORDS_SQL))
+
+        if changed:
+            self._ordered = None
+
+        self.output_debug(
+            "Read", changed, "changes from", self.path, "bookmarks:", count
+        )
+
+    def _get_leaf(self, bmark: _Bookmark) -> UrlLeaf:
+        # only bookmarks with url are listed
+        assert bmark.url
+        leaf = self._leaves.get(bmark.bid)
+        if leaf is None:
+            title = bmark.title or bmark.place_title
+            leaf = self._leaves[bmark.bid] = UrlLeaf(bmark.url, title)
+
+        return leaf
+
+    def get_bookmarks(
+        self, max_items: int = MAX_ITEMS, parent: int | None = None
+    ) -> list[UrlLeaf]:
+        """Get `max_items` most visited bookmarks (optionally only from
+        `parent` folder or tag)."""
+        self.refresh()
+        with self._lock:
+            if self._ordered is None:
+                self._ordered = sorted(
+                    (
+                        bmark
+                        for bmark in self._bookmarks.values()
+                        if bmark.url and bmark.keyword_id is None
+                    ),
+                    key=lambda bmark: bmark.visit_count,
+                    reverse=True,
+                )
+
+            bookmarks: ty.Iterable[_Bookmark] = self._ordered
+            if parent is not None:
+                bookmarks = (b for b in bookmarks if b.parent == parent)
+
+            return [
+                self._get_leaf(bmark)
+                for bmark in itertools.islice(bookmarks, max_items)
+            ]
+
+    def get_tags(self) -> list[tuple[int, str]]:
+        """Get list of (tag id, tag name)."""
+        self.refresh()
+        with self._lock:
+            return [
+                (bmark.bid, bmark.title or "")
+                for bmark in self._bookmarks.values()
+                if bmark.parent == TAGS_ROOT_ID and bmark.fk is None
+            ]
+
+    def get_keywords(self) -> list[tuple[str, str | None, str]]:
+        """Get list of (url, title, keyword)."""
+        self.refresh()
+        with self._lock:
+            return list(self._keywords)
+
+
+_PLACES: dict[Path, PlacesDatabase] = {}
+_PLACES_LOCK = threading.Lock()
+
+
+def get_places(path: Path) -> PlacesDatabase:
+    """Get shared `PlacesDatabase` for database file `path`."""
+    with _PLACES_LOCK:
+        places = _PLACES.get(path)
+        if places is None:
+            places = _PLACES[path] = PlacesDatabase(path)
+
+        return places
 
 
 def get_bookmarks(
@@ -190,9 +393,4 @@ def get_bookmarks(
     if not path:
         return []
 
-    return list(
-        itertools.starmap(
-            UrlLeaf,
-            query_database(path, _BOOKMARKS_SQL, (max_items,)),
-        )
-    )
+    return get_places(path).get_bookmarks(max_items)
@@ -4,6 +4,11 @@ drill down into compressed archives.
 
 So far we only support .zip and .tar, .tar.gz, .tar.bz2, using Python's
 standard library.
+
+Only the member table of archive (zip central directory, tar headers) is
+read for browsing; files of a directory are extracted when the directory
+is listed, so they are real files with all file actions. Subdirectories
+are extracted only when browsed (or by Extract action).
 """
 
 from __future__ import annotations
@@ -11,7 +16,7 @@ from __future__ import annotations
 __kupfer_name__ = _("Deep Archives")
 __kupfer_contents__ = ("ArchiveContent",)
 __description__ = _("Allow browsing inside compressed archive files")
-__version__ = ""
+__version__ = "2026.1"
 __author__ = "Ulrik Sverdrup <ulrik.sverdrup@gmail.com>"
 
 import hashlib
@@ -20,16 +25,20 @@ import shutil
 import tarfile
 import typing as ty
 import zipfile
-from pathlib import Path
+from contextlib import suppress
 
-from kupfer.obj import FileLeaf, Leaf, Source
-from kupfer.obj.filesrc import DirectorySource
+from kupfer import launch
+from kupfer.obj import Action, FileLeaf, Leaf, Source
+from kupfer.obj.exceptions import OperationError
+from kupfer.obj.filesrc import construct_file_leaf
 from kupfer.support import pretty, scheduler, types
+from kupfer.support.datatools import WeightedLruCache
 
 if ty.TYPE_CHECKING:
     from gettext import gettext as _
 
-# Limit this to archives of a couple of megabytes
+# Limit this to compressed archives of a couple of megabytes; listing
+# members of them require decompressing whole archive
 MAX_ARCHIVE_BYTE_SIZE = 15 * 1024**2
 
 # Wait a year, or until program shutdown for cleaning up
@@ -48,48 +57,310 @@ def _is_safe_to_unarchive(path: str) -> bool:
     return not os.path.isabs(npth) and not npth.startswith(os.path.pardir)
 
 
+class ArchiveMember(ty.NamedTuple):
+    """File or directory in archive."""
+
+    # normalized path in archive, without trailing slash
+    name: str
+    is_dir: bool
+    size: int
+    # offset of data in tar archive; not used for zip files
+    offset: int = -1
+    # name of member as stored in archive (not normalized)
+    stored_name: str = ""
+
+
+# Index of archive: directory name -> members in the directory;
+# root directory is ""
+ArchiveIndex = dict[str, list[ArchiveMember]]
+
+
 @ty.runtime_checkable
-class _Extractor(ty.Protocol):
-    extensions: ty.Collection[str]
-    predicate: ty.Callable[[str], bool] | None
+class _ArchiveFormat(ty.Protocol):
+    @property
+    def extensions(self) -> ty.Collection[str]: ...
+
+    @property
+    def compressed(self) -> bool: ...
+
+    def is_archive(self, path: str) -> bool: ...
+
+    def iter_members(self, path: str) -> ty.Iterator[ArchiveMember]: ...
+
+    def read_members(
+        self, path: str, members: ty.Iterable[ArchiveMember]
+    ) -> ty.Iterator[tuple[ArchiveMember, ty.IO[bytes]]]: ...
+
+
+class _TarFormat:
+    def __init__(self, extensions: tuple[str, ...], compressed: bool):
+        self.extensions = extensions
+        self.compressed = compressed
+
+    def __repr__(self) -> str:
+        return f"<TarFormat {self.extensions[0]}>"
+
+    def is_archive(self, path: str) -> bool:
+        return tarfile.is_tarfile(path)
+
+    def iter_members(self, path: str) -> ty.Iterator[ArchiveMember]:
+        # iterating over TarFile read only headers; for uncompressed
+        # archives data of members are skipped by seek
+        with tarfile.open(path, "r:*") as tfile:
+            for info in tfile:
+                if info.isreg() or info.isdir():
+                    yield ArchiveMember(
+                        info.name, info.isdir(), info.size, info.offset_data
+                    )
+
+    def read_members(
+        self, path: str, members: ty.Iterable[ArchiveMember]
+    ) -> ty.Iterator[tuple[ArchiveMember, ty.IO[bytes]]]:
+        # members are read in order of data, so compressed stream is
+        # decompressed only once
+        with tarfile.open(path, "r:*") as tfile:
+            for member in sorted(members, key=lambda m: m.offset):
+                # build TarInfo from index so tar is not scanned again
+                info = tarfile.TarInfo(member.name)
+                info.type = tarfile.REGTYPE
+                info.size = member.size
+                info.offset_data = member.offset
+                src = tfile.extractfile(info)
+                assert src
+                with src:
+                    yield member, src
+
+
+class _ZipFormat:
+    extensions = (".zip",)
+    compressed = False
+
+    def __repr__(self) -> str:
+        return "<ZipFormat>"
+
+    def is_archive(self, path: str) -> bool:
+        return zipfile.is_zipfile(path)
+
+    def iter_members(self, path: str) -> ty.Iterator[ArchiveMember]:
+        # ZipFile read only central directory
+        with zipfile.ZipFile(path, "r") as zfile:
+            for info in zfile.infolist():
+                yield ArchiveMember(
+                    info.filename, info.is_dir(), info.file_size
+                )
+
+    def read_members(
+        self, path: str, members: ty.Iterable[ArchiveMember]
+    ) -> ty.Iterator[tuple[ArchiveMember, ty.IO[bytes]]]:
+        with zipfile.ZipFile(path, "r") as zfile:
+            for member in members:
+                with zfile.open(member.stored_name or member.name) as src:
+                    yield member, src
+
+
+_FORMATS: ty.Final[tuple[_ArchiveFormat, ...]] = (
+    _TarFormat((".tar",), False),
+    _TarFormat((".tar.gz", ".tgz", ".tar.bz2"), True),
+    _ZipFormat(),
+)
+
+
+def _build_index(members: ty.Iterable[ArchiveMember]) -> ArchiveIndex:
+    """Group members by directory; add directories that are not stored
+    in archive explicitly. Unsafe paths are skipped."""
+    index: ArchiveIndex = {"": []}
+    for member in members:
+        name = os.path.normpath(member.name).strip("/")
+        if name == os.path.curdir or not _is_safe_to_unarchive(name):
+            continue
 
-    def __call__(self, src: str, dst: str) -> None: ...
+        member = member._replace(  # noqa:PLW2901
+            name=name, stored_name=member.name
+        )
+        dirname = os.path.dirname(name)
+        if member.is_dir:
+            if name in index:
+                # directory already added as parent of other member
+                continue
+
+            index[name] = []
+
+        # add missing parent directories
+        child = member
+        while dirname not in index:
+            index[dirname] = [child]
+            child = ArchiveMember(dirname, True, 0)
+            dirname = os.path.dirname(dirname)
+
+        index[dirname].append(child)
+
+    return index
+
+
+def _index_weight(index: ArchiveIndex | None) -> int:
+    if index is None:
+        return 1
+
+    return sum(map(len, index.values())) + 1
+
+
+# Cache of archive indexes by (path, mtime, size); bounded by total number
+# of members, so one huge archive does not keep many small ones out
+_INDEX_CACHE: WeightedLruCache[tuple[str, int, int], ArchiveIndex | None] = (
+    WeightedLruCache(100_000, weight=_index_weight, name="archiveinside.index")
+)
+
+
+def _get_index(path: str, archive: _ArchiveFormat) -> ArchiveIndex | None:
+    """Get cached index of archive or None if `path` is not valid archive."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+
+    key = (path, stat.st_mtime_ns, stat.st_size)
+    with suppress(KeyError):
+        return _INDEX_CACHE[key]
+
+    pretty.print_debug(__name__, "Reading members of", path)
+    index = None
+    try:
+        if archive.is_archive(path):
+            index = _build_index(archive.iter_members(path))
+    except (OSError, tarfile.TarError, zipfile.BadZipFile) as exc:
+        pretty.print_error(__name__, "Can't read archive", path, exc)
+
+    _INDEX_CACHE[key] = index
+    return index
+
+
+_EXTRACT_ERRORS: ty.Final = (
+    OSError,
+    KeyError,
+    UnsafeArchiveError,
+    tarfile.TarError,
+    zipfile.BadZipFile,
+)
+
+
+def _get_extract_dir(path: str) -> str:
+    # always use the same destination for the same file and mtime
+    basename = os.path.basename(os.path.normpath(path))
+    root, _ext = os.path.splitext(basename)
+    mtime = os.stat(path).st_mtime
+    fileid = hashlib.sha1((f"{path}{mtime}").encode()).hexdigest()
+    return os.path.join("/tmp", f"kupfer-{root}-{fileid}")
+
+
+def _extract_files(
+    path: str, archive: _ArchiveFormat, members: ty.Iterable[ArchiveMember]
+) -> str:
+    """Extract file `members` of archive (not extracted yet) into temporary
+    directory. Return the directory."""
+    destroot = _get_extract_dir(path)
+    ArchiveContent.register_unarchived(destroot)
+
+    missing = []
+    for member in members:
+        if not _is_safe_to_unarchive(member.name):
+            raise UnsafeArchiveError(member.name)
+
+        if not os.path.exists(os.path.join(destroot, member.name)):
+            missing.append(member)
+
+    for member, src in archive.read_members(path, missing):
+        dest = os.path.join(destroot, member.name)
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        tmpdest = f"{dest}.{os.getpid()}"
+        with open(tmpdest, "wb") as out:
+            shutil.copyfileobj(src, out)
+
+        os.rename(tmpdest, dest)
+
+    return destroot
+
+
+def _extract(
+    path: str, archive: _ArchiveFormat, index: ArchiveIndex, name: str
+) -> str:
+    """Extract member `name` (file or whole directory) of archive
+    into temporary directory. Return path of extracted file."""
+    files = []
+    dirs = []
+    tovisit = [name]
+    while tovisit:
+        dirname = tovisit.pop()
+        members = index.get(dirname)
+        if members is None:
+            # not a directory
+            members = [
+                m for m in index[os.path.dirname(dirname)] if m.name == dirname
+            ]
+        else:
+            dirs.append(dirname)
+
+        for member in members:
+            if member.is_dir:
+                tovisit.append(member.name)
+            else:
+                files.append(member)
+
+    destroot = _extract_files(path, archive, files)
+    # create also empty directories
+    for dirname in dirs:
+        os.makedirs(os.path.join(destroot, dirname), exist_ok=True)
+
+    return os.path.join(destroot, name) if name else destroot
 
 
 class ArchiveContent(Source):
-    extractors: ty.ClassVar[list[_Extractor]] = []
     unarchived_files: ty.ClassVar[list[str]] = []
     end_timer = scheduler.Timer(True)
 
-    def __init__(self, fileleaf: FileLeaf, unarchive_func: _Extractor) -> None:
-        Source.__init__(self, _("Content of %s") % fileleaf)
-        self.path = fileleaf.object
-        self.unarchiver = unarchive_func
+    def __init__(
+        self, path: str, archive: _ArchiveFormat, dirname: str = ""
+    ) -> None:
+        name = os.path.basename(path)
+        if dirname:
+            name = f"{name}/{dirname}"
+
+        Source.__init__(self, _("Content of %s") % name)
+        self.path = path
+        self.archive = archive
+        self.dirname = dirname
 
     def repr_key(self):
+        if self.dirname:
+            return f"{self.path}/{self.dirname}"
+
         return self.path
 
     def get_items(self) -> ty.Iterable[Leaf]:
-        # always use the same destination for the same file and mtime
-        basename = os.path.basename(os.path.normpath(self.path))
-        root, _ext = os.path.splitext(basename)
-        mtime = os.stat(self.path).st_mtime
-        fileid = hashlib.sha1((f"{self.path}{mtime}").encode()).hexdigest()
-        pth = os.path.join("/tmp", f"kupfer-{root}-{fileid}")
-        if not Path(pth).exists():
-            self.output_debug(f"Extracting with {self.unarchiver}")
-            self.unarchiver(self.path, pth)
-            self.unarchived_files.append(pth)
-            self.end_timer.set(
-                VERY_LONG_TIME_S, self.clean_up_unarchived_files
-            )
+        index = _get_index(self.path, self.archive)
+        if not index:
+            return
+
+        dirname = self.dirname
+        members = index.get(dirname, ())
+        # show content of single top-level directory
+        if not dirname and len(members) == 1 and members[0].is_dir:
+            dirname = members[0].name
+            members = index[dirname]
 
-        files = list(DirectorySource(pth, show_hidden=True).get_leaves())
-        if len(files) == 1 and files[0].has_content():
-            csrc = files[0].content_source()
-            return (csrc.get_leaves() or []) if csrc else []
+        files = [member for member in members if not member.is_dir]
+        destroot = ""
+        try:
+            destroot = _extract_files(self.path, self.archive, files)
+        except _EXTRACT_ERRORS as exc:
+            self.output_error("Can't extract", self.path, exc)
+            files = []
+
+        for member in members:
+            if member.is_dir:
+                yield ArchiveDirLeaf(self.path, self.archive, member)
 
-        return files
+        for member in files:
+            yield construct_file_leaf(os.path.join(destroot, member.name))
 
     def get_description(self) -> str | None:
         return None
@@ -101,25 +372,36 @@ class ArchiveContent(Source):
     @classmethod
     def decorate_item(cls, leaf: FileLeaf) -> ArchiveContent | None:
         basename = os.path.basename(leaf.object).lower()
-        for extractor in cls.extractors:
-            if any(basename.endswith(ext) for ext in extractor.extensions):
-                assert extractor.predicate
-                if Path(leaf.object).is_file() and extractor.predicate(
-                    leaf.object
-                ):
-                    return cls._source_for_path(leaf, extractor)
+        for archive in _FORMATS:
+            if any(basename.endswith(ext) for ext in archive.extensions):
+                return cls._source_for_path(leaf, archive)
 
         return None
 
     @classmethod
     def _source_for_path(
-        cls, leaf: FileLeaf, extractor: _Extractor
+        cls, leaf: FileLeaf, archive: _ArchiveFormat
     ) -> ArchiveContent | None:
-        byte_size = os.stat(leaf.object).st_size
-        if byte_size < MAX_ARCHIVE_BYTE_SIZE:
-            return cls(leaf, extractor)
+        # archive is opened only when content is listed
+        try:
+            stat = os.stat(leaf.object)
+        except OSError:
+            return None
 
-        return None
+        if not os.path.isfile(leaf.object):
+            return None
+
+        if archive.compressed and stat.st_size >= MAX_ARCHIVE_BYTE_SIZE:
+            return None
+
+        return cls(leaf.object, archive)
+
+    @classmethod
+    def register_unarchived(cls, path: str) -> None:
+        if path not in cls.unarchived_files:
+            cls.unarchived_files.append(path)
+
+        cls.end_timer.set(VERY_LONG_TIME_S, cls.clean_up_unarchived_files)
 
     @classmethod
     def clean_up_unarchived_files(cls) -> None:
@@ -143,46 +425,77 @@ class ArchiveContent(Source):
 
         cls.unarchived_files = []
 
-    @classmethod
-    def extractor(
-        cls,
-        extensions: ty.Collection[str],
-        predicate: ty.Callable[[str], bool],
-    ) -> ty.Callable[[ty.Callable[[str, str], None]], _Extractor]:
-        def decorator(func: ty.Callable[[str, str], None]) -> _Extractor:
-            extr = ty.cast("_Extractor", func)
-            extr.extensions = extensions
-            extr.predicate = predicate
-            cls.extractors.append(extr)
-            return extr
-
-        return decorator
-
-
-@ArchiveContent.extractor(
-    (".tar", ".tar.gz", ".tgz", ".tar.bz2"), tarfile.is_tarfile
-)
-def extract_tarfile(filepath: str, destpath: str) -> None:
-    with tarfile.TarFile.open(filepath, "r") as zfile:
-        try:
-            for member in zfile.getnames():
-                if not _is_safe_to_unarchive(member):
-                    raise UnsafeArchiveError(member)
 
-            zfile.extractall(path=destpath)
-        finally:
-            pass
+class ArchiveDirLeaf(Leaf):
+    """Directory inside archive; not extracted until needed."""
+
+    def __init__(
+        self, path: str, archive: _ArchiveFormat, member: ArchiveMember
+    ) -> None:
+        Leaf.__init__(self, (path, member.name), os.path.basename(member.name))
+        self.path = path
+        self.archive = archive
+        self.member = member
 
+    def repr_key(self):
+        return f"{self.path}/{self.member.name}"
+
+    def get_description(self) -> str | None:
+        return f"{os.path.basename(self.path)}/{self.member.name}"
+
+    def get_actions(self):
+        yield OpenArchiveMember()
+        yield ExtractArchiveMember()
+
+    def extract(self) -> str:
+        """Extract member and return path to it."""
+        index = _get_index(self.path, self.archive)
+        if not index:
+            raise OperationError(_("Can't read archive %s") % self.path)
 
-# ZipFile only supports extractall since Python 2.6
-@ArchiveContent.extractor((".zip",), zipfile.is_zipfile)
-def extract_zipfile(filepath: str, destpath: str) -> None:
-    with zipfile.ZipFile(filepath, "r") as zfile:
         try:
-            for member in zfile.namelist():
-                if not _is_safe_to_unarchive(member):
-                    raise UnsafeArchiveError(member)
+            return _extract(self.path, self.archive, index, self.member.name)
+        except _EXTRACT_ERRORS as exc:
+            raise OperationError(str(exc)) from exc
+
+    def has_content(self):
+        return True
+
+    def content_source(self, alternate=False):
+        return ArchiveContent(self.path, self.archive, self.member.name)
+
+    def get_icon_name(self):
+        return "folder"
+
+
+class OpenArchiveMember(Action):
+    rank_adjust = 5
+
+    def __init__(self):
+        Action.__init__(self, _("Open"))
+
+    def activate(self, leaf, iobj=None, ctx=None):
+        launch.show_path(leaf.extract())
+
+    def get_description(self):
+        return _("Extract and open with default application")
+
+    def get_icon_name(self):
+        return "document-open"
+
+
+class ExtractArchiveMember(Action):
+    def __init__(self):
+        Action.__init__(self, _("Extract"))
+
+    def has_result(self):
+        return True
+
+    def activate(self, leaf, iobj=None, ctx=None):
+        return FileLeaf(leaf.extract())
+
+    def get_description(self):
+        return _("Extract to temporary directory")
 
-            zfile.extractall(path=destpath)
-        finally:
-            pass
+    def get_icon_name(self):
+        return "extract-archive"
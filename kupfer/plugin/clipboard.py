@@ -4,17 +4,20 @@ __kupfer_name__ = _("Clipboards")
 __kupfer_sources__ = ("ClipboardSource",)
 __kupfer_actions__ = ("ClearClipboards",)
 __description__ = _("Recent clipboards and clipboard proxy objects")
-__version__ = "2023-03-22"
+__version__ = "2026-10-18"
 __author__ = "Ulrik Sverdrup <ulrik.sverdrup@gmail.com>"
 
+import hashlib
+import json
+import os
 import typing as ty
-from collections import deque
+from collections import OrderedDict
 from contextlib import suppress
 from pathlib import Path
 
 from gi.repository import Gdk, Gio, Gtk
 
-from kupfer import plugin_support
+from kupfer import config, plugin_support
 from kupfer.obj import (
     Action,
     FileLeaf,
@@ -25,7 +28,7 @@ from kupfer.obj import (
     UrlLeaf,
 )
 from kupfer.obj.compose import MultipleLeaf
-from kupfer.support import validators
+from kupfer.support import pretty, validators
 
 if ty.TYPE_CHECKING:
     from gettext import gettext as _
@@ -51,6 +54,12 @@ __kupfer_settings__ = plugin_support.PluginSettings(
         "type": bool,
         "value": False,
     },
+    {
+        "key": "persistent",
+        "label": _("Remember clipboards between sessions"),
+        "type": bool,
+        "value": False,
+    },
 )
 
 
@@ -196,6 +205,326 @@ def _new_clipboard_leaf(text: str) -> Leaf:
     return ClipboardText(text)
 
 
+class _HistoryEntry(ty.NamedTuple):
+    digest: str
+    # size of text in bytes (utf-8)
+    size: int
+    numlines: int
+    preview: str
+    # None when text is stored on disk
+    text: str | None
+
+
+def _text_digest(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+class ClipboardHistory(pretty.OutputMixin):
+    """Clipboard history deduplicated by content hash.
+
+    Size of history is limited by `total_budget` bytes.
+
+    When `persistent`, history is saved in append-only log in `directory`,
+    that is compacted when it grows too large. Texts larger than
+    `spill_size` (and the oldest texts, when history in memory grows over
+    `memory_budget`) are stored in `directory` and loaded when needed.
+    Otherwise (or without `directory`) nothing is written to disk and
+    history is kept only in memory.
+    """
+
+    memory_budget = 1024**2
+    total_budget = 32 * 1024**2
+    spill_size = 64 * 1024
+    log_name = "history_v1.jsonl"
+
+    def __init__(self, directory: str | None, persistent: bool) -> None:
+        self.directory = directory
+        self.persistent = persistent
+        # oldest first
+        self._entries: OrderedDict[str, _HistoryEntry] = OrderedDict()
+        self._memory_size = 0
+        self._total_size = 0
+        self._log_records = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def newest_first(self) -> ty.Iterator[_HistoryEntry]:
+        return reversed(self._entries.values())
+
+    def newest(self) -> _HistoryEntry | None:
+        if not self._entries:
+            return None
+
+        return next(reversed(self._entries.values()))
+
+    def _blob_path(self, digest: str) -> str:
+        assert self.directory
+        return os.path.join(self.directory, digest)
+
+    def get_text(self, entry: _HistoryEntry) -> str:
+        if entry.text is not None:
+            return entry.text
+
+        # text may be loaded back to memory after `entry` was created
+        current = self._entries.get(entry.digest)
+        if current is not None and current.text is not None:
+            return current.text
+
+        try:
+            return Path(self._blob_path(entry.digest)).read_text(
+                encoding="utf-8", errors="surrogateescape"
+            )
+        except OSError as exc:
+            self.output_error("Can't load clipboard", entry.digest, exc)
+            return ""
+
+    def add(self, text: str) -> None:
+        data = text.encode("utf-8", "surrogateescape")
+        digest = _text_digest(data)
+        if digest in self._entries:
+            # duplicate; only move to the end
+            self._entries.move_to_end(digest)
+            self._write_log({"move": digest})
+            return
+
+        entry = _HistoryEntry(
+            digest,
+            len(data),
+            text.count("\n") + 1,
+            TextLeaf.get_first_text_line(text[:1024]),
+            text,
+        )
+        if entry.size > self.spill_size and self._spill(entry, data):
+            entry = entry._replace(text=None)
+
+        self._insert(entry)
+        self._write_log({"add": entry._asdict()})
+        self._enforce_budget()
+
+    def _insert(self, entry: _HistoryEntry) -> None:
+        self._entries[entry.digest] = entry
+        self._total_size += entry.size
+        if entry.text is not None:
+            self._memory_size += entry.size
+
+    def _spill(self, entry: _HistoryEntry, data: bytes | None = None) -> bool:
+        # clipboard content must not be stored when history is not persistent
+        if not self.persistent or not self.directory:
+            return False
+
+        if data is None:
+            data = self.get_text(entry).encode("utf-8", "surrogateescape")
+
+        try:
+            os.makedirs(self.directory, mode=0o700, exist_ok=True)
+            tmp_filename = f"{self._blob_path(entry.digest)}.{os.getpid()}"
+            Path(tmp_filename).write_bytes(data)
+            os.rename(tmp_filename, self._blob_path(entry.digest))
+        except OSError as exc:
+            self.output_error("Can't store clipboard", exc)
+            return False
+
+        return True
+
+    def remove(self, digest: str) -> None:
+        if (entry := self._entries.pop(digest, None)) is None:
+            return
+
+        self._total_size -= entry.size
+        if entry.text is not None:
+            self._memory_size -= entry.size
+        else:
+            with suppress(OSError):
+                os.unlink(self._blob_path(digest))
+
+        self._write_log({"del": digest})
+
+    def prune(self, max_len: int) -> None:
+        while len(self._entries) > max_len:
+            self.remove(next(iter(self._entries)))
+
+    def _enforce_budget(self) -> None:
+        while self._total_size > self.total_budget and len(self._entries) > 1:
+            self.remove(next(iter(self._entries)))
+
+        if not self.persistent or self._memory_size <= self.memory_budget:
+            return
+
+        # move oldest texts to disk
+        for entry in list(self._entries.values()):
+            if self._memory_size <= self.memory_budget:
+                break
+
+            if entry.text is not None and self._spill(entry):
+                self._entries[entry.digest] = entry._replace(text=None)
+                self._memory_size -= entry.size
+
+    def clear(self) -> None:
+        for digest in list(self._entries):
+            self.remove(digest)
+
+        self._compact()
+
+    def _log_path(self) -> str:
+        assert self.directory
+        return os.path.join(self.directory, self.log_name)
+
+    def _write_log(self, record: dict[str, ty.Any]) -> None:
+        if not self.persistent or not self.directory:
+            return
+
+        self._log_records += 1
+        if self._log_records > 4 * len(self._entries) + 64:
+            self._compact()
+            return
+
+        try:
+            os.makedirs(self.directory, mode=0o700, exist_ok=True)
+            with open(self._log_path(), "a", encoding="utf-8") as logf:
+                logf.write(json.dumps(record) + "\n")
+        except OSError as exc:
+            self.output_error("Can't save clipboard history", exc)
+
+    def _compact(self) -> None:
+        """Rewrite log with only current entries."""
+        if not self.persistent or not self.directory:
+            return
+
+        self._log_records = len(self._entries)
+        log_path = self._log_path()
+        tmp_filename = f"{log_path}.{os.getpid()}"
+        try:
+            os.makedirs(self.directory, mode=0o700, exist_ok=True)
+            with open(tmp_filename, "w", encoding="utf-8") as logf:
+                for entry in self._entries.values():
+                    logf.write(json.dumps({"add": entry._asdict()}) + "\n")
+
+            os.rename(tmp_filename, log_path)
+        except OSError as exc:
+            self.output_error("Can't save clipboard history", exc)
+
+    def load(self) -> None:
+        """Load saved history; remove saved data when history is not
+        persistent."""
+        if not self.directory:
+            return
+
+        if not self.persistent:
+            self.remove_saved()
+            return
+
+        try:
+            with open(self._log_path(), encoding="utf-8") as logf:
+                lines = logf.readlines()
+        except FileNotFoundError:
+            return
+        except OSError as exc:
+            self.output_error("Can't load clipboard history", exc)
+            return
+
+        entries = self._entries
+        for line in lines:
+            try:
+                record = json.loads(line)
+                if add := record.get("add"):
+                    entries[add["digest"]] = _HistoryEntry(**add)
+                elif digest := record.get("move"):
+                    entries.move_to_end(digest)
+                elif digest := record.get("del"):
+                    entries.pop(digest, None)
+            except (ValueError, TypeError, KeyError):
+                # ignore broken (incomplete) records
+                continue
+
+        for entry in entries.values():
+            self._total_size += entry.size
+            if entry.text is not None:
+                self._memory_size += entry.size
+
+        self._log_records = len(lines)
+        self.output_debug("Loaded", len(entries), "clipboards")
+        self._remove_unused_blobs()
+
+    def _remove_unused_blobs(
+        self, keep: ty.Container[str] | None = None
+    ) -> None:
+        """Remove stored texts not in `keep` (default: current entries)."""
+        if not self.directory:
+            return
+
+        keep = self._entries if keep is None else keep
+        with suppress(OSError), os.scandir(self.directory) as direntries:
+            for direntry in direntries:
+                name = direntry.name
+                if name != self.log_name and name not in keep:
+                    with suppress(OSError):
+                        os.unlink(direntry.path)
+
+    def remove_saved(self) -> None:
+        """Remove saved history and stored texts; texts of current entries
+        are loaded back to memory."""
+        if not self.directory:
+            return
+
+        for digest, entry in list(self._entries.items()):
+            if entry.text is None:
+                self._entries[digest] = entry._replace(
+                    text=self.get_text(entry)
+                )
+                self._memory_size += entry.size
+
+        with suppress(OSError):
+            os.unlink(self._log_path())
+
+        self._remove_unused_blobs(keep=())
+
+    def set_persistent(self, persistent: bool) -> None:
+        self.persistent = persistent
+        if persistent:
+            self._compact()
+        else:
+            self.remove_saved()
+
+
+class LargeClipboardText(ClipboardText):
+    """Clipboard text stored on disk; loaded only when used."""
+
+    def __init__(self, history: ClipboardHistory, entry: _HistoryEntry):
+        self._history = history
+        self._entry = entry
+        ClipboardText.__init__(self, entry.preview, entry.preview)
+
+    # text is not kept in memory; make self.object a property
+    def _set_object(self, obj):
+        pass
+
+    def _get_object(self):
+        return self._history.get_text(self._entry)
+
+    object = property(_get_object, _set_object)
+
+    def __eq__(self, other):
+        return (
+            type(self) is type(other)
+            and self._entry.digest == other._entry.digest
+        )
+
+    def __hash__(self):
+        return hash(self._entry.digest)
+
+    def repr_key(self):
+        return self._entry.digest
+
+    def get_description(self):
+        numlines = self._entry.numlines
+        return ngettext(
+            'Clipboard "%(desc)s"',
+            'Clipboard with %(num)d lines "%(desc)s"',
+            numlines,
+        ) % {"num": numlines, "desc": self._entry.preview}
+
+
 class ClearClipboards(Action):
     def __init__(self):
         Action.__init__(self, _("Clear"))
@@ -218,6 +547,8 @@ class ClearClipboards(Action):
 
 class ClipboardSource(Source):
     source_scan_interval: int = 3600
+    # history is stored by ClipboardHistory
+    source_use_cache = False
 
     selected_text: str | None
     clipboard_uris: list[str]
@@ -225,7 +556,9 @@ class ClipboardSource(Source):
 
     def __init__(self):
         Source.__init__(self, _("Clipboards"))
-        self.clipboards: deque[str] = deque()
+        self.history: ClipboardHistory | None = None
+        # leaves of history entries by digest
+        self._history_leaves: dict[str, Leaf] = {}
 
     # pylint: disable=attribute-defined-outside-init
     def initialize(self):
@@ -240,6 +573,16 @@ class ClipboardSource(Source):
         self.clipboard_uris = []
         self.clipboard_text = None
         self.selected_text = None
+        cache_home = config.get_cache_home()
+        self.history = ClipboardHistory(
+            os.path.join(cache_home, "clipboards") if cache_home else None,
+            __kupfer_settings__["persistent"],
+        )
+        self.history.load()
+        self._prune_to_length(__kupfer_settings__["max"])
+        __kupfer_settings__.connect_settings_changed_cb(
+            self._on_settings_changed
+        )
 
     def finalize(self):
         clip = Gtk.Clipboard.get(Gdk.SELECTION_CLIPBOARD)
@@ -251,8 +594,14 @@ class ClipboardSource(Source):
         self.clipboard_uris = []
         self.clipboard_text = None
         self.selected_text = None
+        self.history = None
+        self._history_leaves.clear()
         self.mark_for_update()
 
+    def _on_settings_changed(self, settings, key, value):
+        if key == "persistent" and self.history:
+            self.history.set_persistent(value)
+
     def _on_clipboard_changed(self, clip, event, *args):
         is_selection = event.selection == Gdk.SELECTION_PRIMARY
         clip.request_text(self._on_text_for_change, is_selection)
@@ -291,24 +640,46 @@ class ClipboardSource(Source):
         self.mark_for_update()
 
     def _add_to_history(self, cliptext, is_selection):
-        if cliptext in self.clipboards:
-            self.clipboards.remove(cliptext)
+        assert self.history is not None
         # if the previous text is a prefix of the new selection, supersede it
         if (
             is_selection
-            and self.clipboards
+            and (last := self.history.newest())
+            and last.text is not None
+            and last.text != cliptext
             and (
-                cliptext.startswith(self.clipboards[-1])
-                or cliptext.endswith(self.clipboards[-1])
+                cliptext.startswith(last.text) or cliptext.endswith(last.text)
             )
         ):
-            self.clipboards.pop()
+            self.history.remove(last.digest)
 
-        self.clipboards.append(cliptext)
+        self.history.add(cliptext)
 
     def _prune_to_length(self, max_len):
-        while len(self.clipboards) > max_len:
-            self.clipboards.popleft()
+        if self.history is not None:
+            self.history.prune(max_len)
+
+    def _get_history_leaves(self) -> list[Leaf]:
+        if self.history is None:
+            return []
+
+        history = self.history
+        leaves = {}
+        for entry in history.newest_first():
+            leaf = self._history_leaves.get(entry.digest)
+            # recreate leaf when text was moved to disk
+            if leaf is None or (
+                entry.text is None and not isinstance(leaf, LargeClipboardText)
+            ):
+                if entry.text is None:
+                    leaf = LargeClipboardText(history, entry)
+                else:
+                    leaf = _new_clipboard_leaf(entry.text)
+
+            leaves[entry.digest] = leaf
+
+        self._history_leaves = leaves
+        return list(leaves.values())
 
     def get_items(self):
         # selected text
@@ -336,7 +707,7 @@ class ClipboardSource(Source):
             yield leaf
 
         # put out the clipboard history
-        yield from map(_new_clipboard_leaf, reversed(self.clipboards))
+        yield from self._get_history_leaves()
 
     def get_description(self):
         return __description__
@@ -350,5 +721,8 @@ class ClipboardSource(Source):
         yield MultipleLeaf
 
     def clear(self):
-        self.clipboards.clear()
+        if self.history is not None:
+            self.history.clear()
+
+        self._history_leaves.clear()
         self.mark_for_update()
@@ -16,8 +16,10 @@ __description__ = (
 __version__ = ""
 __author__ = "Ulrik Sverdrup <ulrik.sverdrup@gmail.com>"
 
-import os
+import threading
+import time
 import typing as ty
+from collections import deque
 
 from kupfer import icons, launch
 from kupfer.obj import (
@@ -28,11 +30,64 @@ from kupfer.obj import (
     TextLeaf,
     TextSource,
 )
-from kupfer.support import kupferstring, pretty
+from kupfer.support import fileutils, kupferstring, pretty
+from kupfer.ui import uiutils
 
 if ty.TYPE_CHECKING:
     from gettext import gettext as _
 
+# minimal length of command name to propose completions
+_MIN_COMPLETION_PREFIX = 3
+# max number of proposed completions
+_MAX_COMPLETIONS = 5
+# max number of bytes of command output (stdout and stderr each) kept
+_MAX_OUTPUT = 4 * 1024**2
+
+
+class _OutputProgress:
+    """Show last lines of output of long-running command in notification."""
+
+    # show notification only for commands running longer than
+    delay_s = 2.0
+    # minimal interval between notification updates
+    interval_s = 1.0
+    max_lines = 5
+
+    def __init__(self, title: str) -> None:
+        self.title = title
+        self.lines: deque[str] = deque(maxlen=self.max_lines)
+        self.started = time.monotonic()
+        self.last_update = 0.0
+        self.notification_id = 0
+
+    def __call__(
+        self, acommand: launch.AsyncCommand, line: bytes, is_stderr: bool
+    ) -> None:
+        if is_stderr:
+            return
+
+        self.lines.append(kupferstring.fromlocale(line).rstrip())
+        now = time.monotonic()
+        if (
+            now - self.started < self.delay_s
+            or now - self.last_update < self.interval_s
+        ):
+            return
+
+        self.last_update = now
+        self.notification_id = (
+            uiutils.show_notification(
+                self.title, "\n".join(self.lines), nid=self.notification_id
+            )
+            or 0
+        )
+
+    def close(self) -> None:
+        """Close notification, if shown."""
+        if self.notification_id:
+            uiutils.close_notification(self.notification_id)
+            self.notification_id = 0
+
 
 def finish_command(ctx, acommand, stdout, stderr, post_result=True):
     """Show async error if @acommand returns error output & error status.
@@ -40,6 +95,12 @@ def finish_command(ctx, acommand, stdout, stderr, post_result=True):
     """
     max_error_msg = 512
     pretty.print_debug(__name__, "Exited:", acommand)
+    if isinstance(progress := acommand.output_callback, _OutputProgress):
+        progress.close()
+
+    if acommand.truncated:
+        pretty.print_debug(__name__, "Output truncated to", _MAX_OUTPUT)
+
     if acommand.exit_status != 0 and not stdout and stderr:
         errstr = kupferstring.fromlocale(stderr)[:max_error_msg]
         ctx.register_late_error(OperationError(errstr))
@@ -48,6 +109,25 @@ def finish_command(ctx, acommand, stdout, stderr, post_result=True):
         ctx.register_late_result(leaf)
 
 
+def _spawn_command(ctx, argv, finish_callback, timeout_s, **kwargs):
+    """Run `argv` as AsyncCommand. In worker thread of parallel execution
+    wait until the command finishes."""
+    if not ctx.in_worker_thread:
+        launch.AsyncCommand(argv, finish_callback, timeout_s, **kwargs)
+        return
+
+    finished = threading.Event()
+
+    def callback(acommand, stdout, stderr):
+        try:
+            finish_callback(acommand, stdout, stderr)
+        finally:
+            finished.set()
+
+    launch.AsyncCommand(argv, callback, timeout_s, **kwargs)
+    finished.wait()
+
+
 class GetOutput(Action):
     def __init__(self):
         Action.__init__(self, _("Run (Get Output)"))
@@ -55,6 +135,9 @@ class GetOutput(Action):
     def wants_context(self):
         return True
 
+    def is_parallel_safe(self):
+        return True
+
     def activate(self, leaf, iobj=None, ctx=None):
         assert ctx
 
@@ -67,7 +150,15 @@ class GetOutput(Action):
             finish_command(ctx, acommand, stdout, stderr)
 
         pretty.print_debug(__name__, "Spawning with timeout 15 seconds")
-        launch.AsyncCommand(argv, finish_callback, 15)
+        _spawn_command(
+            ctx,
+            argv,
+            finish_callback,
+            15,
+            output_callback=_OutputProgress(str(leaf)),
+            line_buffered=True,
+            max_output=_MAX_OUTPUT,
+        )
 
     def get_description(self):
         return _("Run program and return its output") + " \N{GEAR}"
@@ -98,7 +189,9 @@ class PassToCommand(Action):
 
         argv.extend([o.object for o in objs])
         pretty.print_debug(__name__, "Spawning without timeout")
-        launch.AsyncCommand(argv, finish_callback, None)
+        launch.AsyncCommand(
+            argv, finish_callback, None, max_output=_MAX_OUTPUT
+        )
 
     def activate_multiple(self, objs, iobjs, ctx):
         for iobj in iobjs:
@@ -138,6 +231,9 @@ class WriteToCommand(Action):
     def wants_context(self):
         return True
 
+    def is_parallel_safe(self):
+        return True
+
     def activate(self, leaf, iobj=None, ctx=None):
         assert iobj
         assert ctx
@@ -152,7 +248,17 @@ class WriteToCommand(Action):
 
         pretty.print_debug(__name__, "Spawning without timeout")
         output = leaf.object.encode("utf-8")
-        launch.AsyncCommand(argv, finish_callback, None, stdin=output)
+        progress = _OutputProgress(str(iobj)) if self.post_result else None
+        _spawn_command(
+            ctx,
+            argv,
+            finish_callback,
+            None,
+            stdin=output,
+            output_callback=progress,
+            line_buffered=True,
+            max_output=_MAX_OUTPUT,
+        )
 
     def item_types(self):
         yield TextLeaf
@@ -238,18 +344,17 @@ class CommandTextSource(TextSource):
         if firstword.startswith("/") and not rest:
             return
 
-        ## absolute paths come out here since
-        ## os.path.join with two abspaths returns the latter
+        if exepath := fileutils.lookup_exec_path(firstword):
+            yield Command(exepath, text)
+            return
 
-        # iterate over $PATH directories
-        env_path = os.environ.get("PATH", os.defpath)
-        for execdir in env_path.split(os.pathsep):
-            exepath = os.path.join(execdir, firstword)
-            if os.access(exepath, os.R_OK | os.X_OK) and os.path.isfile(
-                exepath
+        # propose completions for command name
+        if not rest and len(firstword) >= _MIN_COMPLETION_PREFIX:
+            for name in fileutils.complete_exec_name(
+                firstword, _MAX_COMPLETIONS
             ):
-                yield Command(exepath, text)
-                break
+                if exepath := fileutils.lookup_exec_path(name):
+                    yield Command(exepath, name)
 
     def get_description(self):
         return _("Run command-line programs")
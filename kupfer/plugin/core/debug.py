@@ -10,13 +10,13 @@ import io
 from kupfer import puid
 
 # NOTE: Core imports
-from kupfer.core import learn, qfurl
-from kupfer.obj import Action, Leaf, Source
+from kupfer.core import learn, qfurl, tracing
+from kupfer.obj import Action, Leaf, RunnableLeaf, Source
 from kupfer.obj.compose import ComposedLeaf
 from kupfer.support import pretty
 from kupfer.ui import uiutils
 
-__kupfer_sources__ = ()
+__kupfer_sources__ = ("DebugSource",)
 __kupfer_contents__ = ("ComposedSource",)
 __kupfer_actions__ = ("DebugInfo", "Forget")
 __description__ = __doc__
@@ -130,6 +130,36 @@ class DebugInfo(Action):
         yield Leaf
 
 
+class ExecutionTrace(RunnableLeaf):
+    """Show recorded spans of command execution"""
+
+    def __init__(self):
+        RunnableLeaf.__init__(self, name="Execution Trace")
+
+    def run(self, ctx=None):
+        uiutils.show_text_result(
+            tracing.format_spans() or "No commands executed",
+            title="Execution Trace",
+        )
+
+    def get_description(self):
+        return "Show duration of executed commands (for internal kupfer use)"
+
+    def get_icon_name(self):
+        return "emblem-system"
+
+
+class DebugSource(Source):
+    def __init__(self):
+        Source.__init__(self, "Kupfer Debug")
+
+    def get_items(self):
+        yield ExecutionTrace()
+
+    def provides(self):
+        yield RunnableLeaf
+
+
 class Forget(Action):
     rank_adjust = -10
 
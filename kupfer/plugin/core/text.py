@@ -9,7 +9,7 @@ __kupfer_text_sources__ = (
 )
 __kupfer_actions__ = ("OpenTextUrl",)
 __description__ = "Basic support for free-text queries"
-__version__ = "2021.1"
+__version__ = "2026.1"
 __author__ = "Ulrik Sverdrup <ulrik.sverdrup@gmail.com>"
 
 import os
@@ -21,8 +21,10 @@ from contextlib import suppress
 from pathlib import Path
 
 from kupfer import launch
+from kupfer.core import settings
 from kupfer.obj import FileLeaf, Leaf, OpenUrl, TextLeaf, TextSource, UrlLeaf
 from kupfer.support import pretty, system
+from kupfer.support.datatools import WeightedLruCache
 from kupfer.support.validators import is_url
 
 if ty.TYPE_CHECKING:
@@ -43,21 +45,143 @@ class BasicTextSource(TextSource):
         yield TextLeaf
 
 
+class _PathProbe:
+    """Short-lived cache of filesystem probes for typed paths.
+
+    Directory listings are read with one `os.scandir` and kept for `ttl`
+    seconds; they are used for completions and to check existence of typed
+    path. Names missing from listing (like automount entries, ".." or
+    entries of not readable directories) are checked on the filesystem.
+    Only confirmed missing directories (ENOENT, ENOTDIR) are cached as
+    missing, so paths below them are rejected without any syscall.
+    """
+
+    ttl: float = 5.0
+
+    def __init__(self) -> None:
+        # dirpath -> {name: is_dir} (empty when not readable) or None when
+        # directory not exists; bounded by number of cached names
+        self._dirs: WeightedLruCache[str, dict[str, bool] | None] = (
+            WeightedLruCache(
+                20_000,
+                weight=lambda listing: len(listing or ()) + 1,
+                ttl=self.ttl,
+                negative_ttl=self.ttl,
+                name="PathProbe.dirs",
+            )
+        )
+        # typed path -> resolved path or None
+        self._paths: WeightedLruCache[str, Path | None] = WeightedLruCache(
+            128, ttl=self.ttl, negative_ttl=self.ttl, name="PathProbe.paths"
+        )
+
+    def _cached_listing(
+        self, dirpath: str
+    ) -> tuple[bool, dict[str, bool] | None]:
+        try:
+            return True, self._dirs[dirpath]
+        except KeyError:
+            return False, None
+
+    def _is_known_missing(self, dirpath: str) -> bool:
+        # check cached listings of ancestors; stop on first cached one
+        for parent in Path(dirpath).parents:
+            found, listing = self._cached_listing(str(parent))
+            if found:
+                return listing is None
+
+        return False
+
+    def list_dir(self, dirpath: str) -> dict[str, bool] | None:
+        """Return mapping name -> is_dir of `dirpath` entries (empty when
+        directory is not readable) or None when directory not exists."""
+        found, listing = self._cached_listing(dirpath)
+        if found:
+            return listing
+
+        if not self._is_known_missing(dirpath):
+            listing = {}
+            try:
+                with os.scandir(dirpath) as entries:
+                    for entry in entries:
+                        try:
+                            listing[entry.name] = entry.is_dir()
+                        except OSError:
+                            listing[entry.name] = False
+            except (FileNotFoundError, NotADirectoryError):
+                listing = None
+            except OSError:
+                # exists but is not readable (e.g. execute-only)
+                listing = {}
+
+        self._dirs[dirpath] = listing
+        return listing
+
+    def resolve(self, path: Path) -> Path | None:
+        """Return resolved, readable `path` or None if it not exists."""
+        key = str(path)
+        with suppress(KeyError):
+            return self._paths[key]
+
+        parent = path.parent
+        if parent != path and self.list_dir(str(parent)) is None:
+            # parent directory not exists
+            self._paths[key] = None
+            return None
+
+        try:
+            filepath = path.resolve(strict=True)
+        except (FileNotFoundError, NotADirectoryError):
+            self._paths[key] = None
+            return None
+        except (OSError, RuntimeError):
+            # not accessible or symlink loop; don't cache
+            return None
+
+        if not os.access(filepath, os.R_OK):
+            return None
+
+        self._paths[key] = filepath
+        return filepath
+
+
 class PathTextSource(TextSource, pretty.OutputMixin):
     """Return existing full paths if typed"""
 
+    # max number of completions of typed path
+    _max_completions: int = 10
+
     def __init__(self):
         TextSource.__init__(self, name="Filesystem Text Matches")
+        self._probe = _PathProbe()
+        self._local_url_prefixes: tuple[str, ...] | None = None
+
+    def __getstate__(self) -> dict[str, ty.Any]:
+        state = self.__dict__.copy()
+        state["_probe"] = None
+        return state
+
+    def __setstate__(self, state: dict[str, ty.Any]) -> None:
+        self.__dict__.update(state)
+        self._probe = _PathProbe()
 
     def get_rank(self):
         return 80
 
     def _is_local_file_url(self, url: str) -> bool:
         # Recognize file:/// or file://localhost/ or file://<local_hostname>/ URLs
-        hostname = system.get_hostname()
-        return url.startswith(
-            ("file:///", "file://localhost/", f"file://{hostname}/")
-        )
+        if not url.startswith("file://"):
+            return False
+
+        if self._local_url_prefixes is None:
+            hostname = system.get_hostname()
+            self._local_url_prefixes = (
+                "file:///",
+                "file://localhost/",
+                f"file://{hostname}/",
+            )
+
+        return url.startswith(self._local_url_prefixes)
 
     def get_text_items(self, text: str) -> ty.Iterator[Leaf]:
         # Find directories or files
@@ -72,10 +196,40 @@ class PathTextSource(TextSource, pretty.OutputMixin):
         if not urlpath.is_absolute():
             urlpath = Path(system.get_homedir()).joinpath(urlpath)
 
-        with suppress(OSError):
-            filepath = urlpath.resolve(strict=True)
-            if os.access(filepath, os.R_OK):
-                yield FileLeaf(filepath)
+        filepath = self._probe.resolve(urlpath)
+        if filepath:
+            yield FileLeaf(filepath)
+
+        setctl = settings.get_settings_controller()
+        if setctl.get_config("Kupfer", "path_completion"):
+            yield from self._get_completions(urlpath, filepath)
+
+    def _get_completions(
+        self, urlpath: Path, exact: Path | None
+    ) -> ty.Iterator[Leaf]:
+        """Yield entries of typed directory that names start with typed
+        basename."""
+        prefix = urlpath.name
+        if not prefix:
+            return
+
+        listing = self._probe.list_dir(str(urlpath.parent))
+        if not listing:
+            return
+
+        # hidden files only when explicitly requested
+        hidden = prefix.startswith(".")
+        names = sorted(
+            name
+            for name in listing
+            if name.startswith(prefix)
+            and name != prefix
+            and (hidden or not name.startswith("."))
+        )
+        for name in names[: self._max_completions]:
+            path = urlpath.parent.joinpath(name)
+            if path != exact:
+                yield FileLeaf(path)
 
     def provides(self):
         yield FileLeaf
@@ -1,5 +1,6 @@
 """
 Changes:
+    2026-10-18 + persistent index of directories with mtime-based rescan
     2018-09-04 * fix: Python 3 compatibility
     2012-10-08 * fix: errors when no one configured directories exists
     2012-06-09 + max depth; fix source name
@@ -9,17 +10,19 @@ Changes:
 __kupfer_name__ = _("Deep Directories")
 __kupfer_sources__ = ("DeepDirSource",)
 __description__ = _("Recursive index directories")
-__version__ = "2018-09-04"
+__version__ = "2026-10-18"
 __author__ = "Karol Będkowski <karol.bedkowski@gmail.com>"
 
 import os
+import pickle
 import typing as ty
+from pathlib import Path
 
-from kupfer import plugin_support
+from kupfer import config, plugin_support
 from kupfer.obj import apps, files
 from kupfer.obj.base import Leaf, Source
 from kupfer.obj.filesrc import construct_file_leaf
-from kupfer.support import fileutils
+from kupfer.support import pretty
 
 if ty.TYPE_CHECKING:
     from gettext import gettext as _
@@ -45,6 +48,154 @@ __kupfer_settings__ = plugin_support.PluginSettings(
 
 _MAX_DEPTH = 10
 
+# directory entry: (name, is directory, is symlink)
+_Entry = tuple[str, bool, bool]
+
+
+class _DirIndex(pretty.OutputMixin):
+    """Persistent index of directory trees.
+
+    For each visited directory index keep its modification time and list of
+    entries. On walk only directories with changed mtime are listed again;
+    when `validate` is False, index is trusted and no directory is stat-ed
+    (except not yet indexed ones).
+    """
+
+    version = 2
+
+    def __init__(self) -> None:
+        # dirpath -> (st_mtime_ns, entries)
+        self._dirs: dict[str, tuple[int, list[_Entry]]] = {}
+        self._changed = False
+
+    def _get_filename(self) -> str:
+        return os.path.join(
+            config.get_cache_home() or "",
+            f"deepdirectories_index_v{self.version}.pickle",
+        )
+
+    def load(self) -> None:
+        filename = self._get_filename()
+        try:
+            data = pickle.loads(Path(filename).read_bytes())
+        except OSError:
+            return
+        except Exception as exc:
+            self.output_info(f"Error loading {filename}: {exc}")
+            return
+
+        if not isinstance(data, dict):
+            self.output_info(f"Error loading {filename}: not a dict")
+            return
+
+        self._dirs = data
+        self.output_debug(f"Loaded {len(data)} directories from index")
+
+    def save(self) -> None:
+        if not self._changed:
+            return
+
+        filename = self._get_filename()
+        self.output_debug(f"Saving {len(self._dirs)} directories to index")
+        try:
+            tmp_filename = f"{filename}.{os.getpid()}"
+            Path(tmp_filename).write_bytes(
+                pickle.dumps(self._dirs, pickle.HIGHEST_PROTOCOL)
+            )
+            os.rename(tmp_filename, filename)
+        except OSError as exc:
+            self.output_error(f"Error saving {filename}: {exc}")
+        else:
+            self._changed = False
+
+    def _list_dir(self, dirpath: str, validate: bool) -> list[_Entry]:
+        """Get entries of `dirpath` from index or, if directory was changed,
+        from disk."""
+        cached = self._dirs.get(dirpath)
+        if cached is not None and not validate:
+            return cached[1]
+
+        try:
+            mtime = os.stat(dirpath).st_mtime_ns
+        except OSError:
+            self._dirs.pop(dirpath, None)
+            return []
+
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+
+        entries: list[_Entry] = []
+        try:
+            with os.scandir(dirpath) as dirents:
+                for entry in dirents:
+                    try:
+                        is_dir = entry.is_dir()
+                        is_link = entry.is_symlink()
+                    except OSError:
+                        is_dir = is_link = False
+
+                    entries.append((entry.name, is_dir, is_link))
+
+        except OSError as exc:
+            self.output_debug(f"Error listing {dirpath}: {exc}")
+
+        self._dirs[dirpath] = (mtime, entries)
+        self._changed = True
+        return entries
+
+    def walk(
+        self,
+        roots: ty.Iterable[str],
+        max_depth: int,
+        exclude: ty.Callable[[str], bool],
+        validate: bool = True,
+    ) -> ty.Iterator[str]:
+        """Yield paths in `roots` up to `max_depth` levels, like
+        `fileutils.get_dirlist`. Directories not visited in this walk are
+        removed from index."""
+        visited: set[str] = set()
+        for root in roots:
+            stack = [(root, 0)]
+            while stack:
+                dirpath, depth = stack.pop()
+                if dirpath in visited:
+                    continue
+
+                visited.add(dirpath)
+                subdirs = []
+                dirfiles = []
+                # do not follow symlinks, like os.walk
+                descend = []
+                for name, is_dir, is_link in self._list_dir(
+                    dirpath, validate
+                ):
+                    if exclude(name):
+                        continue
+
+                    path = os.path.join(dirpath, name)
+                    if is_dir:
+                        subdirs.append(path)
+                        if not is_link:
+                            descend.append(path)
+                    else:
+                        dirfiles.append(path)
+
+                yield from subdirs
+                yield from dirfiles
+
+                if depth + 1 < max_depth:
+                    stack.extend(
+                        (subdir, depth + 1) for subdir in reversed(descend)
+                    )
+
+        if removed := self._dirs.keys() - visited:
+            for dirpath in removed:
+                del self._dirs[dirpath]
+
+            self._changed = True
+
+        self.save()
+
 
 class DeepDirSource(Source):
     source_use_cache = False
@@ -53,6 +204,7 @@ class DeepDirSource(Source):
         super().__init__(name)
         self.dirs : list[str] = []
         self.depth = 1
+        self._index = _DirIndex()
 
     def initialize(self) -> None:
         __kupfer_settings__.connect(
@@ -60,13 +212,24 @@ class DeepDirSource(Source):
         )
         self.dirs = list(self._get_dirs())
         self.depth = min(__kupfer_settings__["depth"], _MAX_DEPTH)
+        self._index.load()
+
+    def finalize(self) -> None:
+        self._index.save()
 
     def get_items(self) -> ty.Iterable[Leaf]:
-        for directory in self.dirs:
-            dirfiles = fileutils.get_dirlist(
-                directory, max_depth=self.depth, exclude=self._exclude_file
-            )
-            yield from map(construct_file_leaf, dirfiles)
+        # use index as is; changes are detected on (periodic) forced rescan
+        dirfiles = self._index.walk(
+            self.dirs, self.depth, self._exclude_file, validate=False
+        )
+        return map(construct_file_leaf, dirfiles)
+
+    def get_items_forced(self) -> ty.Iterable[Leaf]:
+        # list again only directories with changed mtime
+        dirfiles = self._index.walk(
+            self.dirs, self.depth, self._exclude_file, validate=True
+        )
+        return map(construct_file_leaf, dirfiles)
 
     def should_sort_lexically(self) -> bool:
         return True
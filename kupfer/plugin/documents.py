@@ -5,11 +5,14 @@ __kupfer_sources__ = ("RecentsSource", "PlacesSource", "IgnoredApps")
 __kupfer_actions__ = ("Toggle",)
 __kupfer_contents__ = ("ApplicationRecentsSource",)
 __description__ = _("Recently used documents and bookmarked folders")
-__version__ = "2017.3"
+__version__ = "2026.1"
 __author__ = ""
 
-import functools
+import bisect
+import itertools
+import time
 import typing as ty
+import weakref
 from os import path
 from pathlib import Path
 
@@ -18,7 +21,7 @@ from xdg import BaseDirectory
 
 from kupfer import icons, launch, plugin_support
 from kupfer.obj import Action, AppLeaf, FileLeaf, Source, SourceLeaf, UrlLeaf
-from kupfer.support import datatools, weaklib
+from kupfer.support import pretty, task, weaklib
 
 if ty.TYPE_CHECKING:
     from gettext import gettext as _
@@ -69,31 +72,13 @@ def _file_path(uri: str) -> str | None:
         return None
 
 
-@datatools.simple_cache
-def _get(
-    max_days: int, check_doc_exist: bool
-) -> list[tuple[str, int, tuple[str, ...]]]:
-    manager = Gtk.RecentManager.get_default()
-    items = []
-    for item in manager.get_items():
-        if item.get_age() > max_days >= 0:
-            continue
-
-        if check_doc_exist and not item.exists():
-            continue
-
-        if item.get_private_hint():
-            continue
-
-        if not item.is_local():
-            continue
-
-        uri = item.get_uri()
-        if file_path := _file_path(uri):
-            apps_name = tuple(_get_app_id(item))
-            items.append((file_path, item.get_modified(), apps_name))
-
-    return items
+class _RecentItem(ty.NamedTuple):
+    path: str
+    modified: int
+    # application ids
+    apps: tuple[str, ...]
+    # lower-case file extension
+    ext: str
 
 
 def _get_app_id(item: Gtk.RecentInfo) -> ty.Iterator[str]:
@@ -109,34 +94,242 @@ def _get_app_id(item: Gtk.RecentInfo) -> ty.Iterator[str]:
             yield aid
 
 
-def _get_items(
-    for_app_names: tuple[str, ...] | None = None,
-) -> ty.Iterator[tuple[int, str]]:
-    """Get recent items `for_app_names`.
-
-    for_app_names: set of candidate app names, or None.
-    Return iterable: tuple (modification time, file path)
+def _is_excluded_by_ext(item: _RecentItem, app_names: tuple[str, ...]) -> bool:
+    # check is any of app_id is in separate_apps dict, then check
+    # extension of file - if is on list and matched application
+    # is not @app_names list - skip file.
+    # this allow to filter files for applications by file extension
+    return any(
+        sort_table.get(item.ext) not in app_names
+        for app_id, sort_table in SEPARATE_APPS.items()
+        if app_id in app_names
+    )
+
+
+class _ExistenceCheckTask(task.ThreadTask):
+    """Check in background which files exist."""
+
+    def __init__(
+        self,
+        paths: list[str],
+        callback: ty.Callable[[dict[str, bool]], None],
+    ) -> None:
+        super().__init__("documents: check recent items")
+        self._paths = paths
+        self._callback = callback
+        self._result: dict[str, bool] = {}
+
+    def thread_do(self) -> None:
+        self._result = {pth: path.exists(pth) for pth in self._paths}
+
+    def thread_finish(self) -> None:
+        self._callback(self._result)
+
+
+class _RecentIndex(pretty.OutputMixin):
+    """Index of recent items from Gtk.RecentManager.
+
+    Index is updated lazily after manager `changed` signal. Manager does not
+    tell what changed, so its items are compared with the index by (uri,
+    modification time); only new and changed items are processed and
+    inserted, removed ones are dropped. Items are kept sorted by
+    modification time and grouped by application id. Existence of files is
+    checked in background thread, and results are kept for items that did
+    not change.
     """
-    max_days = __kupfer_settings__["max_days"]
-    check_doc_exist = __kupfer_settings__["check_doc_exist"]
-    for file_path, modified, apps in _get(max_days, check_doc_exist):
-        if for_app_names:
-            if not any(a in for_app_names for a in apps):
+
+    def __init__(self) -> None:
+        # indexed items by (uri, modified)
+        self._by_key: dict[tuple[str, int], _RecentItem] = {}
+        self._items: list[_RecentItem] = []
+        self._by_app: dict[str, list[_RecentItem]] = {}
+        # existence of checked files by (path, modified)
+        self._exists: dict[tuple[str, int], bool] = {}
+        self._has_items_cache: dict[tuple[str, ...], bool] = {}
+        self._valid = False
+        self._checking = False
+        self._sources: weakref.WeakSet[Source] = weakref.WeakSet()
+
+    def register(self, source: Source) -> None:
+        """Register `source` to be marked for update on index change."""
+        self._sources.add(source)
+
+    def invalidate(self) -> None:
+        self._valid = False
+        self._has_items_cache.clear()
+
+    def settings_changed(self) -> None:
+        """Forget results depending on plugin settings."""
+        self._has_items_cache.clear()
+        if self._valid:
+            self._check_existence()
+
+    def _notify(self) -> None:
+        self._has_items_cache.clear()
+        for source in list(self._sources):
+            source.mark_for_update()
+
+    def _update(self) -> None:
+        if self._valid:
+            return
+
+        self._valid = True
+        manager = Gtk.RecentManager.get_default()
+        old = self._by_key
+        current: dict[tuple[str, int], _RecentItem | None] = {}
+        for item in manager.get_items():
+            if item.get_private_hint() or not item.is_local():
                 continue
 
-            ext = path.splitext(file_path)[1].lower()
-            # check is any of app_id is in separate_apps dict, then check
-            # extension of file - if is on list and matched application
-            # is not @for_app_names list - skip file.
-            # this allow to filter files for applications by file extension
-            if any(
-                sort_table.get(ext) not in for_app_names
-                for app_id, sort_table in SEPARATE_APPS.items()
-                if app_id in for_app_names
+            key = (item.get_uri(), item.get_modified())
+            if (ritem := old.get(key)) is None and (
+                file_path := _file_path(key[0])
+            ):
+                ritem = _RecentItem(
+                    file_path,
+                    key[1],
+                    tuple(_get_app_id(item)),
+                    path.splitext(file_path)[1].lower(),
+                )
+
+            current[key] = ritem
+
+        removed = [ritem for key, ritem in old.items() if key not in current]
+        added = [
+            ritem
+            for key, ritem in current.items()
+            if ritem is not None and key not in old
+        ]
+        self._by_key = {
+            key: ritem for key, ritem in current.items() if ritem is not None
+        }
+        self._apply_changes(removed, added)
+        self.output_debug(
+            "Indexed",
+            len(self._items),
+            f"recent items (+{len(added)} -{len(removed)})",
+        )
+        self._check_existence()
+
+    def _apply_changes(
+        self, removed: list[_RecentItem], added: list[_RecentItem]
+    ) -> None:
+        """Remove `removed` and insert `added` items keeping order."""
+        if removed:
+            removed_set = set(removed)
+            self._items = [x for x in self._items if x not in removed_set]
+            for ritem in removed:
+                for app in set(ritem.apps):
+                    bucket = self._by_app[app]
+                    bucket.remove(ritem)
+                    if not bucket:
+                        del self._by_app[app]
+
+                self._exists.pop((ritem.path, ritem.modified), None)
+
+        # lists are sorted by modification time desc
+        def key(ritem: _RecentItem) -> int:
+            return -ritem.modified
+
+        for ritem in added:
+            bisect.insort(self._items, ritem, key=key)
+            for app in set(ritem.apps):
+                bisect.insort(self._by_app.setdefault(app, []), ritem, key=key)
+
+    def _check_existence(self) -> None:
+        if self._checking or not __kupfer_settings__["check_doc_exist"]:
+            return
+
+        # check newest items first
+        paths = [
+            ritem.path
+            for ritem in self._items
+            if (ritem.path, ritem.modified) not in self._exists
+        ]
+
+        if not paths:
+            return
+
+        def on_checked(result: dict[str, bool]) -> None:
+            for ritem in self._items:
+                if (exists := result.get(ritem.path)) is not None:
+                    self._exists[(ritem.path, ritem.modified)] = exists
+
+            if not all(result.values()):
+                self._notify()
+
+        def on_finished(_task: task.Task) -> None:
+            # called also when check failed
+            self._checking = False
+
+        self._checking = True
+        _ExistenceCheckTask(paths, on_checked).start(on_finished)
+
+    def _iter_valid(
+        self, items: ty.Iterable[_RecentItem]
+    ) -> ty.Iterator[_RecentItem]:
+        """Filter out items that are too old or do not exist."""
+        max_days = __kupfer_settings__["max_days"]
+        check_doc_exist = __kupfer_settings__["check_doc_exist"]
+        min_modified = time.time() - max_days * 86400 if max_days >= 0 else 0
+        exists = self._exists
+        for ritem in items:
+            if ritem.modified < min_modified:
+                # items are sorted by modified time
+                return
+
+            # items not checked yet are assumed to exist
+            if check_doc_exist and not exists.get(
+                (ritem.path, ritem.modified), True
             ):
                 continue
 
-        yield (modified, file_path)
+            yield ritem
+
+    def _iter_for_apps(
+        self, app_names: tuple[str, ...]
+    ) -> ty.Iterator[_RecentItem]:
+        buckets = [self._by_app[a] for a in app_names if a in self._by_app]
+        if len(buckets) == 1:
+            candidates: ty.Iterable[_RecentItem] = buckets[0]
+        else:
+            candidates = sorted(
+                set(itertools.chain.from_iterable(buckets)),
+                key=lambda x: x.modified,
+                reverse=True,
+            )
+
+        for ritem in self._iter_valid(candidates):
+            if not _is_excluded_by_ext(ritem, app_names):
+                yield ritem
+
+    def get_items(
+        self, for_app_names: tuple[str, ...] | None = None
+    ) -> list[str]:
+        """Get paths of recent items (optionally only for applications
+        `for_app_names`) sorted by modification time desc."""
+        self._update()
+        if for_app_names:
+            items = self._iter_for_apps(for_app_names)
+        else:
+            items = self._iter_valid(self._items)
+
+        return [ritem.path for ritem in items]
+
+    def has_items(self, app_names: tuple[str, ...]) -> bool:
+        """Check is there any recent documents for `app_names`."""
+        self._update()
+        try:
+            return self._has_items_cache[app_names]
+        except KeyError:
+            pass
+
+        res = any(True for _item in self._iter_for_apps(app_names))
+        self._has_items_cache[app_names] = res
+        return res
+
+
+_RECENT_INDEX = _RecentIndex()
 
 
 def _get_items_sorted(
@@ -144,19 +337,12 @@ def _get_items_sorted(
 ) -> ty.Iterator[FileLeaf]:
     """Get recent documents as iterable FileLeaf for `for_app_names` sorted
     sorted by modified date desc."""
-    items = sorted(_get_items(for_app_names), reverse=True)
-    return (FileLeaf(item[1]) for item in items)
+    return map(FileLeaf, _RECENT_INDEX.get_items(for_app_names))
 
 
-@functools.lru_cache(maxsize=10)
 def _has_items_for_application(app_names: tuple[str, ...]) -> bool:
     """Check is there any recent documents for `app_names`."""
-    # Cache doesn't need to be large to serve main purpose:
-    # there will be many identical queries in a row
-    for _item in _get_items(app_names):
-        return True
-
-    return False
+    return _RECENT_INDEX.has_items(app_names)
 
 
 def _app_names(leaf: AppLeaf) -> tuple[str, ...]:
@@ -191,14 +377,22 @@ class RecentsSource(Source):
         weaklib.gobject_connect_weakly(
             manager, "changed", self._recent_changed
         )
+        weaklib.gobject_connect_weakly(
+            __kupfer_settings__,
+            "plugin-setting-changed",
+            self._on_setting_changed,
+        )
+
+        _RECENT_INDEX.register(self)
 
     def _recent_changed(self, _rmgr: Gtk.RecentManager) -> None:
-        # when using typeguard lru_cache is wrapped
-        try:
-            _get.cache_clear()
-        except AttributeError:
-            _get.__wrapped__.cache_clear()  # type:ignore
+        _RECENT_INDEX.invalidate()
+        self.mark_for_update()
 
+    def _on_setting_changed(
+        self, _settings: ty.Any, _key: str, _value: ty.Any
+    ) -> None:
+        _RECENT_INDEX.settings_changed()
         self.mark_for_update()
 
     def get_items(self):
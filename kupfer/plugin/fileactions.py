@@ -3,11 +3,14 @@ __kupfer_sources__ = ()
 __kupfer_text_sources__ = ()
 __kupfer_actions__ = ("MoveTo", "Rename", "CopyTo", "Edit")
 __description__ = _("More file actions")
-__version__ = "2023-02-25"
+__version__ = "2026-10-18"
 __author__ = "Ulrik, KB"
 
 import os
+import threading
+import time
 import typing as ty
+from collections import deque
 
 # since "path" is a very generic name, you often forget..
 from os import path as os_path
@@ -19,6 +22,7 @@ from kupfer import launch
 from kupfer.core import settings
 from kupfer.obj import Action, FileLeaf, OperationError, TextLeaf, TextSource
 from kupfer.support import pretty, task
+from kupfer.ui.progress_dialog import ProgressDialogController
 
 if ty.TYPE_CHECKING:
     from gettext import gettext as _
@@ -40,28 +44,282 @@ def _good_destination(dpath, spath):
     return not (os_path.samefile(dpath, spath) or cpfx == spath)
 
 
+def _walk_tree(path: str) -> ty.Iterator[tuple[str, int, bool]]:
+    """Yield (relative path, size, is directory) for directory `path` and
+    all its content; directories are yielded before their content.
+    Symlinks are not followed."""
+    yield "", 0, True
+    for dirpath, dirnames, filenames in os.walk(path):
+        reldir = os_path.relpath(dirpath, path)
+        if reldir == ".":
+            reldir = ""
+
+        for name in dirnames:
+            fpath = os_path.join(dirpath, name)
+            yield os_path.join(reldir, name), 0, not os_path.islink(fpath)
+
+        for name in filenames:
+            fpath = os_path.join(dirpath, name)
+            try:
+                size = os.lstat(fpath).st_size
+            except OSError:
+                size = 0
+
+            yield os_path.join(reldir, name), size, False
+
+
+class _FileOperation(task.Task):
+    """Copy or move of file or directory `source` to `dest`.
+
+    Operation is run by `_FileOperationQueue` in a worker thread. Destination
+    file is posted as late result through `ctx`.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        move: bool,
+        source: Gio.File,
+        dest: Gio.File,
+        ctx: ty.Any,
+    ) -> None:
+        super().__init__(name)
+        self.move = move
+        self.source = source
+        self.dest = dest
+        self.ctx = ctx
+        # total and transferred bytes; updated in worker thread
+        self.total_bytes = 0
+        self.done_bytes = 0
+        self._finish_callback: task.TaskCallback | None = None
+
+    def start(self, finish_callback: task.TaskCallback) -> None:
+        self._finish_callback = finish_callback
+        _FileOperationQueue.instance().add(self)
+
+    def _progress_callback(self, base: int) -> ty.Callable[[int, int], None]:
+        def callback(current: int, _total: int) -> None:
+            self.done_bytes = base + current
+
+        return callback
+
+    def run(self, cancellable: Gio.Cancellable) -> None:
+        """Do operation; called in worker thread."""
+        flags = Gio.FileCopyFlags.ALL_METADATA
+        if self.move:
+            # moving directory within one filesystem is only rename
+            info = self.source.query_info(
+                Gio.FILE_ATTRIBUTE_STANDARD_SIZE,
+                Gio.FileQueryInfoFlags.NOFOLLOW_SYMLINKS,
+                cancellable,
+            )
+            self.total_bytes = info.get_size()
+            self.source.move(
+                self.dest, flags, cancellable, self._progress_callback(0)
+            )
+            return
+
+        path = self.source.get_path()
+        if not os_path.isdir(path) or os_path.islink(path):
+            self.total_bytes = os.lstat(path).st_size
+            self.source.copy(
+                self.dest, flags, cancellable, self._progress_callback(0)
+            )
+            return
+
+        # Gio can't copy directories; copy content file by file
+        entries = list(_walk_tree(path))
+        self.total_bytes = sum(size for _path, size, _isdir in entries)
+        flags |= Gio.FileCopyFlags.NOFOLLOW_SYMLINKS
+        done = 0
+        for relpath, size, is_dir in entries:
+            cancellable.set_error_if_cancelled()
+            dest = self.dest.resolve_relative_path(relpath)
+            if is_dir:
+                dest.make_directory(cancellable)
+            else:
+                self.source.resolve_relative_path(relpath).copy(
+                    dest, flags, cancellable, self._progress_callback(done)
+                )
+
+            done += size
+            self.done_bytes = done
+
+    def finish(self, error: str | None, cancelled: bool) -> None:
+        """Post result of operation; called in main thread."""
+        try:
+            if error is None:
+                self.ctx.register_late_result(FileLeaf(self.dest.get_path()))
+            elif not cancelled:
+                self.ctx.register_late_error(OperationError(error))
+        finally:
+            if self._finish_callback:
+                self._finish_callback(self)
+
+
+class _FileOperationQueue(pretty.OutputMixin):
+    """Run file operations in bounded number of worker threads.
+
+    Progress of all queued operations is shown in one progress dialog, when
+    they run longer than `dialog_delay_s`; aborting the dialog cancels all
+    running and queued operations.
+    """
+
+    max_parallel = 3
+    dialog_delay_s = 0.5
+    update_interval_ms = 250
+
+    _instance: "_FileOperationQueue | None" = None
+
+    @classmethod
+    def instance(cls) -> "_FileOperationQueue":
+        if cls._instance is None:
+            cls._instance = _FileOperationQueue()
+
+        return cls._instance
+
+    def __init__(self) -> None:
+        self._pending: deque[_FileOperation] = deque()
+        self._running: set[_FileOperation] = set()
+        self._cancellable = Gio.Cancellable()
+        self._dialog: ProgressDialogController | None = None
+        self._timer_id = 0
+        self._started = 0.0
+        # counters for operations queued since queue was empty
+        self._num_ops = 0
+        self._num_finished = 0
+        self._finished_bytes = 0
+
+    def add(self, operation: _FileOperation) -> None:
+        self.output_debug("Queue", operation)
+        if not self._timer_id:
+            self._started = time.monotonic()
+            self._timer_id = GLib.timeout_add(
+                self.update_interval_ms, self._on_timer
+            )
+
+        self._num_ops += 1
+        self._pending.append(operation)
+        self._start_next()
+
+    def cancel(self) -> None:
+        """Cancel all running and queued operations."""
+        self.output_info("Cancelling file operations")
+        self._cancellable.cancel()
+        # running operations keep the cancelled one; operations queued
+        # later get the new one
+        self._cancellable = Gio.Cancellable()
+        pending = list(self._pending)
+        self._pending.clear()
+        for operation in pending:
+            self._on_finished(operation, "cancelled", True)
+
+    def _start_next(self) -> None:
+        while self._pending and len(self._running) < self.max_parallel:
+            operation = self._pending.popleft()
+            self._running.add(operation)
+            thread = threading.Thread(
+                target=self._run,
+                args=(operation, self._cancellable),
+                daemon=True,
+            )
+            thread.start()
+
+    def _run(
+        self, operation: _FileOperation, cancellable: Gio.Cancellable
+    ) -> None:
+        # in worker thread
+        error = None
+        cancelled = False
+        try:
+            operation.run(cancellable)
+        except GLib.Error as exc:
+            # pylint: disable=no-member
+            error = exc.message
+            cancelled = exc.matches(
+                Gio.io_error_quark(), Gio.IOErrorEnum.CANCELLED
+            )
+        except Exception as exc:
+            self.output_exc()
+            error = str(exc)
+        finally:
+            # operation must always be finished, or queue never ends
+            GLib.idle_add(self._on_finished, operation, error, cancelled)
+
+    def _on_finished(
+        self, operation: _FileOperation, error: str | None, cancelled: bool
+    ) -> bool:
+        self.output_debug("Finished", operation, error)
+        self._running.discard(operation)
+        self._num_finished += 1
+        self._finished_bytes += operation.total_bytes
+        self._start_next()
+        if not self._running and not self._pending:
+            self._end()
+
+        operation.finish(error, cancelled)
+        return False
+
+    def _end(self) -> None:
+        if self._timer_id:
+            GLib.source_remove(self._timer_id)
+            self._timer_id = 0
+
+        if self._dialog:
+            self._dialog.hide()
+            self._dialog.destroy()
+            self._dialog = None
+
+        self._num_ops = self._num_finished = self._finished_bytes = 0
+
+    def _on_timer(self) -> bool:
+        if not self._dialog:
+            if time.monotonic() - self._started < self.dialog_delay_s:
+                return True
+
+            self._dialog = ProgressDialogController(
+                _("File Operations"),
+                max_value=1000,
+                abort_callback=self.cancel,
+            )
+            self._dialog.show()
+
+        running = list(self._running)
+        done = self._finished_bytes + sum(op.done_bytes for op in running)
+        total = self._finished_bytes + sum(op.total_bytes for op in running)
+        label = running[0].name if running else ""
+        # TRANS: progress of file operations: number of operations and sizes
+        text = _(" (%(num)d of %(total_num)d, %(size)s of %(total_size)s)") % {
+            "num": self._num_finished,
+            "total_num": self._num_ops,
+            "size": GLib.format_size(done),
+            "total_size": GLib.format_size(total),
+        }
+        self._dialog.update(done * 1000 / total if total else 0, label, text)
+        return True
+
+
 class MoveTo(Action, pretty.OutputMixin):
     def __init__(self):
         Action.__init__(self, _("Move To..."))
 
-    def has_result(self):
+    def wants_context(self):
+        return True
+
+    def is_async(self):
+        return True
+
+    def is_parallel_safe(self):
+        # only create operations; they are run by _FileOperationQueue
         return True
 
     def activate(self, leaf, iobj=None, ctx=None):
         assert iobj
-
+        assert ctx
         sfile = leaf.get_gfile()
         bname = sfile.get_basename()
         dfile = iobj.get_gfile().get_child(bname)
-        try:
-            ret = sfile.move(
-                dfile, Gio.FileCopyFlags.ALL_METADATA, None, None, None
-            )
-            self.output_debug(f"Move {sfile} to {dfile} (ret: {ret})")
-        except GLib.Error as exc:
-            raise OperationError(str(exc)) from exc
-
-        return FileLeaf(dfile.get_path())
+        return _FileOperation(str(leaf), True, sfile, dfile, ctx)
 
     def valid_for_item(self, leaf):
         return os.access(leaf.object, os.R_OK | os.W_OK)
@@ -121,24 +379,19 @@ class Rename(Action, pretty.OutputMixin):
     def __init__(self):
         Action.__init__(self, _("Rename To..."))
 
-    def has_result(self):
+    def wants_context(self):
+        return True
+
+    def is_async(self):
         return True
 
     def activate(self, leaf, iobj=None, ctx=None):
         assert iobj
-
+        assert ctx
         sfile = leaf.get_gfile()
         dest = os_path.join(os_path.dirname(leaf.object), iobj.object)
         dfile = Gio.File.new_for_path(dest)
-        try:
-            ret = sfile.move(
-                dfile, Gio.FileCopyFlags.ALL_METADATA, None, None, None
-            )
-            self.output_debug(f"Move {sfile} to {dfile} (ret: {ret})")
-        except GLib.Error as exc:
-            raise OperationError(str(exc)) from exc
-
-        return FileLeaf(dfile.get_path())
+        return _FileOperation(str(leaf), True, sfile, dfile, ctx)
 
     def activate_multiple(self, objs, iobjs):
         raise NotImplementedError
@@ -179,16 +432,19 @@ class CopyTo(Action, pretty.OutputMixin):
         assert ctx
         sfile = leaf.get_gfile()
         dfile = iobj.get_gfile().get_child(os_path.basename(leaf.object))
-        return CopyTask(str(leaf), sfile, dfile, ctx)
+        return _FileOperation(str(leaf), False, sfile, dfile, ctx)
 
     def is_async(self):
         return True
 
+    def is_parallel_safe(self):
+        return True
+
     def item_types(self):
         yield FileLeaf
 
     def valid_for_item(self, leaf):
-        return (not leaf.is_dir()) and os.access(leaf.object, os.R_OK)
+        return os.access(leaf.object, os.R_OK)
 
     def requires_object(self):
         return True
@@ -203,33 +459,6 @@ class CopyTo(Action, pretty.OutputMixin):
         return _("Copy file to a chosen location")
 
 
-class CopyTask(task.ThreadTask, pretty.OutputMixin):
-    def __init__(self, name, gsource, gdest, ctx):
-        super().__init__(name)
-        self.gsource = gsource
-        self.gdest = gdest
-        self.ctx = ctx
-
-    def thread_do(self):
-        try:
-            # FIXME: This should be async
-            self.output_debug(f"Copy {self.gsource} to {self.gdest}")
-            ret = self.gsource.copy(
-                self.gdest, Gio.FileCopyFlags.ALL_METADATA, None, None, None
-            )
-            self.output_debug(f"Copy ret {ret!r}")
-        except GLib.Error as exc:
-            # pylint: disable=no-member
-            raise OperationError(exc.message) from exc
-
-    def thread_finish(self):
-        self.ctx.register_late_result(FileLeaf(self.gdest.get_path()))
-
-    def thread_finally(self, exc_info):
-        if exc_info is not None:
-            self.ctx.register_late_error(exc_info)
-
-
 class Edit(Action):
     action_accelerator = "e"
 
@@ -25,7 +25,7 @@ from kupfer.obj.apps import AppLeafContentMixin
 from kupfer.obj.helplib import FilesystemWatchMixin
 from kupfer.plugin._firefox_support import (
     get_firefox_home_file,
-    query_database,
+    get_places,
 )
 
 if ty.TYPE_CHECKING:
@@ -78,13 +78,6 @@ class Keyword(Leaf):
         return self.object
 
 
-_KEYWORDS_SQL = """
-SELECT distinct moz_places.url, moz_places.title, moz_keywords.keyword
-FROM moz_places, moz_keywords
-WHERE moz_places.id = moz_keywords.place_id
-"""
-
-
 class KeywordsSource(AppLeafContentMixin, Source, FilesystemWatchMixin):
     appleaf_content_id = ("firefox", "firefox-esr")
     source_scan_interval: int = 3600
@@ -120,7 +113,7 @@ class KeywordsSource(AppLeafContentMixin, Source, FilesystemWatchMixin):
 
         return [
             Keyword(title or url, kw, url)
-            for url, title, kw in query_database(str(fpath), _KEYWORDS_SQL)
+            for url, title, kw in get_places(fpath).get_keywords()
         ]
 
     def get_description(self):
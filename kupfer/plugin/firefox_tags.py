@@ -13,7 +13,7 @@ from kupfer.obj.apps import AppLeafContentMixin
 from kupfer.obj.helplib import FilesystemWatchMixin
 from kupfer.plugin._firefox_support import (
     get_firefox_home_file,
-    query_database,
+    get_places,
 )
 
 if ty.TYPE_CHECKING:
@@ -44,14 +44,6 @@ class FirefoxTag(Leaf):
         return TagBookmarksSource(self.object, self.name)
 
 
-_TAGS_SQL = """
-SELECT id, title
-FROM moz_bookmarks mb
-WHERE mb.parent = 4
-    AND mb.fk IS NULL
-"""
-
-
 class TagsSource(AppLeafContentMixin, Source, FilesystemWatchMixin):
     appleaf_content_id = ("firefox", "firefox-esr")
     source_scan_interval: int = 3600
@@ -80,9 +72,7 @@ class TagsSource(AppLeafContentMixin, Source, FilesystemWatchMixin):
             return []
 
         return list(
-            itertools.starmap(
-                FirefoxTag, query_database(str(fpath), _TAGS_SQL)
-            )
+            itertools.starmap(FirefoxTag, get_places(fpath).get_tags())
         )
 
     def get_description(self):
@@ -101,16 +91,6 @@ class TagsSource(AppLeafContentMixin, Source, FilesystemWatchMixin):
         yield FirefoxTag
 
 
-_TAG_BOOKMARKS_SQL = """
-SELECT mp.url, mp.title
-FROM moz_places mp
-JOIN moz_bookmarks mb ON mp.id = mb.fk
-WHERE mb.keyword_id IS NULL
-	AND mb.parent = ?
-ORDER BY visit_count DESC
-LIMIT ?"""
-
-
 class TagBookmarksSource(Source):
     def __init__(self, tag_id: int, tag: str):
         super().__init__(_("Firefox Bookmarks by tag"))
@@ -125,14 +105,7 @@ class TagBookmarksSource(Source):
         if not fpath:
             return []
 
-        return list(
-            itertools.starmap(
-                UrlLeaf,
-                query_database(
-                    str(fpath), _TAG_BOOKMARKS_SQL, (self.tag_id, MAX_ITEMS)
-                ),
-            )
-        )
+        return get_places(fpath).get_bookmarks(MAX_ITEMS, parent=self.tag_id)
 
     def get_gicon(self):
         if lrepr := self.get_leaf_repr():
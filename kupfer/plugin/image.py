@@ -35,6 +35,26 @@ def _spawn_operation_err(argv):
         raise OperationError(exc.args[0].message) from exc
 
 
+def _run_operation(ctx, argv, dpath):
+    """Run `argv` that creates file `dpath`.
+
+    In worker thread of parallel execution wait for the command to finish,
+    otherwise spawn it and post `dpath` as late result when it is created.
+    """
+    if not ctx.in_worker_thread:
+        runtimehelper.register_async_file_result(ctx, dpath)
+        _spawn_operation_err(argv)
+        return
+
+    try:
+        subprocess.run(argv, check=True, capture_output=True)
+    except subprocess.CalledProcessError as exc:
+        error = exc.stderr.decode("UTF-8", "replace").strip()
+        raise OperationError(error or str(exc)) from exc
+    except OSError as exc:
+        raise OperationError(str(exc)) from exc
+
+
 class Scale(Action):
     def __init__(self):
         Action.__init__(self, _("Scale..."))
@@ -45,6 +65,9 @@ class Scale(Action):
     def wants_context(self):
         return True
 
+    def is_parallel_safe(self):
+        return True
+
     def activate(self, leaf, iobj=None, ctx=None):
         assert iobj
         size = self._make_size(iobj.object)
@@ -54,8 +77,7 @@ class Scale(Action):
         filename = f"{head}_{size}{ext}"
         dpath = fileutils.get_destpath_in_directory(dirname, filename)
         argv = ["convert", "-scale", str(size), fpath, dpath]
-        runtimehelper.register_async_file_result(ctx, dpath)
-        _spawn_operation_err(argv)
+        _run_operation(ctx, argv, dpath)
         return FileLeaf(dpath)
 
     def item_types(self):
@@ -104,6 +126,9 @@ class RotateBase(Action):
     def wants_context(self):
         return True
 
+    def is_parallel_safe(self):
+        return True
+
     def activate(self, leaf, iobj=None, ctx=None):
         assert ctx
 
@@ -122,8 +147,7 @@ class RotateBase(Action):
             dpath,
             fpath,
         ]
-        runtimehelper.register_async_file_result(ctx, dpath)
-        _spawn_operation_err(argv)
+        _run_operation(ctx, argv, dpath)
         return FileLeaf(dpath)
 
     def item_types(self):
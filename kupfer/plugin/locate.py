@@ -5,12 +5,12 @@ __version__ = ""
 __author__ = "Ulrik Sverdrup <ulrik.sverdrup@gmail.com>"
 
 import shutil
-import subprocess
 import typing as ty
 
 from kupfer import icons, plugin_support
-from kupfer.obj import Action, Leaf, Source, TextLeaf
+from kupfer.obj import Action, TextLeaf
 from kupfer.obj.filesrc import construct_file_leaf
+from kupfer.obj.sources import StreamingCommandSource
 from kupfer.obj.special import CommandNotAvailableLeaf
 from kupfer.support import kupferstring
 
@@ -54,46 +54,38 @@ class Locate(Action):
         return "edit-find"
 
 
-class LocateQuerySource(Source):
+class LocateQuerySource(StreamingCommandSource):
+    record_separator = b"\x00"
+
     def __init__(self, query):
-        Source.__init__(self, name=_('Results for "%s"') % query)
+        super().__init__(name=_('Results for "%s"') % query, max_items=500)
         self.query = query
-        self.max_items = 500
 
     def repr_key(self):
         return self.query
 
     def get_items(self):
-        locate_cmd = shutil.which("locate")
-        if not locate_cmd:
+        if not shutil.which("locate"):
             yield CommandNotAvailableLeaf(__name__, __kupfer_name__, "locate")
             return
 
-        ignore_case = (
-            "--ignore-case" if __kupfer_settings__["ignore_case"] else ""
-        )
-        # Start two processes, one to take the first hits, one
-        # to take the remaining up to maximum. We start both at the same time
-        # (regrettably, locate wont output streamingly to stdout)
-        # but we ask the second for results only after iterating the first few
-        first_num = 12
-
-        def load(limit: int, offset: int) -> ty.Iterator[Leaf]:
-            command = [
-                locate_cmd,
-                "--null",
-                "--limit",
-                str(limit),
-                ignore_case,
-                self.query,
-            ]
-            with subprocess.Popen(command, stdout=subprocess.PIPE) as proc:
-                out, _ignored_err = proc.communicate()
-                for f in out.split(b"\x00")[offset:-1]:
-                    yield construct_file_leaf(kupferstring.fromlocale(f))
-
-        yield from load(first_num, 0)
-        yield from load(self.max_items, first_num)
+        yield from super().get_items()
+
+    def get_command(self):
+        command = [
+            "locate",
+            "--null",
+            "--limit",
+            str(self.max_items),
+        ]
+        if __kupfer_settings__["ignore_case"]:
+            command.append("--ignore-case")
+
+        command.append(self.query)
+        return command
+
+    def parse_record(self, record):
+        return construct_file_leaf(kupferstring.fromlocale(record))
 
     def get_gicon(self):
         return icons.ComposedIcon("gnome-terminal", self.get_icon_name())
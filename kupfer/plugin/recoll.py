@@ -8,14 +8,14 @@ __author__ = "KB"
 
 import base64
 import shutil
-import subprocess
 import typing as ty
 from contextlib import suppress
 
 from gi.repository import Gio
 
 from kupfer import launch, plugin_support
-from kupfer.obj import Action, FileLeaf, OperationError, Source, TextLeaf
+from kupfer.obj import Action, FileLeaf, OperationError, TextLeaf
+from kupfer.obj.sources import StreamingCommandSource
 from kupfer.obj.special import CommandNotAvailableLeaf
 
 if ty.TYPE_CHECKING:
@@ -83,29 +83,30 @@ class OpenInRecoll(Action):
         return "find"
 
 
-class RecollQuerySource(Source):
+class RecollQuerySource(StreamingCommandSource):
     def __init__(self, query):
-        Source.__init__(self, name=_('Results for "%s"') % query)
+        super().__init__(name=_('Results for "%s"') % query, max_items=100)
         self._query = query.strip()
-        self._max_items = 100
 
     def repr_key(self):
         return f"recoll_query:{self._query}"
 
     def get_items(self):
-        recoll_cmd = shutil.which("recoll")
-        if not recoll_cmd:
+        if not shutil.which("recoll"):
             yield CommandNotAvailableLeaf(__name__, __kupfer_name__, "recoll")
             return
 
         if not self._query:
             return
 
-        command = [
-            recoll_cmd,
+        yield from super().get_items()
+
+    def get_command(self):
+        return [
+            "recoll",
             "-t",
             "-n",
-            str(self._max_items),
+            str(self.max_items),
             "-F",
             "url filename title mtype",
             "-S",
@@ -114,20 +115,23 @@ class RecollQuerySource(Source):
             self._query,
         ]
 
-        with subprocess.Popen(command, stdout=subprocess.PIPE) as proc:
-            out, _error = proc.communicate()
-            for line in out.splitlines():
-                if line.startswith(b"Recoll") or b"results" in line:
-                    continue
-
-                uri, filename, title, mtype, *_dummy = tuple(
-                    base64.b64decode(v).decode() for v in line.split(b" ")
-                )
+    def parse_record(self, record):
+        if record.startswith(b"Recoll") or b"results" in record:
+            return None
 
-                with suppress(OSError):
-                    gfile = Gio.File.new_for_uri(uri)
-                    fpath = gfile.get_path()
-                    yield RecollLeaf(fpath, title or filename, mtype)
+        try:
+            uri, filename, title, mtype, *_dummy = tuple(
+                base64.b64decode(v).decode() for v in record.split(b" ")
+            )
+        except ValueError:
+            return None
+
+        with suppress(OSError):
+            gfile = Gio.File.new_for_uri(uri)
+            if fpath := gfile.get_path():
+                return RecollLeaf(fpath, title or filename, mtype)
+
+        return None
 
     def has_parent(self) -> bool:
         return False
@@ -6,6 +6,9 @@ Changes:
     2023-02-19 KB:
         + catch errors when no mpris is available via dbus
         + simplify dbus string conversion
+    2026-10-18:
+        + load songs in pages, without limit of library size
+        + keep library snapshot in cache and update indexes incrementally
 
 NOTE: this require Rhythmbox with mpris support (i.e. rhythmbox-plugins package
 installed)
@@ -16,12 +19,10 @@ from __future__ import annotations
 __kupfer_name__ = _("Rhythmbox")
 __kupfer_sources__ = ("RhythmboxSource",)
 __description__ = _("Play and enqueue tracks and browse the music library")
-__version__ = "2023.1"
+__version__ = "2026.1"
 __author__ = "US, Karol Będkowski"
 
 
-import itertools
-import operator
 import os
 import typing as ty
 from collections import defaultdict
@@ -79,6 +80,16 @@ _OBJ_PATH_MPRIS = "/org/mpris/MediaPlayer2"
 _OBJ_NAME_MPRIS_PLAYER = "org.mpris.MediaPlayer2.Player"
 _OBJ_PATH_MEDIASERVC_ALL = "/org/gnome/UPnP/MediaServer2/Library/all"
 _OBJ_NAME_MEDIA_CONT = "org.gnome.UPnP.MediaContainer2"
+# number of songs loaded in one ListItems call
+_PAGE_SIZE = 1000
+_SONG_PROPERTIES = (
+    "Album",
+    "Artist",
+    "DisplayName",
+    "TrackNumber",
+    "URLs",
+    "Date",
+)
 
 
 def _toutf8_lossy(ustr):
@@ -114,23 +125,50 @@ def _tracknr(string: ty.Any) -> int | None:
         return None
 
 
-def _get_all_songs_via_dbus():
+def _convert_song(item: ty.Any) -> rhythmbox_support.Song | None:
+    if not (urls := item.get("URLs")):
+        return None
+
+    return {
+        "title": str(item.get("DisplayName", "")),
+        "artist": str(item.get("Artist", "")),
+        "album": str(item.get("Album", "")),
+        "track-number": _tracknr(item.get("TrackNumber", "")),
+        "location": str(urls[0]),
+        "date": str(item.get("Date", "")),
+    }
+
+
+def _get_songs_pages_via_dbus() -> ty.Iterator[list[rhythmbox_support.Song]]:
+    """Load songs from Rhythmbox library in pages of `_PAGE_SIZE` items."""
+    iface = _create_dbus_connection_mpris(
+        _OBJ_NAME_MEDIA_CONT, _OBJ_PATH_MEDIASERVC_ALL
+    )
+    if not iface:
+        return
+
+    offset = 0
+    while True:
+        items = iface.ListItems(offset, _PAGE_SIZE, _SONG_PROPERTIES)
+        yield [song for item in items if (song := _convert_song(item))]
+        if len(items) < _PAGE_SIZE:
+            break
+
+        offset += len(items)
+
+
+def _load_songs_via_dbus() -> list[rhythmbox_support.Song] | None:
+    """Load all songs; return None when Rhythmbox is not available."""
+    songs: list[rhythmbox_support.Song] = []
     try:
-        iface = _create_dbus_connection_mpris(
-            _OBJ_NAME_MEDIA_CONT, _OBJ_PATH_MEDIASERVC_ALL
-        )
-        if iface:
-            for item in iface.ListItems(0, 9999, ["*"]):
-                yield {
-                    "album": str(item["Album"]),
-                    "artist": str(item["Artist"]),
-                    "title": str(item["DisplayName"]),
-                    "track-number": _tracknr(item["TrackNumber"]),
-                    "location": str(item["URLs"][0]),
-                    "date": str(item["Date"]),
-                }
+        for page in _get_songs_pages_via_dbus():
+            songs.extend(page)
+
     except Exception:
-        pretty.print_exc(__name__, "_get_all_songs_via_dbus error")
+        pretty.print_exc(__name__, "_load_songs_via_dbus error")
+        return None
+
+    return songs or None
 
 
 def spawn_async(argv):
@@ -447,16 +485,14 @@ class ArtistLeaf(TrackCollection):
 
 
 class RhythmboxAlbumsSource(Source):
-    def __init__(self, library):
+    def __init__(self, library: rhythmbox_support.Library) -> None:
         Source.__init__(self, _("Albums"))
         self.library = library
 
     def get_items(self):
-        for album in self.library:
-            yield AlbumLeaf(self.library[album], album)
-
-    def should_sort_lexically(self):
-        return True
+        albums = self.library.albums
+        for album in self.library.sorted_albums():
+            yield AlbumLeaf(albums[album], album)
 
     def get_description(self):
         return _("Music albums in Rhythmbox Library")
@@ -474,16 +510,14 @@ class RhythmboxAlbumsSource(Source):
 
 
 class RhythmboxArtistsSource(Source):
-    def __init__(self, library):
+    def __init__(self, library: rhythmbox_support.Library) -> None:
         Source.__init__(self, _("Artists"))
         self.library = library
 
     def get_items(self):
-        for artist in self.library:
-            yield ArtistLeaf(self.library[artist], artist)
-
-    def should_sort_lexically(self):
-        return True
+        artists = self.library.artists
+        for artist in self.library.sorted_artists():
+            yield ArtistLeaf(artists[artist], artist)
 
     def get_description(self):
         return _("Music artists in Rhythmbox Library")
@@ -500,32 +534,15 @@ class RhythmboxArtistsSource(Source):
         yield ArtistLeaf
 
 
-def _locale_sort_artist_album_songs(artists):
-    """Locale sort dictionary @artists by Artist, then Album;
-    each artist in @artists should already contain songs
-    grouped by album and sorted by track number.
-    """
-    for artist in kupferstring.locale_sort(artists):
-        artist_songs = artists[artist]
-        albums: dict[str, list[rhythmbox_support.Song]] = defaultdict(list)
-        for album, songs in itertools.groupby(
-            artist_songs, operator.itemgetter("album")
-        ):
-            albums[album].extend(songs)
-
-        for album in kupferstring.locale_sort(albums):
-            yield from albums[album]
-
-
 class RhythmboxSongsSource(Source):
     """The whole song library in Leaf representation"""
 
-    def __init__(self, library):
+    def __init__(self, library: rhythmbox_support.Library) -> None:
         Source.__init__(self, _("Songs"))
         self.library = library
 
     def get_items(self):
-        for song in _locale_sort_artist_album_songs(self.library):
+        for song in self.library.sorted_songs():
             yield SongLeaf(song)
 
     def get_actions(self):
@@ -549,8 +566,11 @@ class RhythmboxSource(AppLeafContentMixin, Source, PicklingHelperMixin):
 
     def __init__(self):
         super().__init__(_("Rhythmbox"))
-        self._version = 3
-        self._songs = []
+        self._version = 4
+        # library is pickled with source, so it is available on startup
+        # before Rhythmbox is queried
+        self._library = rhythmbox_support.Library()
+        self._reload = True
 
     def initialize(self):
         bus = dbus.SessionBus()
@@ -564,21 +584,31 @@ class RhythmboxSource(AppLeafContentMixin, Source, PicklingHelperMixin):
 
     def _name_owner_changed(self, name, old, new):
         if new:
+            self._reload = True
             self.mark_for_update()
 
     def pickle_prepare(self):
         self.mark_for_update()
 
+    def get_items_forced(self):
+        self._reload = True
+        return self.get_items()
+
     def get_items(self):
-        # first try to load songs via dbus
-        songs = list(_get_all_songs_via_dbus())
-        self._songs = songs = songs or self._songs
-        albums = rhythmbox_support.parse_rhythmbox_albums(songs)
-        artists = rhythmbox_support.parse_rhythmbox_artists(songs)
+        if self._reload or not self._library:
+            # keep previous library when Rhythmbox is not available; update
+            # only changed albums and artists (and keep other sorted indexes)
+            songs = _load_songs_via_dbus()
+            if songs and self._library.update(songs):
+                self.output_debug("Library updated")
+
+            self._reload = False
+
+        library = self._library
         yield ClearQueue()
-        artist_source = RhythmboxArtistsSource(artists)
-        album_source = RhythmboxAlbumsSource(albums)
-        songs_source = RhythmboxSongsSource(artists)
+        artist_source = RhythmboxArtistsSource(library)
+        album_source = RhythmboxAlbumsSource(library)
+        songs_source = RhythmboxSongsSource(library)
         yield SourceLeaf(artist_source)
         yield SourceLeaf(album_source)
         yield SourceLeaf(songs_source)
@@ -1,66 +1,216 @@
-import operator
 import typing as ty
 from collections import defaultdict
 
+from kupfer.support import kupferstring
+
 Song = dict[str, ty.Any]
 
 
-def _sort_album(album: list[Song]) -> None:
-    """Sort album in track order"""
+# keys of song dictionary, in order used in compact library snapshot
+SONG_KEYS = ("title", "artist", "album", "track-number", "location", "date")
+
+
+def _song_row(song: Song) -> tuple[ty.Any, ...]:
+    return tuple(song[key] for key in SONG_KEYS)
+
+
+def _get_track_number(rec: Song) -> int:
+    try:
+        tnr = int(rec["track-number"])
+    except (KeyError, ValueError, TypeError):
+        tnr = 0
+    return tnr
 
-    def get_track_number(rec):
-        try:
-            tnr = int(rec["track-number"])
-        except (KeyError, ValueError):
-            tnr = 0
-        return tnr
 
-    album.sort(key=get_track_number)
+def _sort_album(album: list[Song]) -> None:
+    """Sort album in track order"""
+    album.sort(key=_get_track_number)
 
 
 def _sort_album_order(songs: list[Song]) -> None:
     """Sort songs in order by album then by track number
 
     >>> songs = [
-    ... {"title": "a", "album": "B", "track-number": 2},
-    ... {"title": "b", "album": "A", "track-number": 1},
-    ... {"title": "c", "album": "B", "track-number": 1},
+    ... {"title": "a", "album": "B", "track-number": 2, "date": "0"},
+    ... {"title": "b", "album": "A", "track-number": 1, "date": "0"},
+    ... {"title": "c", "album": "B", "track-number": None, "date": "0"},
     ... ]
     >>> _sort_album_order(songs)
     >>> [s["title"] for s in songs]
     ['b', 'c', 'a']
     """
 
-    songs.sort(key=operator.itemgetter("date", "album", "track-number"))
+    songs.sort(key=lambda s: (s["date"], s["album"], _get_track_number(s)))
 
 
-def parse_rhythmbox_albums(songs: ty.Iterable[Song]) -> dict[str, list[Song]]:
-    albums: dict[str, list[Song]] = defaultdict(list)
-    for song in songs:
-        if not song["artist"]:
-            continue
+class Library:
+    """Songs library with albums and artists indexes.
 
-        if song_album := song["album"]:
-            albums[song_album].append(song)
+    Indexes are updated incrementally by `add_songs` and `update`; only
+    albums and artists touched since last call are sorted again by `finish`.
+    Sorted (in locale order) names and songs are computed on demand and
+    cached until library is changed.
 
-    # sort album in track order
-    for album in albums.values():
-        _sort_album(album)
+    Library is pickled as a compact tuple of song rows.
+    """
 
-    return albums
+    def __init__(self) -> None:
+        self.songs: list[Song] = []
+        self.albums: dict[str, list[Song]] = {}
+        self.artists: dict[str, list[Song]] = {}
+        self._dirty_albums: set[str] = set()
+        self._dirty_artists: set[str] = set()
+        self._sorted: dict[str, list[ty.Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self.songs)
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, Library) and self.songs == other.songs
+
+    # library is mutable
+    __hash__ = None  # type: ignore[assignment]
+
+    def add_songs(self, songs: ty.Iterable[Song]) -> None:
+        for song in songs:
+            self.songs.append(song)
+            if not (artist := song["artist"]):
+                continue
+
+            self.artists.setdefault(artist, []).append(song)
+            self._dirty_artists.add(artist)
+            if album := song["album"]:
+                self.albums.setdefault(album, []).append(song)
+                self._dirty_albums.add(album)
+
+        self._sorted.clear()
+
+    def _remove_songs(self, songs: list[Song]) -> None:
+        removed = {id(song) for song in songs}
+        for index, key in ((self.artists, "artist"), (self.albums, "album")):
+            for name in {song[key] for song in songs}:
+                if (items := index.get(name)) is None:
+                    continue
+
+                # removing songs does not change order of the rest
+                if remaining := [s for s in items if id(s) not in removed]:
+                    index[name] = remaining
+                else:
+                    del index[name]
+
+        self._sorted.clear()
+
+    def update(self, songs: ty.Iterable[Song]) -> bool:
+        """Update library to contain `songs`. Only new and removed songs
+        are applied to indexes. Return True when library was changed.
+
+        >>> lib = Library()
+        >>> song = dict.fromkeys(SONG_KEYS, "")
+        >>> lib.update([{**song, "artist": "A", "album": "X"}])
+        True
+        >>> lib.update([{**song, "artist": "A", "album": "X"}])
+        False
+        >>> lib.update([{**song, "artist": "B", "album": "X"}])
+        True
+        >>> sorted(lib.artists), [s["artist"] for s in lib.albums["X"]]
+        (['B'], ['B'])
+        """
+        current: dict[tuple[ty.Any, ...], list[Song]] = defaultdict(list)
+        for song in self.songs:
+            current[_song_row(song)].append(song)
+
+        kept: list[Song] = []
+        added: list[Song] = []
+        for song in songs:
+            if same := current.get(_song_row(song)):
+                kept.append(same.pop())
+            else:
+                added.append(song)
+
+        removed = [song for same in current.values() for song in same]
+        if not added and not removed:
+            return False
+
+        self._remove_songs(removed)
+        self.songs = kept
+        self.add_songs(added)
+        self.finish()
+        return True
+
+    def finish(self) -> None:
+        """Sort changed albums in track order and changed artists in
+        album + track order."""
+        for album in self._dirty_albums:
+            _sort_album(self.albums[album])
+
+        for artist in self._dirty_artists:
+            _sort_album_order(self.artists[artist])
+
+        self._dirty_albums.clear()
+        self._dirty_artists.clear()
+
+    def _get_sorted(
+        self, name: str, func: ty.Callable[[], list[ty.Any]]
+    ) -> list[ty.Any]:
+        if (res := self._sorted.get(name)) is None:
+            self.finish()
+            res = self._sorted[name] = func()
+
+        return res
+
+    def sorted_albums(self) -> list[str]:
+        """Album names in locale order."""
+        return self._get_sorted(
+            "albums", lambda: kupferstring.locale_sort(self.albums)
+        )
+
+    def sorted_artists(self) -> list[str]:
+        """Artist names in locale order."""
+        return self._get_sorted(
+            "artists", lambda: kupferstring.locale_sort(self.artists)
+        )
+
+    def sorted_songs(self) -> list[Song]:
+        """Songs sorted by artist, then album (both in locale order), then
+        track number."""
+
+        def sort_songs():
+            songs = []
+            for artist in self.sorted_artists():
+                albums: dict[str, list[Song]] = defaultdict(list)
+                for song in self.artists[artist]:
+                    albums[song["album"]].append(song)
+
+                for album in kupferstring.locale_sort(albums):
+                    songs.extend(albums[album])
+
+            return songs
+
+        return self._get_sorted("songs", sort_songs)
+
+    def __getstate__(self) -> dict[str, ty.Any]:
+        return {"songs": tuple(_song_row(song) for song in self.songs)}
+
+    def __setstate__(self, state: dict[str, ty.Any]) -> None:
+        self.__init__()  # type: ignore
+        self.add_songs(
+            dict(zip(SONG_KEYS, row, strict=True)) for row in state["songs"]
+        )
+        self.finish()
 
 
-def parse_rhythmbox_artists(songs: ty.Iterable[Song]) -> dict[str, list[Song]]:
-    artists: dict[str, list[Song]] = defaultdict(list)
-    for song in songs:
-        if song_artist := song["artist"]:
-            artists[song_artist].append(song)
+def parse_rhythmbox_albums(songs: ty.Iterable[Song]) -> dict[str, list[Song]]:
+    library = Library()
+    library.add_songs(songs)
+    library.finish()
+    return library.albums
 
-    # sort in album + track order
-    for artist in artists.values():
-        _sort_album_order(artist)
 
-    return artists
+def parse_rhythmbox_artists(songs: ty.Iterable[Song]) -> dict[str, list[Song]]:
+    library = Library()
+    library.add_songs(songs)
+    library.finish()
+    return library.artists
 
 
 if __name__ == "__main__":
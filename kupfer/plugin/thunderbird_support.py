@@ -8,6 +8,8 @@ Concept for mork parser from:
 2021-01-01 Add support sqlite address book file format
 2022-06-14 Support new (?) sqlite address book file format; load also
            history.sqlite
+2026-10-18 One-pass streaming mork tokenizer; pivoted sqlite query; cache
+           loaded address books by file mtime and size
 """
 
 import os
@@ -33,17 +35,14 @@ _THUNDERBIRD_PROFILES = [
 ]
 
 
-_RE_COLS = re.compile(r"<\s*<\(a=c\)>\s*(\/\/)?\s*(\(.+?\))\s*>")
-_RE_CELL = re.compile(r"\((.+?)\)")
-_RE_ATOM = re.compile(r"<\s*(\(.+?\))\s*>")
-_RE_TABLE = re.compile(
-    r"\{-?(\d+):\^(..)\s*\{\(k\^(..):c\)\(s=9u?\)\s*(.*?)\}\s*(.+?)\}"
-)
-_RE_ROW = re.compile(r"(-?)\s*\[(.+?)((\(.+?\)\s*)*)\]")
-_RE_CELL_TEXT = re.compile(r"\^(.+?)=(.*)")
-_RE_CELL_OID = re.compile(r"\^(.+?)\^(.+)")
-_RE_TRAN_BEGIN = re.compile(r"@\$\$\{.+?\{\@")
-_RE_TRAN_END = re.compile(r"@\$\$\}.+?\}\@")
+# single tokens of mork file: cell, group (transaction) markers and ids
+_RE_MORK_CELL = re.compile(r"\(((?:[^)\\]|\\.)*)\)", re.DOTALL)
+_RE_MORK_GROUP = re.compile(r"@\$\$([{}])(.*?)[{}]@", re.DOTALL)
+_RE_MORK_ID = re.compile(r"[^\s()<>\[\]{}@/]+|/(?!/)")
+_RE_LINE_CONT = re.compile(r"\\\r?\n")
+_MORK_DELIMITERS = frozenset("<>[]{}")
+# approximate size of mork file chunk read at once
+_MORK_CHUNK_SIZE = 65536
 
 
 _COLS_TO_KEEP = (
@@ -55,6 +54,7 @@ _COLS_TO_KEEP = (
 )
 
 SPECIAL_CHARS = (
+    ("\\)", ")"),
     ("\\\\", "\\"),
     ("\\$", "$"),
     ("\\t", chr(9)),
@@ -110,144 +110,237 @@ def _unescape_data(instr: str) -> str:
     return instr
 
 
-def _read_mork_filecontent(filename: str) -> ty.Iterable[str]:
-    with open(filename, encoding="UTF-8") as mfile:
-        header = mfile.readline().strip()
-        # check header
-        if not RE_HEADER.match(header):
-            pretty.print_debug(__name__, "_read_mork: header error", header)
-            return
+# pylint: disable=too-many-branches
+def _iter_mork_tokens(  # noqa:PLR0912
+    chunks: ty.Iterable[str],
+) -> ty.Iterator[tuple[str, str]]:
+    """Split mork data (read in `chunks`) into tokens in one pass.
+
+    Yield tuples (kind, value) where kind is one of delimiters: ``<>[]{}``,
+    ``(`` for cell (value is cell content), ``@{`` / ``@}`` for begin / end
+    of group (transaction) or ``id`` for other (id) tokens.
 
-        for line in mfile:
-            # remove blank lines and comments
-            line = line.strip()  # noqa: PLW2901
-            if not line:
+    Only the not yet tokenized part of data is kept in memory; when a token
+    may continue in the next chunk, next chunk is appended.
+    """
+    chunks_iter = iter(chunks)
+    data = ""
+    pos = 0
+    final = False
+    while True:
+        size = len(data)
+        if pos >= size:
+            if final:
+                return
+
+        else:
+            char = data[pos]
+            if char.isspace():
+                pos += 1
                 continue
 
-            # remove comments
-            if (comments := line.find("// ")) > -1:
-                line = line[:comments].strip()  # noqa: PLW2901
+            if char in _MORK_DELIMITERS:
+                yield char, char
+                pos += 1
+                continue
 
-            if line:
-                yield line.replace("\\)", "$29")
+            if char == "(":
+                if match := _RE_MORK_CELL.match(data, pos):
+                    yield "(", match.group(1)
+                    pos = match.end()
+                    continue
 
+                if final:
+                    # unterminated cell
+                    return
 
-# pylint: disable=too-many-locals,too-many-nested-blocks,too-many-branches
-# pylint: disable=too-many-statements
-def _read_mork(filename: str) -> dict[str, _Table]:  # noqa:PLR0915,PLR0912
-    """Read mork file, return tables from file"""
+            elif data.startswith("//", pos):
+                # comment to end of line
+                if (end := data.find("\n", pos)) >= 0:
+                    pos = end
+                    continue
 
-    data = "".join(_read_mork_filecontent(filename))
-    if not data:
-        return {}
+                if final:
+                    return
 
-    # decode data
-    cells = {}
-    atoms = {}
-    tables: dict[str, _Table] = {}
-    pos = 0
-    active_trans = False
-    while data:
-        data = data[pos:].lstrip()
-        if not data:
-            break
+            elif char == "@":
+                if match := _RE_MORK_GROUP.match(data, pos):
+                    yield "@" + match.group(1), match.group(2)
+                    pos = match.end()
+                    continue
 
-        # cols
-        if match := _RE_COLS.match(data):
-            for cell in _RE_CELL.findall(match.group()):
-                key, val = cell.split("=", 1)
-                if val in _COLS_TO_KEEP:  # skip necessary columns
-                    cells[key] = val
+                # skip "@" when it can't start a group: "@$${" or "@$$}"
+                if final or (
+                    len(prefix := data[pos : pos + 3]) == 3  # noqa:PLR2004
+                    and prefix != "@$$"
+                ):
+                    pos += 1
+                    continue
 
-            pos = match.span()[1]
-            continue
+            elif match := _RE_MORK_ID.match(data, pos):
+                # id may continue in the next chunk
+                if final or match.end() < size:
+                    yield "id", match.group()
+                    pos = match.end()
+                    continue
 
-        # atoms
-        if match := _RE_ATOM.match(data):
-            for cell in _RE_CELL.findall(match.group()):
-                if "=" in cell:
-                    key, val = cell.split("=", 1)
-                    atoms[key] = val
+            else:
+                pos += 1
+                continue
 
-            pos = match.span()[1]
-            continue
+        # token is not complete; get more data
+        if (chunk := next(chunks_iter, None)) is None:
+            final = True
+        else:
+            data = data[pos:] + chunk
+            pos = 0
+
+
+def _parse_mork_cell(
+    cell: str, columns: dict[str, str], atoms: dict[str, str]
+) -> tuple[str | None, str | None]:
+    """Parse row cell; return (column name, value)."""
+    if not cell.startswith("^"):
+        col, _sep, value = cell.partition("=")
+        return col, value
+
+    colid, sep, value = cell[1:].partition("=")
+    if sep:
+        return columns.get(colid), value
+
+    colid, sep, atomid = cell[1:].partition("^")
+    if sep:
+        return columns.get(colid), atoms.get(atomid)
+
+    return None, None
+
+
+# pylint: disable=too-many-branches,too-many-statements
+def _parse_mork(  # noqa:PLR0912,PLR0915
+    chunks: ty.Iterable[str],
+) -> dict[str, _Table]:
+    """Parse mork data read in `chunks` in one pass over tokens."""
+    columns: dict[str, str] = {}
+    atoms: dict[str, str] = {}
+    tables: dict[str, _Table] = {}
+
+    # stack of open containers (token kinds)
+    stack: list[str] = []
+    # dict: cells defines columns (a=c) instead of atoms
+    dict_columns = False
+    table: _Table | None = None
+    # current row: table, id and depth in stack
+    row_table: _Table | None = None
+    rowid: str | None = None
+    row_depth = 0
+    # next row is removed from table
+    cut_next_row = False
+
+    for kind, value in _iter_mork_tokens(chunks):
+        if kind in ("<", "[", "{"):
+            parent = stack[-1] if stack else None
+            stack.append(kind)
+            if kind == "<" and parent is None:
+                dict_columns = False
+
+            elif kind == "[" and parent in (None, "{"):
+                row_table = table if parent == "{" else None
+                rowid = None
+                row_depth = len(stack)
 
-        # tables
-        if match := _RE_TABLE.match(data):
-            tableid = ":".join(match.groups()[0:2])
-            table = tables.get(tableid)
-            if not table:
-                table = tables[tableid] = _Table(tableid)
-
-            for row in _RE_ROW.findall(match.group()):
-                tran, rowid = row[:2]
-                if active_trans and rowid[0] == "-":
-                    rowid = rowid[1:]
-                    table.del_row(rowid)
-
-                if not active_trans or tran != "-":
-                    rowdata = row[2:]
-                    rowcell: str
-                    for rowcell in filter(None, rowdata):
-                        for cell in _RE_CELL.findall(rowcell):
-                            atom, col = None, None
-                            if cmatch := _RE_CELL_TEXT.match(cell):
-                                col = cells.get(cmatch.group(1))
-                                atom = cmatch.group(2)
-                            elif cmatch := _RE_CELL_OID.match(cell):
-                                col = cells.get(cmatch.group(1))
-                                atom = atoms.get(cmatch.group(2))
-
-                            if col and atom:
-                                table.add_cell(rowid, col, atom)
-
-            pos = match.span()[1]
             continue
 
-        # transaction
-        if _RE_TRAN_BEGIN.match(data):
-            active_trans = True
+        if kind in (">", "]", "}"):
+            if stack:
+                closed = stack.pop()
+                if closed == "{" and not stack:
+                    table = None
+                elif closed == "[" and len(stack) < row_depth:
+                    rowid = None
+
             continue
 
-        if _RE_TRAN_END.match(data):
-            tran = True
+        if kind in ("@{", "@}"):
             continue
 
-        # dangling rows
-        if match := _RE_ROW.match(data):
-            row = match.groups()
-            tran, rowid = row[:2]
-            table = tables.get("1:80")  # bind to default table
-            if rowid[0] == "-":
-                rowid = rowid[1:]
-                if table:
-                    table.del_row(rowid)
-
-            if tran != "-" and (rowdata := row[2:]):
+        current = stack[-1] if stack else None
+        if kind == "id":
+            if current is None and value == "-":
+                cut_next_row = True
+
+            elif current == "{" and len(stack) == 1 and table is None:
+                # table id; like 1:^80
+                tableid = value.lstrip("-").replace("^", "")
+                table = tables.get(tableid)
                 if not table:
-                    table = tables["1:80"] = _Table("1:80")
-
-                for rowcell in filter(None, rowdata):
-                    for cell in _RE_CELL.findall(rowcell):
-                        atom, col = None, None
-                        if cmatch := _RE_CELL_TEXT.match(cell):
-                            col = cells.get(cmatch.group(1))
-                            atom = cmatch.group(2)
-                        elif cmatch := _RE_CELL_OID.match(cell):
-                            col = cells.get(cmatch.group(1))
-                            atom = atoms.get(cmatch.group(2))
-
-                        if col and atom:
-                            table.add_cell(rowid, col, atom)
-
-            pos = match.span()[1]
+                    table = tables[tableid] = _Table(tableid)
+
+            elif current == "{" and value == "-":
+                cut_next_row = True
+
+            elif current == "[" and rowid is None and len(stack) == row_depth:
+                # row id; "-" prefix clear row content
+                if not row_table:
+                    # bind dangling rows to default table
+                    row_table = tables.get("1:80")
+                    if not row_table:
+                        row_table = tables["1:80"] = _Table("1:80")
+
+                if cut_next_row or value.startswith("-"):
+                    row_table.del_row(value.lstrip("-"))
+
+                rowid = value.lstrip("-")
+                if cut_next_row:
+                    # row removed from table; ignore its cells
+                    rowid = ""
+                    cut_next_row = False
+
             continue
 
-        pos = 1
+        # cells
+        if current == "<":
+            if len(stack) > 1:
+                # dict meta: (a=c) define columns dict
+                if value.replace(" ", "") == "a=c":
+                    dict_columns = True
+
+                continue
+
+            key, _sep, val = value.partition("=")
+            if dict_columns:
+                if val in _COLS_TO_KEEP:
+                    columns[key] = val
+            else:
+                atoms[key] = val
+
+        elif rowid and len(stack) == row_depth and row_table is not None:
+            col, atom = _parse_mork_cell(value, columns, atoms)
+            if col and atom:
+                row_table.add_cell(rowid, col, atom)
 
     return tables
 
 
+def _iter_mork_chunks(mfile: ty.TextIO) -> ty.Iterator[str]:
+    """Read `mfile` in chunks of whole lines with continued lines joined."""
+    while chunk := mfile.read(_MORK_CHUNK_SIZE):
+        # chunk ends on line end, so line continuations are never split
+        chunk += mfile.readline()
+        yield _RE_LINE_CONT.sub("", chunk)
+
+
+def _read_mork(filename: str) -> dict[str, _Table]:
+    """Read mork file, return tables from file"""
+    with open(filename, encoding="UTF-8", errors="replace") as mfile:
+        header = mfile.readline().strip()
+        # check header
+        if not RE_HEADER.match(header):
+            pretty.print_debug(__name__, "_read_mork: header error", header)
+            return {}
+
+        return _parse_mork(_iter_mork_chunks(mfile))
+
+
 def _mork2contacts(tables: dict[str, _Table]) -> ty.Iterator[tuple[str, str]]:
     """Get contacts from mork table prepared by _read_mork"""
     if not tables:
@@ -269,45 +362,20 @@ def _mork2contacts(tables: dict[str, _Table]) -> ty.Iterator[tuple[str, str]]:
                     yield (display_name or email[: email.find("@")], email)
 
 
+# one pass over properties; works for both old (cards + properties) and new
+# (properties only) abook.sqlite format
 _ABOOK_CONTACTS_SQL = """
 select
-    (select value from properties
-     where card = c.uid and name = 'FirstName'
-    ) as FirstName,
-    (select value from properties
-     where card = c.uid and name = 'LastName'
-    ) as LastName,
-    (select value from properties
-     where card = c.uid and name = 'DisplayName'
-    ) as DisplayName,
-    (select value from properties
-     where card = c.uid and name = 'PrimaryEmail'
-    ) as PrimaryEmail,
-    (select value from properties
-     where card = c.uid and name = 'SecondEmail'
-    ) as SecondEmail
-from cards c
-"""
-
-# new version of abook.sqlite file
-_ABOOK_CONTACTS_SQL2 = """
-select
-    (select value from properties
-     where card = c.card and name = 'FirstName'
-    ) as FirstName,
-    (select value from properties
-     where card = c.card and name = 'LastName'
-    ) as LastName,
-    (select value from properties
-     where card = c.card and name = 'DisplayName'
-    ) as DisplayName,
-    (select value from properties
-     where card = c.card and name = 'PrimaryEmail'
-    ) as PrimaryEmail,
-    (select value from properties
-     where card = c.card and name = 'SecondEmail'
-    ) as SecondEmail
-from (select distinct card from properties) c
+    max(case when name = 'FirstName' then value end) as FirstName,
+    max(case when name = 'LastName' then value end) as LastName,
+    max(case when name = 'DisplayName' then value end) as DisplayName,
+    max(case when name = 'PrimaryEmail' then value end) as PrimaryEmail,
+    max(case when name = 'SecondEmail' then value end) as SecondEmail
+from properties
+where name in (
+    'FirstName', 'LastName', 'DisplayName', 'PrimaryEmail', 'SecondEmail'
+)
+group by card
 """
 
 
@@ -322,48 +390,39 @@ def _load_abook_sqlite(filename: str) -> ty.Iterator[tuple[str, str]]:
     dbfpath = filename.replace("?", "%3f").replace("#", "%23")
     dbfpath = "file:" + dbfpath + "?immutable=1&mode=ro"
 
-    for _ in range(2):
+    for attempt in range(2):
         try:
             pretty.print_debug(__name__, "_load_abook_sqlite load:", dbfpath)
             with closing(
                 sqlite3.connect(dbfpath, uri=True, timeout=1)
             ) as conn:
-                cur = conn.cursor()
-
-                # check db version
-                cur.execute(
-                    "select count(*) from sqlite_schema "
-                    "where name = 'list_cards'"
-                )
-                ver = cur.fetchone()[0]
-                abook_query = (
-                    _ABOOK_CONTACTS_SQL2 if ver else _ABOOK_CONTACTS_SQL
-                )
-                cur.execute(abook_query)
-
-                for (
-                    first_name,
-                    last_name,
-                    display_name,
-                    primary_email,
-                    second_email,
-                ) in cur:
-                    display_name = display_name or " ".join(  # noqa: PLW2901
-                        filter(None, (first_name, last_name))
-                    )
-                    for email in (primary_email, second_email):
-                        if email:
-                            yield (
-                                display_name or email.partition("@")[0],
-                                email,
-                            )
-            return
+                rows = conn.execute(_ABOOK_CONTACTS_SQL).fetchall()
+
+            break
         except sqlite3.Error as err:
             # Something is wrong with the database
-            # wait short time and try again
+            # wait short time and try again; error is raised after the last
+            # try so the (empty) result is not cached
             pretty.print_debug(__name__, "_load_abook_sqlite error:", str(err))
+            if attempt:
+                raise
+
             time.sleep(1)
 
+    for (
+        first_name,
+        last_name,
+        display_name,
+        primary_email,
+        second_email,
+    ) in rows:
+        display_name = display_name or " ".join(  # noqa: PLW2901
+            filter(None, (first_name, last_name))
+        )
+        for email in (primary_email, second_email):
+            if email:
+                yield (display_name or email.partition("@")[0], email)
+
 
 def get_addressbook_dirs() -> ty.Iterator[str]:
     """Get path to addressbook file from default profile."""
@@ -401,23 +460,54 @@ def get_addressbook_files() -> ty.Iterator[str]:
                     yield entry.path
 
 
+def _load_abook(abook: str) -> list[tuple[str, str]]:
+    if abook.endswith(".sqlite"):
+        return list(_load_abook_sqlite(abook))
+
+    return list(_mork2contacts(_read_mork(abook)))
+
+
+# address book file -> ((mtime, size), contacts)
+_CONTACTS_CACHE: dict[str, tuple[tuple[int, int], list[tuple[str, str]]]] = {}
+
+
 def get_contacts() -> ty.Iterator[tuple[str, str]]:
     """Get all contacts from all Thunderbird address books as
-    ((contact name, contact email))"""
+    ((contact name, contact email)).
+
+    Contacts are cached per file and loaded again only when file modification
+    time or size changed.
+    """
+    abooks = set()
     for abook in get_addressbook_files():
+        abooks.add(abook)
+        try:
+            fstat = os.stat(abook)
+        except OSError as err:
+            pretty.print_error(__name__, "get_contacts error", abook, err)
+            continue
+
+        key = (fstat.st_mtime_ns, fstat.st_size)
+        if (cached := _CONTACTS_CACHE.get(abook)) and cached[0] == key:
+            yield from cached[1]
+            continue
+
         pretty.print_debug(__name__, "get_contacts:", abook)
-        if abook.endswith(".sqlite"):
-            try:
-                yield from _load_abook_sqlite(abook)
-            except Exception as err:
-                pretty.print_error(__name__, "get_contacts error", abook, err)
-        else:
-            try:
-                tables = _read_mork(abook)
-            except OSError as err:
-                pretty.print_error(__name__, "get_contacts error", abook, err)
-            else:
-                yield from _mork2contacts(tables)
+        try:
+            contacts = _load_abook(abook)
+        except Exception as err:
+            pretty.print_error(__name__, "get_contacts error", abook, err)
+            # keep previously loaded contacts
+            if cached:
+                yield from cached[1]
+
+            continue
+
+        _CONTACTS_CACHE[abook] = (key, contacts)
+        yield from contacts
+
+    for abook in _CONTACTS_CACHE.keys() - abooks:
+        del _CONTACTS_CACHE[abook]
 
 
 if __name__ == "__main__":
@@ -1,13 +1,13 @@
 __kupfer_name__ = _("Top")
 __kupfer_sources__ = ("TaskSource",)
 __description__ = _("Show running tasks and allow sending signals to them")
-__version__ = "2023-04-29"
+__version__ = "2026-10-18"
 __author__ = "Karol Będkowski <karol.bedkowski@gmail.com>"
 
 import operator
 import os
 import signal
-import subprocess
+import time
 import typing as ty
 from pathlib import Path
 
@@ -90,6 +90,130 @@ class _SignalsSource(Source):
         yield _Signal
 
 
+class _ProcInfo(ty.NamedTuple):
+    pid: int
+    cpu: float
+    mem: float
+    ptime: str
+    cmd: str
+
+
+def _format_cputime(ticks: int) -> str:
+    """Format cpu time like top TIME+ column (minutes:seconds.hundredths)."""
+    minutes, secs = divmod(ticks / _CLK_TCK, 60)
+    return f"{int(minutes)}:{secs:05.2f}"
+
+
+_CLK_TCK = os.sysconf("SC_CLK_TCK")
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+_MEM_TOTAL = os.sysconf("SC_PHYS_PAGES") * _PAGE_SIZE
+
+
+class _ProcessTable:
+    """Sample process table of current user directly from /proc.
+
+    CPU usage is computed from difference of cpu time between two samples;
+    processes are identified by (pid, start time) so reused pids are not
+    mixed. Sample is cached for `snapshot_ttl` seconds.
+    """
+
+    snapshot_ttl = 2.0
+
+    def __init__(self) -> None:
+        # (pid, starttime) -> cpu ticks (utime + stime) in last sample
+        self._prev_ticks: dict[tuple[int, int], int] = {}
+        self._prev_ts = 0.0
+        self._snapshot: list[_ProcInfo] = []
+
+    def get_processes(self) -> list[_ProcInfo]:
+        now = time.monotonic()
+        if now - self._prev_ts > self.snapshot_ttl:
+            self._snapshot = self._sample(now)
+
+        return self._snapshot
+
+    def _sample(self, now: float) -> list[_ProcInfo]:
+        uid = os.getuid()
+        uptime = _read_uptime()
+        elapsed = now - self._prev_ts if self._prev_ts else 0.0
+        prev_ticks = self._prev_ticks
+        ticks: dict[tuple[int, int], int] = {}
+        processes = []
+
+        with os.scandir("/proc") as entries:
+            for entry in entries:
+                if not entry.name.isdigit():
+                    continue
+
+                try:
+                    if entry.stat().st_uid != uid:
+                        continue
+
+                    info = _read_proc(entry.path)
+                except (OSError, ValueError, IndexError):
+                    # process finished or is not accessible
+                    continue
+
+                comm, cputicks, starttime, rss_pages, cmd = info
+                key = (int(entry.name), starttime)
+                ticks[key] = cputicks
+
+                if (prev := prev_ticks.get(key)) is not None and elapsed:
+                    cpu = (cputicks - prev) * 100.0 / (elapsed * _CLK_TCK)
+                else:
+                    # first sample of process - average from process start
+                    running = uptime - starttime / _CLK_TCK
+                    cpu = (
+                        cputicks * 100.0 / (running * _CLK_TCK)
+                        if running > 0
+                        else 0.0
+                    )
+
+                processes.append(
+                    _ProcInfo(
+                        key[0],
+                        round(cpu, 1),
+                        round(rss_pages * _PAGE_SIZE * 100.0 / _MEM_TOTAL, 1),
+                        _format_cputime(cputicks),
+                        cmd or comm,
+                    )
+                )
+
+        self._prev_ticks = ticks
+        self._prev_ts = now
+        return processes
+
+
+def _read_uptime() -> float:
+    with open("/proc/uptime", encoding="ascii") as uptime:
+        return float(uptime.read().split()[0])
+
+
+def _read_proc(procdir: str) -> tuple[str, int, int, int, str]:
+    """Read process informations from `procdir`.
+    Return (comm, cpu ticks, start time, resident pages, command line)."""
+    stat = Path(procdir, "stat").read_bytes().decode("utf-8", "replace")
+    # command name may contain spaces and parentheses
+    comm_end = stat.rindex(")")
+    comm = stat[stat.index("(") + 1 : comm_end]
+    # fields after command name; first is state (3rd field in proc(5))
+    fields = stat[comm_end + 2 :].split()
+    utime, stime = int(fields[11]), int(fields[12])
+    starttime = int(fields[19])
+
+    rss_pages = int(Path(procdir, "statm").read_text("ascii").split()[1])
+
+    cmdline = Path(procdir, "cmdline").read_bytes()
+    cmd = cmdline.rstrip(b"\x00").replace(b"\x00", b" ")
+    return (
+        comm,
+        utime + stime,
+        starttime,
+        rss_pages,
+        cmd.decode("utf-8", "replace"),
+    )
+
+
 class TaskSource(Source):
     task_update_interval_sec = 5
     source_use_cache = False
@@ -98,31 +222,40 @@ class TaskSource(Source):
     def __init__(self, name=_("Running Tasks")):
         Source.__init__(self, name)
         self._version = 3
+        self._proc_table = _ProcessTable()
+        # (snapshot, sort order) -> leaves
+        self._leaves_cache: tuple[ty.Any, str, list[Task]] | None = None
 
     def is_dynamic(self):
         return True
 
     def get_items(self):
-        uid = os.getuid()
-        with subprocess.Popen(
-            ["top", "-b", "-n", "1", "-u", str(uid)],
-            stdout=subprocess.PIPE,
-            env={"LC_NUMERIC": "C"},
-        ) as proc:
-            if proc.stdout:
-                content = proc.stdout.read()
-            else:
-                return
-
-        processes = parse_top_output(content)
+        processes = self._proc_table.get_processes()
         sort_order = __kupfer_settings__["sort_order"]
+        if (
+            (cache := self._leaves_cache)
+            and cache[0] is processes
+            and cache[1] == sort_order
+        ):
+            return cache[2]
+
+        leaves = list(self._create_leaves(processes, sort_order))
+        self._leaves_cache = (processes, sort_order, leaves)
+        return leaves
+
+    def _create_leaves(
+        self, processes: list[_ProcInfo], sort_order: str
+    ) -> ty.Iterator[Task]:
         if sort_order == _("Memory usage (descending)"):
             processes = sorted(
-                processes, key=operator.itemgetter(2), reverse=True
+                processes, key=operator.attrgetter("mem"), reverse=True
             )
         elif sort_order == _("Commandline"):
-            processes = sorted(processes, key=operator.itemgetter(4))
-        # default: by cpu
+            processes = sorted(processes, key=operator.attrgetter("cmd"))
+        else:
+            processes = sorted(
+                processes, key=operator.attrgetter("cpu"), reverse=True
+            )
 
         fields = _(
             "pid: %(pid)s  cpu: %(cpu)g%%  mem: %(mem)g%%  time: %(time)s"
@@ -144,39 +277,3 @@ class TaskSource(Source):
 
     def provides(self):
         yield Task
-
-
-def parse_top_output(out):
-    """
-    Yield tuples of (pid, cpu, mem, ptime, cmd)
-    """
-    # Assuming UTF-8 output
-    fields_map = {}
-    fields_count = 0
-    header_read = False
-    for line in out.split(b"\n"):
-        line = line.decode("utf-8", "replace").strip()  # noqa: PLW2901
-        if line == "":
-            header_read = True
-            continue
-
-        if not header_read:
-            continue
-
-        if line.startswith("PID"):  # assume pid is first col
-            fields_map = {name: pos for pos, name in enumerate(line.split())}
-            fields_count = len(fields_map)
-            continue  # skip header
-
-        line_fields = line.split(None, fields_count - 1)
-        pid = line_fields[0]
-        cpu = line_fields[fields_map["%CPU"]]
-        mem = line_fields[fields_map["%MEM"]]
-        ptime = line_fields[fields_map["TIME+"]]
-        cmd = line_fields[-1]
-
-        # read command line
-        proc_file = Path(f"/proc/{pid}/cmdline")
-        if proc_file.is_file():  # also skip (finished) missing tasks
-            cmd = proc_file.read_text(encoding="UTF=8").replace("\x00", " ")
-            yield (int(pid), float(cpu), float(mem), ptime, cmd)
@@ -20,7 +20,7 @@ from kupfer import icons, launch, plugin_support
 from kupfer.obj import Action, FileLeaf, Source, SourceLeaf
 from kupfer.obj.apps import AppLeafContentMixin
 from kupfer.obj.helplib import FileMonitorToken, FilesystemWatchMixin
-from kupfer.support.datatools import simple_cache
+from kupfer.support.datatools import WeightedLruCache
 
 if ty.TYPE_CHECKING:
     from gettext import gettext as _
@@ -49,9 +49,25 @@ __kupfer_settings__ = plugin_support.PluginSettings(
 )
 
 
-@simple_cache
+def _files_weight(files: list[Path]) -> int:
+    return len(files) + 1
+
+
+# Recent files by (viminfo, limit, viminfo mtime); bounded by number of
+# files, so only the current list (and maybe a previous one) is kept
+_RECENT_CACHE: WeightedLruCache[tuple[Path, int, float], list[Path]] = (
+    WeightedLruCache(256, weight=_files_weight, name="vim.recent")
+)
+
+
 def _load_recent_files(viminfo: Path, limit: int, stamp: float) -> list[Path]:
     # stamp is file modification timestamp used to evict old cache items
+    return _RECENT_CACHE.get_or_insert(
+        (viminfo, limit, stamp), lambda: _read_recent_files(viminfo, limit)
+    )
+
+
+def _read_recent_files(viminfo: Path, limit: int) -> list[Path]:
     files = []
     with viminfo.open("rt", encoding="UTF-8", errors="replace") as fin:
         for line in fin:
@@ -86,11 +102,7 @@ class VimRecentsSource(AppLeafContentMixin, Source, FilesystemWatchMixin):
         return bool(gfile) and gfile.get_basename() == ".viminfo"
 
     def get_items_forced(self):
-        try:
-            _load_recent_files.cache_clear()
-        except AttributeError:
-            _load_recent_files.__wrapped__.cache_clear()  # type:ignore
-
+        _RECENT_CACHE.clear()
         return self.get_items()
 
     def get_items(self):
@@ -11,9 +11,10 @@ __kupfer_actions__ = (
 __description__ = _(
     "Search the web with OpenSearch and user defined search engines"
 )
-__version__ = "2023-12-23"
+__version__ = "2026-10-18"
 __author__ = "Ulrik Sverdrup <ulrik.sverdrup@gmail.com>, KB"
 
+import json
 import locale
 import os
 import typing as ty
@@ -21,9 +22,13 @@ import urllib.parse
 from pathlib import Path
 from xml.etree import ElementTree as ET
 
+from gi.repository import GLib
+
 from kupfer import config, launch, plugin_support
 from kupfer.obj import Action, Leaf, Source, TextLeaf
+from kupfer.obj.helplib import FilesystemWatchMixin
 from kupfer.plugin._firefox_support import get_firefox_home_file
+from kupfer.support import pretty
 
 if ty.TYPE_CHECKING:
     from gettext import gettext as _
@@ -203,6 +208,11 @@ def gettagname(tag):
     return tag.rsplit("}", 1)[-1]
 
 
+# directories where browsers are installed
+_PACKAGES_DIRS = ("/usr/lib", "/usr/share")
+_PACKAGES_PREFIXES = ("firefox", "iceweasel")
+
+
 def _get_plugin_dirs() -> ty.Iterator[Path]:
     """Get all possible plugins path (may not exists)"""
     # accept in kupfer data dirs
@@ -236,14 +246,20 @@ def _get_plugin_dirs() -> ty.Iterator[Path]:
         yield Path("/etc/iceweasel/searchplugins/locale", suffix)
 
     # try to find all versions of firefox
-    for prefix in ("/usr/lib", "/usr/share"):
-        with os.scandir(prefix) as entries:
-            for entry in entries:
-                if entry.name.startswith(("firefox", "iceweasel")):
-                    yield Path(entry.path, "searchplugins")
-                    yield Path(
-                        entry.path, "distribution", "searchplugins", "common"
-                    )
+    for prefix in _PACKAGES_DIRS:
+        try:
+            with os.scandir(prefix) as entries:
+                for entry in entries:
+                    if entry.name.startswith(_PACKAGES_PREFIXES):
+                        yield Path(entry.path, "searchplugins")
+                        yield Path(
+                            entry.path,
+                            "distribution",
+                            "searchplugins",
+                            "common",
+                        )
+        except OSError:
+            pass
 
 
 _OS_VITAL_KEYS = {"Url", "ShortName"}
@@ -286,46 +302,202 @@ def _parse_etree(etree, name=None):
     return search
 
 
-class OpenSearchSource(Source):
+def _parse_opensearch(path: str) -> dict[str, ty.Any] | None:
+    try:
+        etree = ET.parse(path)
+        return _parse_etree(etree, name=path)  # type:ignore
+    except Exception as exc:
+        pretty.print_debug(__name__, f"{type(exc).__name__}: {exc}")
+
+    return None
+
+
+class _EnginesCache(pretty.OutputMixin):
+    """Parsed search engines, cached by file path, mtime and size and kept
+    between sessions, so only new and changed files are parsed.
+
+    Searchplugins directories are discovered once per session or after
+    `invalidate_dirs` (i.e. when browser package is installed or removed).
+    """
+
+    version = 1
+
+    def __init__(self) -> None:
+        self._dirs: list[Path] | None = None
+        # path -> (mtime_ns, size, engine or None when file is not valid)
+        self._engines: dict[str, tuple[int, int, dict[str, str] | None]] = {}
+        self._loaded = False
+
+    def _get_filename(self) -> str | None:
+        if cache_home := config.get_cache_home():
+            return os.path.join(
+                cache_home, f"websearch_engines_v{self.version}.json"
+            )
+
+        return None
+
+    def _load(self) -> None:
+        self._loaded = True
+        if not (filename := self._get_filename()):
+            return
+
+        try:
+            with open(filename, encoding="UTF-8") as cfile:
+                data = json.load(cfile)
+
+            self._engines = {
+                path: (mtime, size, engine)
+                for path, (mtime, size, engine) in data.items()
+            }
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, TypeError) as exc:
+            self.output_error("Load cache error:", exc)
+
+    def _save(self) -> None:
+        if not (filename := self._get_filename()):
+            return
+
+        self.output_debug("Saving", filename)
+        tmp_filename = filename + ".tmp"
+        try:
+            with open(tmp_filename, "w", encoding="UTF-8") as cfile:
+                json.dump(self._engines, cfile)
+
+            os.rename(tmp_filename, filename)
+        except OSError as exc:
+            self.output_error("Save cache error:", exc)
+
+    def invalidate_dirs(self) -> None:
+        self._dirs = None
+
+    def get_dirs(self) -> list[Path]:
+        """Get existing searchplugins directories."""
+        if self._dirs is None:
+            self._dirs = [pdir for pdir in _get_plugin_dirs() if pdir.is_dir()]
+            self.output_debug("Searchplugins dirs", self._dirs)
+
+        return self._dirs
+
+    def get_engines(self) -> list[dict[str, str]]:
+        if not self._loaded:
+            self._load()
+
+        engines = self._engines
+        changed = False
+        result = []
+        visited_files = set()
+        for pdir in self.get_dirs():
+            try:
+                entries = list(os.scandir(pdir))
+            except OSError:
+                continue
+
+            for entry in entries:
+                if entry.path in visited_files:
+                    continue
+
+                visited_files.add(entry.path)
+                try:
+                    if entry.is_dir():
+                        continue
+
+                    stat = entry.stat()
+                except OSError:
+                    continue
+
+                cached = engines.get(entry.path)
+                if cached and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+                    search = cached[2]
+                else:
+                    search = _parse_opensearch(entry.path)
+                    engines[entry.path] = (
+                        stat.st_mtime_ns,
+                        stat.st_size,
+                        search,
+                    )
+                    changed = True
+
+                if search:
+                    result.append(search)
+
+        for path in engines.keys() - visited_files:
+            del engines[path]
+            changed = True
+
+        if changed:
+            self._save()
+
+        return result
+
+
+_ENGINES = _EnginesCache()
+
+
+class OpenSearchSource(Source, FilesystemWatchMixin):
     def __init__(self):
         Source.__init__(self, _("Search Engines"))
+        self.monitor_token = None
+        # searchplugins directories and token of their monitors
+        self._monitored_dirs: list[Path] | None = None
+        self._dirs_monitor_token = None
 
     def initialize(self):
         __kupfer_settings__.connect(
             "plugin-setting-changed", self._on_setting_changed
         )
+        self.monitor_token = self.monitor_directories(*_PACKAGES_DIRS)
+        self._monitor_plugin_dirs()
+
+    def finalize(self):
+        self.stop_monitor_fs_changes(self.monitor_token)
+        self.stop_monitor_fs_changes(self._dirs_monitor_token)
+        self.monitor_token = self._dirs_monitor_token = None
+        self._monitored_dirs = None
+
+    def _monitor_plugin_dirs(self) -> bool:
+        """Monitor current searchplugins directories; replace monitors when
+        the directories changed since last call."""
+        if self.monitor_token is None:
+            # source was finalized
+            return False
+
+        dirs = _ENGINES.get_dirs()
+        if dirs != self._monitored_dirs:
+            self.output_debug("Monitoring", dirs)
+            self.stop_monitor_fs_changes(self._dirs_monitor_token)
+            self._dirs_monitor_token = self.monitor_directories(*dirs)
+
+        self._monitored_dirs = dirs
+        return False
+
+    def monitor_include_file(self, gfile):
+        if not gfile:
+            return False
+
+        name = gfile.get_basename()
+        parent = gfile.get_parent()
+        if parent and parent.get_path() in _PACKAGES_DIRS:
+            if not name.startswith(_PACKAGES_PREFIXES):
+                return False
+
+            # browser installed or removed; find searchplugins dirs again
+            _ENGINES.invalidate_dirs()
+            return True
+
+        return not name.startswith(".")
 
     def _on_setting_changed(self, settings, key, value):
         self.mark_for_update()
 
-    def _parse_opensearch(self, path: str) -> dict[str, ty.Any] | None:
-        try:
-            etree = ET.parse(path)
-            return _parse_etree(etree, name=path)  # type:ignore
-        except Exception as exc:
-            self.output_debug(f"{type(exc).__name__}: {exc}")
-
-        return None
-
     def get_items(self) -> ty.Iterator[SearchEngine]:
-        # files are unique by filename to allow override
-        visited_files = set()
-        for pdir in _get_plugin_dirs():
-            if not pdir.is_dir():
-                continue
-
-            self.output_debug("Processing searchplugins dir", pdir)
-
-            with os.scandir(pdir) as entries:
-                for entry in entries:
-                    if entry.path in visited_files:
-                        continue
+        for search in _ENGINES.get_engines():
+            yield SearchEngine(search, search["ShortName"])
 
-                    visited_files.add(entry.path)
-                    if not entry.is_dir() and (
-                        search := self._parse_opensearch(entry.path)
-                    ):
-                        yield SearchEngine(search, search["ShortName"])
+        # directories were discovered again; monitors must be created in
+        # main thread
+        if _ENGINES.get_dirs() is not self._monitored_dirs:
+            GLib.idle_add(self._monitor_plugin_dirs)
 
         # add user search engines
         if custom_ses := __kupfer_settings__["extra_engines"]:
@@ -1,7 +1,7 @@
 __kupfer_name__ = _("Window List")
 __kupfer_sources__ = ("WindowsSource", "WorkspacesSource")
 __description__ = _("All windows on all workspaces")
-__version__ = "2020-04-14"
+__version__ = "2026-10-18"
 __author__ = ""
 
 import typing as ty
@@ -338,37 +338,132 @@ class ToggleAction(WindowAction):
             self._perform_action(self.action, leaf)
 
 
+def _window_leaf(win: Wnck.Window) -> WindowLeaf:
+    name, app = (win.get_name(), win.get_application().get_name())
+    if name != app and app not in name:
+        name = f"{name} ({app})"
+
+    return WindowLeaf(win.get_xid(), name)
+
+
 class WindowsSource(Source):
+    """Windows in stacking order (topmost first).
+
+    Leaves are created once per window and updated from Wnck screen and
+    window signals, so searching does not query window list. Wnck is used
+    only in signal handlers (main thread); `get_items`, which may be called
+    from background rescan, returns snapshot of the list.
+    """
+
+    source_use_cache = False
+
     def __init__(self, name=_("Window List")):
         super().__init__(name)
+        # xid -> (window, leaf)
+        self._windows: dict[int, tuple[Wnck.Window, WindowLeaf]] = {}
+        # xids in stacking order, bottommost first
+        self._stacking: list[int] = []
+        self._special_leaves = (FrontmostWindow(), NextWindow())
+        # snapshot of leaves, replaced (never modified) on changes
+        self._items: list[Leaf] = []
 
     def initialize(self):
         # "preload" windows: Ask for them early
         # since the first call "primes" the event loop
-        # and always comes back empty
-        if (screen := Wnck.Screen.get_default()) is not None:
-            screen.get_windows_stacked()
+        # and always comes back empty; the rest will come with
+        # window-opened signals
+        if (screen := Wnck.Screen.get_default()) is None:
+            self.output_debug("Environment not supported")
+            return
 
-    def is_dynamic(self):
-        return True
+        for win in screen.get_windows_stacked():
+            self._add_window(win)
 
-    def get_items(self):
-        # wnck should be "primed" now to return the true list
-        screen = Wnck.Screen.get_default()
-        if screen is None:
-            self.output_debug("Environment not supported")
+        self._update_items()
+
+        weaklib.gobject_connect_weakly(
+            screen, "window-opened", self._on_window_opened
+        )
+        weaklib.gobject_connect_weakly(
+            screen, "window-closed", self._on_window_closed
+        )
+        weaklib.gobject_connect_weakly(
+            screen, "window-stacking-changed", self._on_stacking_changed
+        )
+        weaklib.gobject_connect_weakly(
+            screen, "active-window-changed", self._on_active_window_changed
+        )
+
+    def _add_window(self, win: Wnck.Window) -> None:
+        xid = win.get_xid()
+        if xid in self._windows:
             return
 
-        yield FrontmostWindow()
-        yield NextWindow()
+        self._windows[xid] = (win, _window_leaf(win))
+        # new windows are opened on top
+        self._stacking.append(xid)
+        weaklib.gobject_connect_weakly(
+            win, "name-changed", self._on_name_changed
+        )
+        weaklib.gobject_connect_weakly(
+            win, "state-changed", self._on_state_changed
+        )
 
-        for win in reversed(screen.get_windows_stacked()):
+    def _update_items(self) -> None:
+        windows = self._windows
+        items: list[Leaf] = list(self._special_leaves)
+        for xid in reversed(self._stacking):
+            win, leaf = windows[xid]
             if not win.is_skip_tasklist():
-                name, app = (win.get_name(), win.get_application().get_name())
-                if name != app and app not in name:
-                    name = f"{name} ({app})"
+                items.append(leaf)
+
+        self._items = items
+        self.mark_for_update()
 
-                yield WindowLeaf(win.get_xid(), name)
+    def _on_window_opened(self, screen, win):
+        self._add_window(win)
+        self._update_items()
+
+    def _on_window_closed(self, screen, win):
+        xid = win.get_xid()
+        if self._windows.pop(xid, None):
+            self._stacking.remove(xid)
+            self._update_items()
+
+    def _on_name_changed(self, win):
+        xid = win.get_xid()
+        if xid in self._windows:
+            self._windows[xid] = (win, _window_leaf(win))
+            self._update_items()
+
+    def _on_state_changed(self, win, changed_mask, _new_state):
+        if (
+            changed_mask & Wnck.WindowState.SKIP_TASKLIST
+            and win.get_xid() in self._windows
+        ):
+            self._update_items()
+
+    def _on_stacking_changed(self, screen):
+        stacking = [w.get_xid() for w in screen.get_windows_stacked()]
+        stacking = [xid for xid in stacking if xid in self._windows]
+        if stacking != self._stacking:
+            self._stacking = stacking
+            self._update_items()
+
+    def _on_active_window_changed(self, screen, _previous):
+        # activated window is raised; stacking-changed signal may come
+        # later or not at all
+        if (win := screen.get_active_window()) is None:
+            return
+
+        xid = win.get_xid()
+        if xid in self._windows and self._stacking[-1] != xid:
+            self._stacking.remove(xid)
+            self._stacking.append(xid)
+            self._update_items()
+
+    def get_items(self):
+        return self._items
 
     def get_description(self):
         return _("All windows on all workspaces")
@@ -9,17 +9,19 @@ files may be presented (this may slowdown loading when turned on).
 __kupfer_name__ = _("Zoxide Directories")
 __kupfer_sources__ = ("ZoxideDirSource",)
 __description__ = _("Load top directories from zoxide database")
-__version__ = "2023-04-02"
+__version__ = "2026-10-18"
 __author__ = "Karol Będkowski <karol.bedkowski@gmail.com>"
 
 import os.path
 import subprocess
+import time
 import typing as ty
 
-from kupfer import config, icons, plugin_support
+from kupfer import config, icons, launch, plugin_support
 from kupfer.core.datactrl import DataController
 from kupfer.obj import Action, FileLeaf, Leaf, Source, fileactions
 from kupfer.obj.helplib import FilesystemWatchMixin
+from kupfer.support import pretty, scheduler
 
 if ty.TYPE_CHECKING:
     from gettext import gettext as _
@@ -72,23 +74,43 @@ __kupfer_settings__ = plugin_support.PluginSettings(
 plugin_support.check_command_available("zoxide")
 
 
-class LaunchRecorder:
+class LaunchRecorder(pretty.OutputMixin):
     """Launch recorder listen for 'launched-action' signals after Open  action on
-    FileLeaves and update zoxide about access to file folder."""
+    FileLeaves and update zoxide about access to file folder.
+
+    Paths are queued and added to zoxide in background, by one zoxide
+    invocation, `flush_delay_s` after last launch. Changes of zoxide database
+    made by recorder should not trigger reload of source (see
+    `is_own_change`).
+    """
+
+    flush_delay_s = 2
+    # database changes in this time after update are treated as own changes
+    own_change_s = 2.0
 
     def __init__(self):
         self._enabled = False
         self._cb_pointer = None
+        self._sched_cb_pointer = None
+        # queued paths; dict keep order and remove duplicates
+        self._pending: dict[str, None] = {}
+        self._running = False
+        self._ignore_changes_until = 0.0
+        self._timer: scheduler.Timer | None = None
 
     def connect(self):
         data_controller = DataController.instance()
         self._cb_pointer = data_controller.connect(
             "launched-action", self._on_launched_action
         )
+        self._sched_cb_pointer = scheduler.get_scheduler().connect(
+            "finish", self._on_finish
+        )
         __kupfer_settings__.connect(
             "plugin-setting-changed", self._on_setting_changed
         )
         self._enabled = __kupfer_settings__["record_enabled"]
+        self._timer = scheduler.Timer()
 
     def disconnect(self):
         if self._cb_pointer:
@@ -96,6 +118,20 @@ class LaunchRecorder:
             data_controller.disconnect(self._cb_pointer)
             self._cb_pointer = None
 
+        if self._sched_cb_pointer:
+            scheduler.get_scheduler().disconnect(self._sched_cb_pointer)
+            self._sched_cb_pointer = None
+
+        if self._timer:
+            self._timer.invalidate()
+            self._timer = None
+
+        self._on_finish()
+
+    def is_own_change(self) -> bool:
+        """Return True when zoxide database is being updated by recorder."""
+        return time.monotonic() < self._ignore_changes_until
+
     def _on_launched_action(
         self, sender: ty.Any, leaf: Leaf, action: Action, *_args: ty.Any
     ) -> None:
@@ -116,7 +152,41 @@ class LaunchRecorder:
         if any(map(path.startswith, __kupfer_settings__["exclude"])):
             return
 
-        subprocess.run(["zoxide", "add", path], check=False)
+        self._pending[path] = None
+        if not self._running and self._timer:
+            self._timer.set(self.flush_delay_s, self._flush)
+
+    def _flush(self) -> None:
+        if not self._pending or self._running:
+            return
+
+        paths = list(self._pending)
+        self._pending.clear()
+        self.output_debug("Adding to zoxide", paths)
+        self._running = True
+        self._ignore_changes_until = float("inf")
+        launch.AsyncCommand(
+            ["zoxide", "add", "--", *paths], self._on_flushed, 60
+        )
+
+    def _on_flushed(
+        self, acommand: launch.AsyncCommand, _stdout: bytes, stderr: bytes
+    ) -> None:
+        self._running = False
+        self._ignore_changes_until = time.monotonic() + self.own_change_s
+        if acommand.exit_status != 0:
+            self.output_error(
+                "zoxide add failed:", stderr.decode(errors="replace")
+            )
+
+        if self._pending and self._timer:
+            self._timer.set(self.flush_delay_s, self._flush)
+
+    def _on_finish(self, *_args: ty.Any) -> None:
+        # store queued paths before exit
+        if paths := list(self._pending):
+            self._pending.clear()
+            subprocess.run(["zoxide", "add", "--", *paths], check=False)
 
     def _on_setting_changed(self, settings, key, value):
         if key == "record_enabled":
@@ -134,24 +204,16 @@ def finalize_plugin(plugin_name: str) -> None:
     _RECORDER.disconnect()
 
 
-def _get_dirs(
-    exclude: list[str], min_score: int, existing: bool, max_items: int
+def _parse_dirs(
+    lines: ty.Iterable[bytes],
+    exclude: list[str],
+    min_score: int,
+    max_items: int,
 ) -> ty.Iterator[str]:
-    """Load folders with score from zoxide."""
-    cmd = ["zoxide", "query", "--list", "--score"]
-    if not existing:
-        cmd.append("--all")
-
-    with subprocess.Popen(cmd, stdout=subprocess.PIPE) as proc:
-        stdout, _stderr = proc.communicate()
-        lines = stdout.splitlines()
-
-    for rownum, line in enumerate(lines):
-        if rownum > max_items:
-            return
-
-        line = line.strip()  # noqa: PLW2901
-        score, _dummy, dirpath = line.partition(b" ")
+    """Parse `zoxide query --list --score` output (sorted by score)."""
+    count = 0
+    for line in lines:
+        score, _dummy, dirpath = line.strip().partition(b" ")
         if not dirpath:
             continue
 
@@ -164,6 +226,26 @@ def _get_dirs(
             continue
 
         yield path
+        count += 1
+        if count >= max_items:
+            return
+
+
+def _get_dirs(
+    exclude: list[str], min_score: int, existing: bool, max_items: int
+) -> ty.Iterator[str]:
+    """Load folders with score from zoxide."""
+    cmd = ["zoxide", "query", "--list", "--score"]
+    if not existing:
+        cmd.append("--all")
+
+    with subprocess.Popen(cmd, stdout=subprocess.PIPE) as proc:
+        assert proc.stdout
+        try:
+            yield from _parse_dirs(proc.stdout, exclude, min_score, max_items)
+        finally:
+            # rest of output is not needed
+            proc.kill()
 
 
 class ZoxideDirSource(Source, FilesystemWatchMixin):
@@ -182,7 +264,11 @@ class ZoxideDirSource(Source, FilesystemWatchMixin):
         )
 
     def monitor_include_file(self, gfile):
-        return gfile and gfile.get_basename() == "zo.db"
+        return (
+            gfile
+            and gfile.get_basename() == "zo.db"
+            and not _RECORDER.is_own_change()
+        )
 
     def get_items(self):
         for dirname in _get_dirs(
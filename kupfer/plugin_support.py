@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-import shutil
 import typing as ty
 from dataclasses import dataclass
 
@@ -355,7 +354,7 @@ def _unregister_alternative(
 
 def check_command_available(*cmd: str) -> None:
     """Check if the commands is available in system, throw ImportError when not"""
-    missing = [f'"{c}"' for c in cmd if not shutil.which(c)]
+    missing = [f'"{c}"' for c in cmd if not fileutils.lookup_exec_path(c)]
     if not missing:
         return
 
@@ -372,7 +371,7 @@ def check_command_available(*cmd: str) -> None:
 def check_any_command_available(*cmd: str) -> None:
     """Check if any of command is available in system, throw ImportError when not"""
     for c in cmd:
-        if shutil.which(c):
+        if fileutils.lookup_exec_path(c):
             return
 
     raise ImportError(
@@ -8,10 +8,17 @@ from __future__ import annotations
 
 import functools
 import inspect
+import time
 import typing as ty
 from collections import OrderedDict
 
-__all__ = ("LruCache", "evaluate_once", "simple_cache")
+__all__ = (
+    "DisjointSet",
+    "LruCache",
+    "WeightedLruCache",
+    "evaluate_once",
+    "simple_cache",
+)
 
 K = ty.TypeVar("K")
 V = ty.TypeVar("V")
@@ -57,7 +64,8 @@ class LruCache(ty.Generic[K, V]):
         # set add item on the end of dict
         data = self._data
         if key in self._data:
-            # check is item already in dict by trying to move it to the end
+            # item already in dict; replace value and move it to the end
+            data[key] = value
             data.move_to_end(key, last=True)
         else:
             # item not found in dict so add it
@@ -109,15 +117,255 @@ class LruCache(ty.Generic[K, V]):
         """Get value from cache. If not exists - create with with `creator`
         function and insert into cache."""
         try:
-            val = self._data[key]
+            return self[key]
         except KeyError:
-            self._miss += 1
-            self._inserts += 1
-            val = self._data[key] = creator()
+            # insert through __setitem__ so cache size is checked
+            val = self[key] = creator()
+            return val
+
+
+class _CacheEntry(ty.NamedTuple):
+    value: ty.Any
+    weight: int
+    # monotonic time of expiration or None
+    expires: float | None
+
+
+class WeightedLruCache(ty.Generic[K, V]):
+    """Least-recently-used cache bounded by total weight of entries.
+
+    *weight* is function that return weight of value (i.e. size in bytes);
+    by default each entry weights 1. Least recently used entries are evicted
+    when total weight exceed *max_weight*. Entry heavier than *max_weight*
+    is not stored at all.
+
+    *ttl* is default time-to-live (in seconds) of entries; None mean entries
+    never expire. TTL can be also given for each entry in `set`.
+
+    None values are negative results ("not found"). They weight 1 and expire
+    after *negative_ttl* (if given).
+
+    *name* is optional cache name for debug purpose. If not given, is place
+    when cache is created (filename:lineno).
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        max_weight: int,
+        weight: ty.Callable[[V], int] | None = None,
+        ttl: float | None = None,
+        negative_ttl: float | None = None,
+        name: str | None = None,
+    ) -> None:
+        self._data: OrderedDict[K, _CacheEntry] = OrderedDict()
+        self._max_weight = max_weight
+        self._weight_func = weight
+        self._ttl = ttl
+        self._negative_ttl = negative_ttl
+        self._name = name or _get_point_of_create()
+        self._total_weight = 0
+        self._hit = 0
+        self._miss = 0
+        self._inserts = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __iter__(self) -> ty.Iterator[K]:
+        return self._data.__iter__()
+
+    def __contains__(self, key: object) -> bool:
+        entry = self._data.get(key)  # type: ignore
+        return entry is not None and not self._is_expired(entry)
+
+    @property
+    def total_weight(self) -> int:
+        return self._total_weight
+
+    @staticmethod
+    def _is_expired(entry: _CacheEntry) -> bool:
+        return entry.expires is not None and entry.expires <= time.monotonic()
+
+    def _remove(self, key: K) -> None:
+        entry = self._data.pop(key)
+        self._total_weight -= entry.weight
+
+    def set(self, key: K, value: V, ttl: float | None = None) -> None:
+        """Insert `value` into cache; `ttl` overwrite default time-to-live."""
+        self._inserts += 1
+        if value is None:
+            weight = 1
+            ttl = ttl if ttl is not None else self._negative_ttl
         else:
-            self._hit += 1
+            weight = self._weight_func(value) if self._weight_func else 1
+
+        if ttl is None:
+            ttl = self._ttl
+
+        if key in self._data:
+            self._remove(key)
+
+        if weight > self._max_weight:
+            return
+
+        expires = time.monotonic() + ttl if ttl is not None else None
+        self._data[key] = _CacheEntry(value, weight, expires)
+        self._total_weight += weight
+        data = self._data
+        while self._total_weight > self._max_weight:
+            # remove the first item (least recently used)
+            _key, entry = data.popitem(last=False)
+            self._total_weight -= entry.weight
+            self._evictions += 1
+
+    def __setitem__(self, key: K, value: V) -> None:
+        self.set(key, value)
+
+    def __getitem__(self, key: K) -> V:
+        # try to get item from dict, if not found KeyError is raised
+        try:
+            entry = self._data[key]
+        except KeyError:
+            self._miss += 1
+            raise
+
+        if self._is_expired(entry):
+            self._remove(key)
+            self._expirations += 1
+            self._miss += 1
+            raise KeyError(key)
+
+        self._hit += 1
+        # found, so move it to the end
+        self._data.move_to_end(key, last=True)
+        return ty.cast("V", entry.value)
+
+    def get(self, key: K, default: V | VD | None = None) -> V | VD | None:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def get_or_insert(self, key: K, creator: ty.Callable[[], V]) -> V:
+        """Get value from cache. If not exists - create with with `creator`
+        function and insert into cache."""
+        try:
+            return self[key]
+        except KeyError:
+            val = creator()
+            self.set(key, val)
+            return val
+
+    def pop(self, key: K, default: V | VD | None = None) -> V | VD | None:
+        if (entry := self._data.get(key)) is None:
+            return default
+
+        self._remove(key)
+        if self._is_expired(entry):
+            return default
 
-        return val
+        return ty.cast("V", entry.value)
+
+    def keys(self) -> ty.KeysView[K]:
+        return self._data.keys()
+
+    def clear(self) -> None:
+        self._data.clear()
+        self._total_weight = 0
+
+    def purge_expired(self) -> int:
+        """Remove expired entries; return number of removed entries."""
+        now = time.monotonic()
+        expired = [
+            key
+            for key, entry in self._data.items()
+            if entry.expires is not None and entry.expires <= now
+        ]
+        for key in expired:
+            self._remove(key)
+
+        self._expirations += len(expired)
+        return len(expired)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "items": len(self._data),
+            "weight": self._total_weight,
+            "max_weight": self._max_weight,
+            "hit": self._hit,
+            "miss": self._miss,
+            "inserts": self._inserts,
+            "evictions": self._evictions,
+            "expirations": self._expirations,
+        }
+
+    def __str__(self) -> str:
+        stats = " ".join(f"{key}={val}" for key, val in self.stats().items())
+        return f"<WeightedLruCache '{self._name}': {stats}>"
+
+
+class DisjointSet(ty.Generic[K]):
+    """Disjoint-set (union-find) structure over hashable items.
+
+    Items are added on first use. `find` return representative item of set
+    containing given item; `union` merge sets.
+    """
+
+    def __init__(self) -> None:
+        self._parent: dict[K, K] = {}
+        self._size: dict[K, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._parent)
+
+    def __contains__(self, item: K) -> bool:
+        return item in self._parent
+
+    def find(self, item: K) -> K:
+        """Return representative of set containing `item`."""
+        parent = self._parent
+        if item not in parent:
+            parent[item] = item
+            self._size[item] = 1
+            return item
+
+        root = item
+        while (par := parent[root]) != root:
+            root = par
+
+        # path compression
+        while item != root:
+            parent[item], item = root, parent[item]
+
+        return root
+
+    def union(self, item1: K, item2: K) -> K:
+        """Merge sets containing `item1` and `item2`; return representative
+        of merged set."""
+        root1 = self.find(item1)
+        root2 = self.find(item2)
+        if root1 == root2:
+            return root1
+
+        # attach smaller tree to the larger one
+        size = self._size
+        if size[root1] < size[root2]:
+            root1, root2 = root2, root1
+
+        self._parent[root2] = root1
+        size[root1] += size.pop(root2)
+        return root1
+
+    def groups(self) -> dict[K, list[K]]:
+        """Return all sets as map representative -> items."""
+        res: dict[K, list[K]] = {}
+        for item in self._parent:
+            res.setdefault(self.find(item), []).append(item)
+
+        return res
 
 
 RT = ty.TypeVar("RT")  # return type
@@ -5,6 +5,7 @@ Test for datatools module.
 """
 
 import unittest
+from unittest import mock
 
 from kupfer.support import datatools as d
 
@@ -47,6 +48,15 @@ class TestLruCache(unittest.TestCase):
             list(cache.keys()), [10, 11, 12, 13, 14, 15, 16, 17, 18, 19]
         )
 
+    def test_replace_value(self):
+        cache: d.LruCache[int, int] = d.LruCache(10)
+        cache[1] = 1
+        cache[2] = 2
+        cache[1] = 10
+
+        self.assertEqual(cache[1], 10)
+        self.assertEqual(list(cache.keys()), [2, 1])
+
     def test_get_or_insert(self):
         cache: d.LruCache[int, int] = d.LruCache(10)
 
@@ -80,3 +90,89 @@ class TestLruCache(unittest.TestCase):
         self.assertEqual(val, 1)
 
         self.assertEqual(creator.cntr, 3)
+
+
+class TestWeightedLruCache(unittest.TestCase):
+    def test_weight_budget(self):
+        cache: d.WeightedLruCache[str, str] = d.WeightedLruCache(10, len)
+        cache["a"] = "aaaa"
+        cache["b"] = "bbbb"
+        self.assertEqual(cache.total_weight, 8)
+        # refresh "a" so "b" is evicted
+        self.assertEqual(cache["a"], "aaaa")
+        cache["c"] = "ccc"
+        self.assertEqual(list(cache.keys()), ["a", "c"])
+        self.assertEqual(cache.total_weight, 7)
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+        # too heavy values are not stored
+        cache["d"] = "d" * 11
+        self.assertNotIn("d", cache)
+        self.assertEqual(cache.total_weight, 7)
+
+        # replace value update weight
+        cache["a"] = "a"
+        self.assertEqual(cache.total_weight, 4)
+
+    def test_ttl(self):
+        cache: d.WeightedLruCache[int, str] = d.WeightedLruCache(
+            10, ttl=10, negative_ttl=1
+        )
+        with mock.patch("time.monotonic", return_value=100.0) as mtime:
+            cache[1] = "1"
+            cache[2] = None
+            cache.set(3, "3", ttl=100)
+            self.assertEqual(cache.get(2, "x"), None)
+
+            mtime.return_value = 105.0
+            self.assertNotIn(2, cache)
+            self.assertEqual(cache.get(2, "x"), "x")
+            self.assertEqual(cache[1], "1")
+
+            mtime.return_value = 150.0
+            self.assertRaises(KeyError, cache.__getitem__, 1)
+            self.assertEqual(cache[3], "3")
+            self.assertEqual(len(cache), 1)
+            self.assertEqual(cache.total_weight, 1)
+
+            cache[4] = "4"
+            mtime.return_value = 500.0
+            self.assertEqual(cache.purge_expired(), 2)
+            self.assertEqual(len(cache), 0)
+
+        stats = cache.stats()
+        self.assertEqual(stats["expirations"], 4)
+        self.assertEqual(stats["weight"], 0)
+
+    def test_get_or_insert(self):
+        cache: d.WeightedLruCache[int, int] = d.WeightedLruCache(2)
+        for i in range(5):
+            self.assertEqual(cache.get_or_insert(i, lambda i=i: i * 2), i * 2)
+
+        self.assertEqual(list(cache.keys()), [3, 4])
+        self.assertEqual(cache.get_or_insert(3, lambda: -1), 6)
+
+
+class TestDisjointSet(unittest.TestCase):
+    def test_union_find(self):
+        dset: d.DisjointSet[int] = d.DisjointSet()
+        for i in range(6):
+            self.assertEqual(dset.find(i), i)
+
+        dset.union(0, 1)
+        dset.union(2, 3)
+        dset.union(1, 3)
+        self.assertEqual(dset.find(0), dset.find(2))
+        self.assertEqual(dset.find(1), dset.find(3))
+        self.assertNotEqual(dset.find(0), dset.find(4))
+        self.assertEqual(len(dset), 6)
+
+        groups = sorted(sorted(grp) for grp in dset.groups().values())
+        self.assertEqual(groups, [[0, 1, 2, 3], [4], [5]])
+
+    def test_union_same(self):
+        dset: d.DisjointSet[str] = d.DisjointSet()
+        root = dset.union("a", "b")
+        self.assertEqual(dset.union("b", "a"), root)
+        self.assertIn("a", dset)
+        self.assertNotIn("c", dset)
@@ -7,9 +7,12 @@ see the main program file, and COPYING for details.
 
 from __future__ import annotations
 
+import bisect
 import itertools
 import os
 import tempfile
+import threading
+import time
 import typing as ty
 from os import path as os_path
 from pathlib import Path
@@ -17,6 +20,8 @@ from pathlib import Path
 from kupfer.support import pretty
 
 __all__ = (
+    "ExecutableIndex",
+    "complete_exec_name",
     "get_destfile",
     "get_destfile_in_directory",
     "get_destpath_in_directory",
@@ -181,12 +186,144 @@ def get_safe_tempfile() -> tuple[ty.BinaryIO, str]:
     return (os.fdopen(fileno, "wb"), path)
 
 
+def _is_executable_file(path: str | Path) -> bool:
+    return os.access(path, os.R_OK | os.X_OK) and os.path.isfile(path)
+
+
+class ExecutableIndex:
+    """Index of executables found in $PATH directories.
+
+    Index map executable name to its full path (first directory in $PATH
+    wins). Directories are listed again only when their modification time
+    change; modification time is checked no more often than every
+    `check_interval` seconds.
+    """
+
+    check_interval = 2.0
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._env_path: str | None = None
+        # directory -> (st_mtime_ns, executables names)
+        self._dirs: dict[str, tuple[int, list[str]]] = {}
+        self._execs: dict[str, str] = {}
+        self._sorted_names: list[str] = []
+        self._last_check = 0.0
+
+    def _scan_dir(self, execdir: str) -> list[str]:
+        names = []
+        try:
+            with os.scandir(execdir) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_file() and os.access(
+                            entry.path, os.R_OK | os.X_OK
+                        ):
+                            names.append(entry.name)
+                    except OSError:
+                        pass
+
+        except OSError:
+            pass
+
+        return names
+
+    def _refresh(self) -> None:
+        """Check $PATH directories and rebuild index when anything changed."""
+        now = time.monotonic()
+        env_path = os.environ.get("PATH") or os.defpath
+        if (
+            env_path == self._env_path
+            and now - self._last_check < self.check_interval
+        ):
+            return
+
+        self._last_check = now
+        changed = env_path != self._env_path
+        dirs = {}
+        for execdir in env_path.split(os.pathsep):
+            if not execdir or execdir in dirs:
+                continue
+
+            try:
+                mtime = os.stat(execdir).st_mtime_ns
+            except OSError:
+                mtime = -1
+
+            cached = self._dirs.get(execdir)
+            if cached is not None and cached[0] == mtime:
+                dirs[execdir] = cached
+                continue
+
+            names = self._scan_dir(execdir) if mtime >= 0 else []
+            dirs[execdir] = (mtime, names)
+            changed = True
+
+        if not changed:
+            return
+
+        execs: dict[str, str] = {}
+        for execdir, (_mtime, names) in dirs.items():
+            for name in names:
+                execs.setdefault(name, os.path.join(execdir, name))
+
+        self._env_path = env_path
+        self._dirs = dirs
+        self._execs = execs
+        self._sorted_names = sorted(execs)
+        pretty.print_debug(__name__, f"Indexed {len(execs)} executables")
+
+    def lookup(self, exename: str) -> str | None:
+        """Return full path of `exename` or None when not found."""
+        with self._lock:
+            self._refresh()
+            path = self._execs.get(exename)
+
+        # executable may be removed since last check
+        if path and not _is_executable_file(path):
+            return None
+
+        return path
+
+    def complete(self, prefix: str, limit: int = 10) -> list[str]:
+        """Return up to `limit` executables names starting with `prefix`
+        in alphabetical order."""
+        with self._lock:
+            self._refresh()
+            names = self._sorted_names
+            start = bisect.bisect_left(names, prefix)
+            return [
+                name
+                for name in itertools.islice(names, start, start + limit)
+                if name.startswith(prefix)
+            ]
+
+
+_EXEC_INDEX = ExecutableIndex()
+
+
 def lookup_exec_path(exename: str) -> str | None:
     """Return path for @exename in $PATH or None"""
+    if os.path.isabs(exename):
+        return exename if _is_executable_file(exename) else None
+
+    if os.sep not in exename:
+        return _EXEC_INDEX.lookup(exename)
+
+    # relative path; look in each $PATH directory
     env_path = os.environ.get("PATH") or os.defpath
     for execdir in env_path.split(os.pathsep):
         exepath = Path(execdir, exename)
-        if os.access(exepath, os.R_OK | os.X_OK) and exepath.is_file():
+        if _is_executable_file(exepath):
             return str(exepath)
 
     return None
+
+
+def complete_exec_name(prefix: str, limit: int = 10) -> list[str]:
+    """Return up to `limit` names of executables in $PATH starting with
+    `prefix`."""
+    if not prefix or os.sep in prefix:
+        return []
+
+    return _EXEC_INDEX.complete(prefix, limit)
@@ -0,0 +1,68 @@
+# pylint:disable=protected-access
+# type:ignore
+
+"""
+Tests for fileutils.
+"""
+
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from kupfer.support import fileutils as f
+
+
+def _create_exec(path):
+    path.write_text("#!/bin/sh\n")
+    path.chmod(0o755)
+
+
+class TestExecutableIndex(unittest.TestCase):
+    def setUp(self):
+        # pylint: disable=consider-using-with
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.dir1 = Path(self.tmpdir.name, "bin1")
+        self.dir2 = Path(self.tmpdir.name, "bin2")
+        self.dir1.mkdir()
+        self.dir2.mkdir()
+        _create_exec(self.dir1 / "cmd")
+        _create_exec(self.dir1 / "cmd-extra")
+        _create_exec(self.dir2 / "cmd")
+        _create_exec(self.dir2 / "other")
+        (self.dir2 / "notexec").write_text("")
+        env_path = os.pathsep.join((str(self.dir1), str(self.dir2)))
+        self.env = mock.patch.dict(os.environ, {"PATH": env_path})
+        self.env.start()
+        self.index = f.ExecutableIndex()
+
+    def tearDown(self):
+        self.env.stop()
+        self.tmpdir.cleanup()
+
+    def test_lookup(self):
+        self.assertEqual(self.index.lookup("cmd"), str(self.dir1 / "cmd"))
+        self.assertEqual(self.index.lookup("other"), str(self.dir2 / "other"))
+        self.assertIsNone(self.index.lookup("notexec"))
+        self.assertIsNone(self.index.lookup("missing"))
+
+    def test_complete(self):
+        self.assertEqual(self.index.complete("cm"), ["cmd", "cmd-extra"])
+        self.assertEqual(self.index.complete("cmd", 1), ["cmd"])
+        self.assertEqual(self.index.complete("o"), ["other"])
+        self.assertEqual(self.index.complete("x"), [])
+
+    def test_refresh_on_change(self):
+        self.assertIsNone(self.index.lookup("new"))
+        _create_exec(self.dir2 / "new")
+        # force check of directories
+        self.index._last_check = 0
+        self.assertEqual(self.index.lookup("new"), str(self.dir2 / "new"))
+
+    def test_lookup_exec_path(self):
+        self.assertEqual(
+            f.lookup_exec_path(str(self.dir2 / "other")),
+            str(self.dir2 / "other"),
+        )
+        self.assertIsNone(f.lookup_exec_path(str(self.dir2 / "notexec")))
@@ -45,9 +45,10 @@ class ThreadTask(Task):
     """Run in a thread.
 
     `wait_sec` (when >0) specify time when we wait for result. After this
-    time `thread_finish`, `finish_callback` and `thread_finally` are not called.
+    time `thread_finish` and `thread_finally` are not called.
     We can't simply kill background thread but we can ignore its result and
-    log errors (if any).
+    log errors (if any). `finish_callback` is still called, so the task is
+    not left registered as running.
     """
 
     def __init__(self, name: str | None = None, wait_sec: int = 0):
@@ -81,9 +82,13 @@ class ThreadTask(Task):
             if self._finish_callback:
                 self._finish_callback(self)
 
-    def _log_error(self, exc_info: ExecInfo | None) -> None:
-        if exc_info:
-            pretty.print_exc(__name__, exc_info)
+    def _overdue_finally(self, exc_info: ExecInfo | None) -> None:
+        try:
+            if exc_info:
+                pretty.print_exc(__name__, exc_info)
+        finally:
+            if self._finish_callback:
+                self._finish_callback(self)
 
     def _run_thread(self) -> None:
         exc_info = None
@@ -100,7 +105,7 @@ class ThreadTask(Task):
             exc_info = sys.exc_info()
         finally:
             if overdue:
-                GLib.idle_add(self._log_error, exc_info)
+                GLib.idle_add(self._overdue_finally, exc_info)
             else:
                 GLib.idle_add(self._thread_finally, exc_info)
 
@@ -112,20 +117,34 @@ class ThreadTask(Task):
 
 
 class TaskRunner(pretty.OutputMixin):
-    """Run Tasks in the idle Loop"""
+    """Run Tasks in the idle Loop
+
+    `finished_callback`, when given, is called with task and its run time
+    (in seconds) when the task is finished.
+    """
 
-    def __init__(self, end_on_finish: bool) -> None:
+    def __init__(
+        self,
+        end_on_finish: bool,
+        finished_callback: ty.Callable[[Task, float], None] | None = None,
+    ) -> None:
         self.tasks: set[Task] = set()
         self.end_on_finish = end_on_finish
+        self._finished_callback = finished_callback
+        self._started: dict[Task, float] = {}
         scheduler.get_scheduler().connect("finish", self._on_finish)
 
     def _task_finished(self, task):
-        self.output_debug("Task finished", task)
+        duration = time.monotonic() - self._started.pop(task, 0.0)
+        self.output_debug("Task finished", task, f"in {duration:.3f}s")
         self.tasks.remove(task)
+        if self._finished_callback:
+            self._finished_callback(task, duration)
 
     def add_task(self, task: Task) -> None:
         """Register @task to be run"""
         self.tasks.add(task)
+        self._started[task] = time.monotonic()
         task.start(self._task_finished)
 
     def _on_finish(self, _sched: ty.Any) -> None:
@@ -24,6 +24,7 @@ from kupfer.ui import (
     keybindings,
     kupferhelp,
     listen,
+    localservice,
     preferences,
     uievents,
 )
@@ -772,6 +773,26 @@ class WindowController(pretty.OutputMixin):
 
         self.output_debug("finished lazy_setup")
 
+    def _start_local_service(self) -> localservice.Service | None:
+        """Start local socket for scripts; requests are handled without
+        presenting window."""
+        lserv = localservice.Service()
+        return lserv if lserv.start() else None
+
+    def _connect_services(
+        self, *services: listen.Service | listen.ServiceNew | None
+    ) -> None:
+        """Connect signals of D-Bus services (when available)."""
+        for kserv in services:
+            if kserv:
+                kserv.connect("present", self._on_present)
+                kserv.connect("show-hide", self._on_show_hide)
+                kserv.connect("put-text", self._on_put_text)
+                kserv.connect("put-files", self._on_put_files)
+                kserv.connect("find-object", self._on_find_object)
+                kserv.connect("execute-file", self._on_execute_file)
+                kserv.connect("quit", self._on_quit)
+
     def main(self, quiet: bool = False) -> None:
         """Start WindowController, present its window (if not @quiet)"""
         signal.signal(signal.SIGINT, self._on_early_interrupt)
@@ -789,6 +810,8 @@ class WindowController(pretty.OutputMixin):
         except listen.NoConnectionError:
             pass
 
+        lserv = self._start_local_service()
+
         if kserv1:
             keyobj = keybindings.get_keybound_object()
             keyobj.connect(
@@ -805,15 +828,7 @@ class WindowController(pretty.OutputMixin):
         self._initialize(data_controller)
         sch.display()
 
-        for kserv in (kserv1, kserv2):
-            if kserv:
-                kserv.connect("present", self._on_present)
-                kserv.connect("show-hide", self._on_show_hide)
-                kserv.connect("put-text", self._on_put_text)
-                kserv.connect("put-files", self._on_put_files)
-                kserv.connect("find-object", self._on_find_object)
-                kserv.connect("execute-file", self._on_execute_file)
-                kserv.connect("quit", self._on_quit)
+        self._connect_services(kserv1, kserv2)
 
         GLib.idle_add(self._lazy_setup, not quiet)
 
@@ -838,6 +853,9 @@ class WindowController(pretty.OutputMixin):
             if kserv:
                 kserv.unregister()
 
+        if lserv:
+            lserv.stop()
+
         keybindings.bind_key(None, keybindings.KEYBINDING_TARGET_DEFAULT)
         keybindings.bind_key(None, keybindings.KEYBINDING_TARGET_MAGIC)
 
@@ -308,6 +308,14 @@ class ServiceNew(ExportedGObject):  # type: ignore
         with uievents.using_startup_notify_id(notify_id) as time:
             self.emit("execute-file", filepath, display, time)
 
+    @dbus.service.method(_INTERFACE_NAME_NEW, out_signature="s")
+    def GetExecutionTrace(self):
+        """Return recorded spans of command execution as JSON list."""
+        # pylint: disable=import-outside-toplevel
+        from kupfer.core import tracing
+
+        return tracing.export_json()
+
     @dbus.service.method(_INTERFACE_NAME_NEW)
     def Quit(self):
         self.emit("quit")
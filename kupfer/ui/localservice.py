@@ -0,0 +1,279 @@
+"""
+Local request channel: Unix socket service for scripts.
+
+Requests are handled directly by the data controller, without presenting
+the main window, so saved commands can be executed (and catalog queried)
+from scripts with minimal overhead. Client is bin/kupfer-client.
+
+Protocol: each connection carries one request and one response. Both are
+framed as 1 byte type, 4 bytes big-endian payload length, then UTF-8
+payload; payload fields are separated by NUL.
+
+Requests:
+    P               ping; response payload is kupfer version
+    E path display  execute saved command (.kfcom) file
+    Q key limit     search catalog for key; response payload are lines
+                    "rank<TAB>name<TAB>description"
+Response type is K on success or E on error (payload is error message).
+
+This file is a part of the program kupfer, which is
+released under GNU General Public License v3 (or any later version),
+see the main program file, and COPYING for details.
+"""
+
+from __future__ import annotations
+
+import os
+import socket
+import struct
+import sys
+import typing as ty
+from pathlib import Path
+
+from gi.repository import GLib
+
+from kupfer import version
+from kupfer.support import pretty
+
+if ty.TYPE_CHECKING:
+    from kupfer.support.types import ExecInfo
+
+__all__ = ("Service", "get_socket_path")
+
+_HEADER: ty.Final = struct.Struct(">cI")
+_MAX_PAYLOAD: ty.Final = 64 * 1024
+_MAX_QUERY_RESULTS: ty.Final = 100
+_MAX_ARGS: ty.Final = 2
+
+REQ_PING: ty.Final = b"P"
+REQ_EXECUTE: ty.Final = b"E"
+REQ_QUERY: ty.Final = b"Q"
+RESP_OK: ty.Final = b"K"
+RESP_ERROR: ty.Final = b"E"
+
+
+def get_socket_path() -> Path:
+    """Path of socket; client (bin/kupfer-client) use the same rules."""
+    return Path(GLib.get_user_runtime_dir(), "kupfer", "kupfer.sock")
+
+
+class RequestError(Exception):
+    """Error returned to the client"""
+
+
+class _Connection:
+    """Buffer for one client connection."""
+
+    __slots__ = ("buffer", "sock", "watch_id")
+
+    def __init__(self, sock: socket.socket) -> None:
+        self.sock = sock
+        self.buffer = b""
+        self.watch_id = 0
+
+    def get_request(self) -> tuple[bytes, bytes] | None:
+        """Return (type, payload) when whole request is received."""
+        if len(self.buffer) < _HEADER.size:
+            return None
+
+        req_type, length = _HEADER.unpack_from(self.buffer)
+        if length > _MAX_PAYLOAD:
+            raise RequestError("Request too long")
+
+        end = _HEADER.size + length
+        if len(self.buffer) < end:
+            return None
+
+        return req_type, self.buffer[_HEADER.size : end]
+
+
+class Service(pretty.OutputMixin):
+    """Unix socket service handling requests from local clients.
+
+    Only connections from the same user are accepted.
+    """
+
+    def __init__(self) -> None:
+        self._sock: socket.socket | None = None
+        self._watch_id = 0
+        self._path = get_socket_path()
+
+    def start(self) -> bool:
+        """Start listening; return False when socket can't be created."""
+        path = self._path
+        try:
+            path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+            # this is the only running instance, so the socket is stale
+            path.unlink(missing_ok=True)
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.bind(str(path))
+            path.chmod(0o600)
+            sock.listen(16)
+            sock.setblocking(False)
+        except OSError as exc:
+            self.output_error("Can't create socket", path, exc)
+            return False
+
+        self._sock = sock
+        self._watch_id = GLib.io_add_watch(
+            sock.fileno(), GLib.PRIORITY_DEFAULT, GLib.IO_IN, self._on_accept
+        )
+        self.output_debug("Listening on", path)
+        return True
+
+    def stop(self) -> None:
+        if self._watch_id:
+            GLib.source_remove(self._watch_id)
+            self._watch_id = 0
+
+        if self._sock:
+            self._sock.close()
+            self._sock = None
+            self._path.unlink(missing_ok=True)
+
+    def _on_accept(self, _fd: int, _condition: int) -> bool:
+        assert self._sock
+        try:
+            sock, _addr = self._sock.accept()
+        except BlockingIOError:
+            return True
+        except OSError as exc:
+            self.output_error("Accept error", exc)
+            return True
+
+        if not _is_same_user(sock):
+            self.output_info("Rejected connection from other user")
+            sock.close()
+            return True
+
+        sock.setblocking(False)
+        conn = _Connection(sock)
+        conn.watch_id = GLib.io_add_watch(
+            sock.fileno(),
+            GLib.PRIORITY_DEFAULT,
+            GLib.IO_IN | GLib.IO_HUP | GLib.IO_ERR,
+            self._on_readable,
+            conn,
+        )
+        return True
+
+    def _on_readable(
+        self, _fd: int, _condition: int, conn: _Connection
+    ) -> bool:
+        try:
+            if data := conn.sock.recv(_MAX_PAYLOAD):
+                conn.buffer += data
+                if (request := conn.get_request()) is None:
+                    return True
+
+                resp_type, payload = self._handle(*request)
+            else:
+                # connection closed before whole request was received
+                conn.sock.close()
+                return False
+
+        except BlockingIOError:
+            return True
+        except RequestError as exc:
+            resp_type, payload = RESP_ERROR, str(exc)
+        except OSError as exc:
+            self.output_error("Connection error", exc)
+            conn.sock.close()
+            return False
+
+        data = payload.encode("UTF-8")
+        try:
+            conn.sock.setblocking(True)
+            conn.sock.settimeout(1)
+            conn.sock.sendall(_HEADER.pack(resp_type, len(data)) + data)
+        except OSError as exc:
+            self.output_error("Send error", exc)
+        finally:
+            conn.sock.close()
+
+        return False
+
+    def _handle(self, req_type: bytes, payload: bytes) -> tuple[bytes, str]:
+        if req_type == REQ_PING:
+            return RESP_OK, version.VERSION
+
+        handler: ty.Callable[..., str]
+        if req_type == REQ_EXECUTE:
+            handler = self._execute
+        elif req_type == REQ_QUERY:
+            handler = self._query
+        else:
+            raise RequestError(f"Unknown request {req_type!r}")
+
+        # both requests take one required and one optional argument
+        args = payload.decode("UTF-8", "replace").split("\0")
+        if len(args) > _MAX_ARGS:
+            raise RequestError(
+                f"Invalid arguments: expected at most {_MAX_ARGS}, "
+                f"got {len(args)}"
+            )
+
+        try:
+            return RESP_OK, handler(*args)
+        except RequestError:
+            raise
+        except Exception as exc:
+            self.output_exc()
+            raise RequestError(str(exc)) from exc
+
+    def _execute(self, filepath: str, display: str = "") -> str:
+        # pylint: disable=import-outside-toplevel
+        from kupfer.core.datactrl import DataController
+        from kupfer.ui import uievents
+
+        errors: list[str] = []
+
+        def on_error(exc_info: ExecInfo) -> None:
+            errors.append(str(exc_info[1]))
+
+        ctxenv = uievents.gui_context_from_keyevent(
+            uievents.current_event_time(), display
+        )
+        if DataController.instance().execute_file(filepath, ctxenv, on_error):
+            return ""
+
+        raise RequestError(errors[0] if errors else "Execution failed")
+
+    def _query(self, key: str, limit: str = "10") -> str:
+        # pylint: disable=import-outside-toplevel
+        from kupfer.core.searcher import Searcher
+        from kupfer.core.sources import get_source_controller
+
+        if not (root := get_source_controller().root):
+            return ""
+
+        count = min(int(limit or 10), _MAX_QUERY_RESULTS)
+        _first, matches = Searcher().search((root,), key)
+        lines: list[str] = []
+        for rankable in matches:
+            if len(lines) >= count:
+                break
+
+            obj = rankable.object
+            desc = (obj.get_description() or "").replace("\n", " ")
+            lines.append(f"{int(rankable.rank)}\t{obj}\t{desc}")
+
+        return "\n".join(lines)
+
+
+def _is_same_user(sock: socket.socket) -> bool:
+    """Check peer credentials (on Linux); elsewhere rely on permissions
+    of socket directory."""
+    if not sys.platform.startswith("linux"):
+        return True
+
+    try:
+        creds = sock.getsockopt(
+            socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i")
+        )
+    except OSError:
+        return False
+
+    uid: int
+    _pid, uid, _gid = struct.unpack("3i", creds)
+    return uid == os.getuid()
@@ -0,0 +1,122 @@
+# pylint:disable=protected-access
+# type:ignore
+
+"""
+Tests for framing and dispatching of local service requests.
+"""
+
+import gettext
+import unittest
+from unittest import mock
+
+# kupfer modules use gettext functions on import
+gettext.install("kupfer", names=("ngettext",))
+
+# pylint: disable=wrong-import-position
+from kupfer import version  # noqa:E402
+from kupfer.ui import localservice as ls  # noqa:E402
+
+
+def _frame(req_type, payload=b""):
+    return ls._HEADER.pack(req_type, len(payload)) + payload
+
+
+class TestConnection(unittest.TestCase):
+    def setUp(self):
+        self.conn = ls._Connection(mock.Mock())
+
+    def test_incomplete_header(self):
+        self.conn.buffer = _frame(b"Q", b"key")[:3]
+        self.assertIsNone(self.conn.get_request())
+
+    def test_incomplete_payload(self):
+        self.conn.buffer = _frame(b"Q", b"key\x0010")[:-1]
+        self.assertIsNone(self.conn.get_request())
+
+    def test_complete(self):
+        self.conn.buffer = _frame(b"Q", b"key\x0010")
+        self.assertEqual(self.conn.get_request(), (b"Q", b"key\x0010"))
+
+    def test_empty_payload(self):
+        self.conn.buffer = _frame(b"P")
+        self.assertEqual(self.conn.get_request(), (b"P", b""))
+
+    def test_received_in_parts(self):
+        data = _frame(b"E", "/tmp/ü.kfcom\x00:0".encode("UTF-8"))
+        for idx in range(len(data)):
+            self.conn.buffer = data[:idx]
+            self.assertIsNone(self.conn.get_request())
+
+        self.conn.buffer = data
+        req_type, payload = self.conn.get_request()
+        self.assertEqual(req_type, b"E")
+        self.assertEqual(payload.decode("UTF-8"), "/tmp/ü.kfcom\x00:0")
+
+    def test_too_long(self):
+        self.conn.buffer = ls._HEADER.pack(b"Q", ls._MAX_PAYLOAD + 1)
+        with self.assertRaises(ls.RequestError):
+            self.conn.get_request()
+
+
+class TestHandle(unittest.TestCase):
+    def setUp(self):
+        with mock.patch.object(ls, "get_socket_path"):
+            self.service = ls.Service()
+
+    def test_ping(self):
+        self.assertEqual(
+            self.service._handle(ls.REQ_PING, b""),
+            (ls.RESP_OK, version.VERSION),
+        )
+
+    def test_unknown(self):
+        with self.assertRaises(ls.RequestError):
+            self.service._handle(b"X", b"")
+
+    def test_query_args(self):
+        with mock.patch.object(
+            self.service, "_query", return_value="result"
+        ) as query:
+            self.assertEqual(
+                self.service._handle(ls.REQ_QUERY, b"key\x005"),
+                (ls.RESP_OK, "result"),
+            )
+            query.assert_called_once_with("key", "5")
+
+            self.service._handle(ls.REQ_QUERY, b"key")
+            query.assert_called_with("key")
+
+    def test_too_many_args(self):
+        with mock.patch.object(self.service, "_execute") as execute:
+            with self.assertRaises(ls.RequestError):
+                self.service._handle(ls.REQ_EXECUTE, b"a\x00b\x00c")
+
+            execute.assert_not_called()
+
+    def test_handler_type_error(self):
+        # errors of handlers are reported as they are, not as invalid
+        # arguments
+        with (
+            mock.patch.object(
+                self.service, "_execute", side_effect=TypeError("boom")
+            ),
+            mock.patch.object(self.service, "output_exc"),
+            self.assertRaisesRegex(ls.RequestError, "^boom$"),
+        ):
+            self.service._handle(ls.REQ_EXECUTE, b"file")
+
+    def test_request_error(self):
+        with (
+            mock.patch.object(
+                self.service, "_execute", side_effect=ls.RequestError("failed")
+            ),
+            mock.patch.object(self.service, "output_exc") as output_exc,
+        ):
+            with self.assertRaisesRegex(ls.RequestError, "^failed$"):
+                self.service._handle(ls.REQ_EXECUTE, b"file")
+
+            output_exc.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
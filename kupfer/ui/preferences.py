@@ -419,6 +419,9 @@ class PreferencesWindowController(pretty.OutputMixin):
         builder.get_object("checkalwaysscore").set_active(
             setctl.get_config("Kupfer", "score_without_key")
         )
+        builder.get_object("checkpathcompletion").set_active(
+            setctl.get_config("Kupfer", "path_completion")
+        )
 
         self._init_checkstatus(setctl, builder)
 
@@ -1153,6 +1156,11 @@ class PreferencesWindowController(pretty.OutputMixin):
         setctl = settings.get_settings_controller()
         setctl.set_config("Kupfer", "score_without_key", widget.get_active())
 
+    def on_checkpathcompletion_toggled(self, widget: Gtk.Widget) -> None:
+        """Change 'Complete typed directory paths' setting - callback."""
+        setctl = settings.get_settings_controller()
+        setctl.set_config("Kupfer", "path_completion", widget.get_active())
+
     def _update_alternative_combobox(
         self, category_key: str, combobox: Gtk.ComboBox
     ) -> None:
@@ -1,5 +1,3 @@
-# note: not used
-
 from __future__ import annotations
 
 import functools
@@ -26,17 +24,23 @@ _HEADER_MARKUP = '<span weight="bold" size="larger">%s</span>'
 
 class ProgressDialogController:
     def __init__(
-        self, title: str, header: str | None = None, max_value: int = 100
+        self,
+        title: str,
+        header: str | None = None,
+        max_value: int = 100,
+        abort_callback: ty.Callable[[], None] | None = None,
     ):
         """Create a new progress dialog
 
         @header: first line of dialog
+        @abort_callback: called when abort button is pressed
 
         The methods show, hide and update are all wrapped to be
         safe to call from any thread.
         """
         self.aborted = False
         self._max_value = float(max_value)
+        self._abort_callback = abort_callback
         ui_file = config.get_data_file("progress_dialog.ui")
         self._construct_dialog(ui_file, title, header)
 
@@ -66,6 +70,8 @@ class ProgressDialogController:
     def on_button_abort_clicked(self, widget: Gtk.Button) -> None:
         self.aborted = True
         self._button_abort.set_sensitive(False)
+        if self._abort_callback:
+            self._abort_callback()
 
     @idle_call
     def show(self) -> None:
@@ -75,6 +81,10 @@ class ProgressDialogController:
     def hide(self) -> None:
         self._window.hide()
 
+    @idle_call
+    def destroy(self) -> None:
+        self._window.destroy()
+
     @idle_call
     def update(self, value: float, label: str, text: str) -> bool:
         """Update dialog information.
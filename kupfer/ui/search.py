@@ -36,15 +36,18 @@ class State(enum.IntEnum):
 _PREEDIT_HIDDEN_CLASS: ty.Final = "hidden"
 _WINDOW_BORDER_WIDTH: ty.Final = 8
 
-# columns position
-_ICON_COL: ty.Final = 1
-_NAME_COL: ty.Final = 2
-_FAV_COL: ty.Final = 3
-_INFO_COL: ty.Final = 4
-_RANK_COL: ty.Final = 5
+# position of cells in rendered row
+_ICON_COL: ty.Final = 0
+_NAME_COL: ty.Final = 1
+_FAV_COL: ty.Final = 2
+_INFO_COL: ty.Final = 3
+_RANK_COL: ty.Final = 4
 
 _MIN_ICON_SIZE_TO_SHOW: ty.Final[int] = 8
 
+# rendered row: icon, markup, fav, info, rank_str
+_RenderedRow = tuple[ty.Optional[GdkPixbuf.Pixbuf], str, str, str, str]
+
 
 class _LeafModel:
     """A base for a tree view with a magic load-on-demand feature.
@@ -52,6 +55,12 @@ class _LeafModel:
     self.set_base will set its base iterator and self.populate(num) will load
     @num items into the model
 
+    Store rows keep only rankables. Icon, markup and other cells are
+    rendered by cell data functions when the tree view draws the row, and
+    are cached. Columns and rows have fixed sizes, so the tree view does not
+    need to measure each row. Rows are found by index of objects, without
+    scanning the store.
+
     Attributes:
     icon_size
     """
@@ -61,16 +70,33 @@ class _LeafModel:
     ) -> None:
         """First column is always the object -- returned by get_object
         it needs not be specified in columns."""
-        self.icon_size = 32
-        columns = (GObject.TYPE_OBJECT, str, str, str, str)
-        self._store = Gtk.ListStore(GObject.TYPE_PYOBJECT, *columns)
+        self._icon_size = 32
+        self._store = Gtk.ListStore(GObject.TYPE_PYOBJECT)
         self._base: ty.Iterator[Rankable] | None = None
+        # rendered rows by id of rankable (rankables are kept by the store,
+        # entries are removed with rows)
+        self._rendered: dict[int, _RenderedRow] = {}
+        # object -> sequence number; row number is the sequence number
+        # minus sequence number of the first row
+        self._index: dict[search.RankableObject, int] = {}
+        self._first_seq = 0
         self._setup_columns()
         self._aux_info_callback = aux_info_callback
 
     def __len__(self) -> int:
         return len(self._store)
 
+    @property
+    def icon_size(self) -> int:
+        return self._icon_size
+
+    @icon_size.setter
+    def icon_size(self, size: int) -> None:
+        if size != self._icon_size:
+            self._icon_size = size
+            self._rendered.clear()
+            self._update_icon_size()
+
     def _setup_columns(self):
         # Name and description column
         # Expands to the rest of the space
@@ -79,24 +105,34 @@ class _LeafModel:
         name_cell.set_property("ellipsize", setctl.get_ellipsize_mode())
         name_col = Gtk.TreeViewColumn("item", name_cell)
         name_col.set_expand(True)
-        name_col.add_attribute(name_cell, "markup", _NAME_COL)
+        name_col.set_cell_data_func(
+            name_cell, self._render_cell, ("markup", _NAME_COL)
+        )
 
         fav_cell = Gtk.CellRendererText()
         fav_col = Gtk.TreeViewColumn("fav", fav_cell)
-        fav_col.add_attribute(fav_cell, "text", _FAV_COL)
+        fav_col.set_cell_data_func(
+            fav_cell, self._render_cell, ("text", _FAV_COL)
+        )
 
         info_cell = Gtk.CellRendererText()
         info_col = Gtk.TreeViewColumn("info", info_cell)
-        info_col.add_attribute(info_cell, "text", _INFO_COL)
+        info_col.set_cell_data_func(
+            info_cell, self._render_cell, ("text", _INFO_COL)
+        )
 
         nbr_cell = Gtk.CellRendererText()
         nbr_col = Gtk.TreeViewColumn("rank", nbr_cell)
         nbr_cell.set_property("width-chars", 3)
-        nbr_col.add_attribute(nbr_cell, "text", _RANK_COL)
+        nbr_col.set_cell_data_func(
+            nbr_cell, self._render_cell, ("text", _RANK_COL)
+        )
 
         icon_cell = Gtk.CellRendererPixbuf()
         icon_col = Gtk.TreeViewColumn("icon", icon_cell)
-        icon_col.add_attribute(icon_cell, "pixbuf", _ICON_COL)
+        icon_col.set_cell_data_func(
+            icon_cell, self._render_cell, ("pixbuf", _ICON_COL)
+        )
 
         self.columns = [icon_col, name_col, fav_col, info_col]
 
@@ -104,6 +140,64 @@ class _LeafModel:
         if pretty.DEBUG:
             self.columns.append(nbr_col)
 
+        # with fixed sizes tree view in fixed height mode does not measure
+        # (and render) all rows
+        for col in self.columns:
+            col.set_sizing(Gtk.TreeViewColumnSizing.FIXED)
+
+        self._icon_col, self._icon_cell = icon_col, icon_cell
+        self._name_cell = name_cell
+        # text columns with the widest expected content
+        self._text_cols = (
+            (fav_col, fav_cell, "\N{BLACK STAR}"),
+            (info_col, info_cell, "Ctrl+W"),
+            (nbr_col, nbr_cell, "999"),
+        )
+        self._update_icon_size()
+
+    def _update_icon_size(self) -> None:
+        xpad, ypad = self._icon_cell.get_padding()
+        size = self._icon_size
+        if size <= _MIN_ICON_SIZE_TO_SHOW:
+            size = 0
+
+        self._icon_cell.set_fixed_size(size + 2 * xpad, size + 2 * ypad)
+        self._icon_col.set_fixed_width(size + 2 * xpad)
+
+    def update_sizes(self, widget: Gtk.Widget) -> None:
+        """Set sizes of text columns and rows according to font of `widget`."""
+        for col, cell, sample in self._text_cols:
+            xpad, _ypad = cell.get_padding()
+            layout = widget.create_pango_layout(sample)
+            width, _height = layout.get_pixel_size()
+            col.set_fixed_width(width + 2 * xpad)
+
+        # all rows have height of the name with description
+        layout = widget.create_pango_layout()
+        layout.set_markup("Xg\n<small>Xg</small>")
+        _xpad, ypad = self._name_cell.get_padding()
+        _width, height = layout.get_pixel_size()
+        self._name_cell.set_fixed_size(-1, height + 2 * ypad)
+
+    def _render_cell(
+        self,
+        _column: Gtk.TreeViewColumn,
+        cell: Gtk.CellRenderer,
+        store: Gtk.ListStore,
+        siter: Gtk.TreeIter,
+        data: tuple[str, int],
+    ) -> None:
+        prop, col = data
+        rankable = store.get_value(siter, 0)
+        cell.set_property(prop, self._get_rendered(rankable)[col])
+
+    def _get_rendered(self, rankable: Rankable) -> _RenderedRow:
+        key = id(rankable)
+        if (row := self._rendered.get(key)) is None:
+            row = self._rendered[key] = self._build_row(rankable)
+
+        return row
+
     def get_object(self, path: ty.Iterable[int] | None) -> Rankable | None:
         """Get object for given `path`."""
         if path is None:
@@ -112,6 +206,13 @@ class _LeafModel:
         store_iter = self._store.get_iter(path)
         return self._store.get_value(store_iter, 0)  # type: ignore
 
+    def get_tooltip_markup(self, path: ty.Iterable[int]) -> str | None:
+        """Get markup of name and description of object at `path`."""
+        if rankable := self.get_object(path):
+            return self._get_rendered(rankable)[_NAME_COL]
+
+        return None
+
     def get_store(self) -> Gtk.ListStore:
         """Get list store."""
         return self._store
@@ -120,6 +221,9 @@ class _LeafModel:
         """Clear the model and reset its base"""
         self._store.clear()
         self._base = None
+        self._rendered.clear()
+        self._index.clear()
+        self._first_seq = 0
 
     def set_base(self, baseiter: ty.Iterable[Rankable]) -> None:
         """Set base iterator that provide items for model."""
@@ -136,32 +240,34 @@ class _LeafModel:
         if num:
             iterator = itertools.islice(self._base, num)
 
-        append = self._store.append
-        build_row = self._build_row
+        append = self._append
 
         try:
             first_rank = next(iterator)
-            append(build_row(first_rank))
+            append(first_rank)
             first = first_rank.object
         except StopIteration:
             return None
 
         for item in iterator:
-            append(build_row(item))
+            append(item)
 
         # first.object is a leaf
         return first
 
-    def _build_row(
-        self, rankable: Rankable
-    ) -> tuple[Rankable, GdkPixbuf.Pixbuf | None, str, str, str, str]:
-        """Use the UI description functions get_* to initialize `rankable` into
-        the model. Return (rankable, icon, markup, fav, info, rank_str).
+    def _append(self, rankable: Rankable) -> None:
+        self._index.setdefault(
+            rankable.object, self._first_seq + len(self._store)
+        )
+        self._store.append((rankable,))
+
+    def _build_row(self, rankable: Rankable) -> _RenderedRow:
+        """Use the UI description functions get_* to render `rankable`.
+        Return (icon, markup, fav, info, rank_str).
         """
         leaf, rank = rankable.object, rankable.rank
         assert isinstance(leaf, (Leaf, Action))
         return (
-            rankable,
             self._get_icon(leaf),
             self._get_label_markup(leaf),
             self._get_fav(leaf),
@@ -169,33 +275,34 @@ class _LeafModel:
             self._get_rank_str(rank),
         )
 
-    def _iter_store(self) -> ty.Iterator[tuple[Rankable, Gtk.TreeIter]]:
-        """Iterate over item in tree store and yield rankable object and iterator"""
-        siter = self._store.get_iter_first()
-        while siter:
-            yield self._store.get(siter, 0)[0], siter
-            siter = self._store.iter_next(siter)
+    def _reindex(self) -> None:
+        self._first_seq = 0
+        self._index.clear()
+        for row, (rankable,) in enumerate(self._store):
+            self._index.setdefault(rankable.object, row)
 
     def add_first(self, rankable: Rankable) -> None:
         """Add rankable on top the list. Remove previous object when already
         exists.
         """
         # first check is object already exists
-        for row_rankable, siter in self._iter_store():
-            if row_rankable.object == rankable.object:
-                # object already on list; remove it
-                self._store.remove(siter)
-                break
+        if (row := self.find(rankable.object)) >= 0:
+            # object already on list; remove it
+            siter = self._store.get_iter((row,))
+            self._rendered.pop(id(self._store.get_value(siter, 0)), None)
+            self._store.remove(siter)
+            self._reindex()
 
-        self._store.prepend(self._build_row(rankable))
+        self._first_seq -= 1
+        self._index[rankable.object] = self._first_seq
+        self._store.prepend((rankable,))
 
     def find(self, obj: search.RankableObject) -> int:
         """Find @obj in store and return it row number"""
-        for row, (row_rankable, _siter) in enumerate(self._iter_store()):
-            if row_rankable.object == obj:
-                return row
+        if (seq := self._index.get(obj)) is None:
+            return -1
 
-        return -1
+        return seq - self._first_seq
 
     def _get_icon(
         self, leaf: search.RankableObject
@@ -623,12 +730,16 @@ class Search(GObject.GObject, pretty.OutputMixin):  # type:ignore
         table.set_name("kupfer-list-view")
         table.set_headers_visible(False)
         table.set_property("enable-search", False)
+        table.set_fixed_height_mode(True)
         table.set_has_tooltip(True)
-        table.set_tooltip_column(2)
+        table.connect("query-tooltip", self._on_table_query_tooltip)
 
         for col in self._model.columns:
             table.append_column(col)
 
+        self._model.update_sizes(table)
+        table.connect("style-updated", self._model.update_sizes)
+
         table.connect("row-activated", self._on_row_activated)
         table.connect("cursor-changed", self._on_cursor_changed)
 
@@ -741,6 +852,24 @@ class Search(GObject.GObject, pretty.OutputMixin):  # type:ignore
         else:
             self.show_table()
 
+    def _on_table_query_tooltip(
+        self,
+        table: Gtk.TreeView,
+        pos_x: int,
+        pos_y: int,
+        keyboard_mode: bool,
+        tooltip: Gtk.Tooltip,
+    ) -> bool:
+        found, _x, _y, _model, path, _iter = table.get_tooltip_context(
+            pos_x, pos_y, keyboard_mode
+        )
+        if not found or not (markup := self._model.get_tooltip_markup(path)):
+            return False
+
+        tooltip.set_markup(markup)
+        table.set_tooltip_row(tooltip, path)
+        return True
+
     def _on_table_scroll_changed(
         self, scrollbar: Gtk.Scrollbar, _scroll_type: ty.Any, value: int
     ) -> None:
@@ -789,8 +918,9 @@ class Search(GObject.GObject, pretty.OutputMixin):  # type:ignore
             path, _col = self._table.get_cursor()
             if path:
                 row = path[0]
-                if len(self._model) - rows_count <= row:
-                    self._populate(_SHOW_MORE)
+                if (missing := row + rows_count - len(self._model)) >= 0:
+                    # load whole step at once
+                    self._populate(max(missing + 1, _SHOW_MORE))
                 # go down only if table is visible
                 if table_visible and (
                     step := min(len(self._model) - row - 1, rows_count)
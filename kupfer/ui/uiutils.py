@@ -282,6 +282,14 @@ def show_notification(
     return int(rid)
 
 
+def close_notification(nid: int) -> None:
+    """Close notification `nid` returned by `show_notification`."""
+    if not (notifications := _get_notification_obj()):
+        return
+
+    notifications.CloseNotification(nid, dbus_interface=_IFACE_NAME)
+
+
 def confirm_dialog(msg: str, positive_btn: str) -> bool:
     """Request user confirmation."""
     dlg = Gtk.MessageDialog(